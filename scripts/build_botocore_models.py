@@ -0,0 +1,113 @@
+"""Build trimmed botocore service models into src/botocore_models.
+
+botocore parses the whole service model and endpoint ruleset when a client is
+created. The handlers only call a few operations, so this keeps just those
+operations and the shapes they reach, minified. utils.aws uses them only for
+clients created with `operations=`, when manifest.json lists every one of those
+operations and the runtime's botocore still bundles the same api version of the
+service. The manifest records botocore's version only for reference.
+
+    make build-botocore-models
+"""
+
+import argparse
+import json
+import shutil
+from pathlib import Path
+
+import botocore
+from botocore.loaders import Loader
+
+DIR_OUTPUT = Path(__file__).parents[1] / "src" / "botocore_models"
+
+# service name -> operations the deploy package calls; keep in step with the
+# operations= passed to create_client (tests/unit/utils/aws/test_aws.py checks)
+OPERATIONS = {
+    "events": ["PutEvents"],
+    "dynamodb": ["GetItem", "PutItem"],
+    "s3": ["PutObject"],
+}
+
+DOCUMENTATION_KEYS = ("documentation", "documentationUrl")
+
+
+def strip_documentation(obj: dict) -> dict:
+    return {k: v for k, v in obj.items() if k not in DOCUMENTATION_KEYS}
+
+
+def collect_shapes(shapes: dict, name: str, seen: set[str]):
+    if name in seen:
+        return
+    seen.add(name)
+    shape = shapes[name]
+    refs = [shape.get("member"), shape.get("key"), shape.get("value")]
+    refs += list(shape.get("members", {}).values())
+    for ref in refs:
+        if ref is not None:
+            collect_shapes(shapes, ref["shape"], seen)
+
+
+def trim_shape(shape: dict) -> dict:
+    shape = strip_documentation(shape)
+    if "members" in shape:
+        shape["members"] = {
+            k: strip_documentation(v) for k, v in shape["members"].items()
+        }
+    return shape
+
+
+def trim_service_model(model: dict, operations: list[str]) -> dict:
+    kept = {}
+    names: set[str] = set()
+    for name in operations:
+        operation = strip_documentation(model["operations"][name])
+        kept[name] = operation
+        refs = [operation.get("input"), operation.get("output")]
+        refs += operation.get("errors", [])
+        for ref in refs:
+            if ref is not None:
+                collect_shapes(model["shapes"], ref["shape"], names)
+    return {
+        "version": model.get("version", "2.0"),
+        "metadata": model["metadata"],
+        "operations": kept,
+        "shapes": {k: trim_shape(model["shapes"][k]) for k in sorted(names)},
+    }
+
+
+def write_json(path: Path, data: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, separators=(",", ":")))
+
+
+def build(output: Path, operations: dict[str, list[str]]):
+    loader = Loader()
+    if output.exists():
+        shutil.rmtree(output)
+    services = {}
+    for service, names in operations.items():
+        api_version = loader.determine_latest_version(service, "service-2")
+        services[service] = {"api_version": api_version, "operations": names}
+        directory = output / service / api_version
+        model = loader.load_service_model(service, "service-2", api_version)
+        write_json(directory / "service-2.json", trim_service_model(model, names))
+        # the ruleset is needed as is, minifying it still saves the parse time
+        ruleset = loader.load_service_model(service, "endpoint-rule-set-1", api_version)
+        write_json(directory / "endpoint-rule-set-1.json", ruleset)
+    write_json(
+        output / "manifest.json",
+        {"botocore": botocore.__version__, "services": services},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=DIR_OUTPUT)
+    args = parser.parse_args()
+    build(args.output, OPERATIONS)
+    for path in sorted(args.output.rglob("*.json")):
+        print(f"{path.stat().st_size:>9} {path.relative_to(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from .error_processor import LogMessage
+    from .template_miner import TemplateMiner
+
+AggregateKey = Literal["none", "error_message", "message", "request_id", "template"]
+
+PATTERNS_NORMALIZE = [
+    (
+        re.compile(
+            r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+        ),
+        "<uuid>",
+    ),
+    (re.compile(r"\b(?:0x)?[0-9a-fA-F]{8,}\b"), "<hex>"),
+    (re.compile(r"\d+"), "<num>"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+@dataclass(frozen=True)
+class LogMessageGroup:
+    key: str
+    log_message: LogMessage
+    count: int
+    first_timestamp: int
+    last_timestamp: int
+    request_ids: tuple[str, ...]
+    suppressed: int = 0
+    template_id: str | None = None
+
+    @classmethod
+    def from_log_message(
+        cls, log_message: LogMessage, *, template_id: str | None = None
+    ) -> LogMessageGroup:
+        return cls(
+            key="",
+            log_message=log_message,
+            count=1,
+            first_timestamp=log_message.timestamp,
+            last_timestamp=log_message.timestamp,
+            request_ids=(
+                ()
+                if log_message.lambda_request_id is None
+                else (log_message.lambda_request_id,)
+            ),
+            template_id=template_id,
+        )
+
+
+@dataclass
+class AggregatorStats:
+    messages: int = 0
+    groups: int = 0
+
+    def as_dict(self) -> dict:
+        return {"messages": self.messages, "groups": self.groups}
+
+
+@dataclass
+class _GroupState:
+    log_message: LogMessage
+    count: int
+    first_timestamp: int
+    last_timestamp: int
+    request_ids: list[str]
+    template_id: str | None
+
+
+def normalize_message(message: str) -> str:
+    for pattern, replacement in PATTERNS_NORMALIZE:
+        message = pattern.sub(replacement, message)
+    return message.strip()
+
+
+def create_group_key(
+    log_message: LogMessage, key: AggregateKey, *, template_id: str | None = None
+) -> str:
+    match key:
+        case "template" if template_id is not None:
+            return template_id
+        case "error_message" if log_message.error_message is not None:
+            return normalize_message(log_message.error_message)
+        case "request_id" if log_message.lambda_request_id is not None:
+            return log_message.lambda_request_id
+        case _:
+            return normalize_message(log_message.message)
+
+
+class Aggregator:
+    key: AggregateKey
+    max_request_ids: int
+    miner: TemplateMiner | None
+    stats: AggregatorStats
+
+    def __init__(
+        self,
+        *,
+        key: AggregateKey = "none",
+        max_request_ids: int = 5,
+        miner: TemplateMiner | None = None,
+    ):
+        self.key = key
+        self.max_request_ids = max_request_ids
+        self.miner = miner
+        self.stats = AggregatorStats()
+
+    def mine(self, log_message: LogMessage) -> str | None:
+        if self.miner is None:
+            return None
+        text = log_message.error_message or log_message.message
+        return self.miner.add(text).template_id
+
+    def aggregate(
+        self, log_messages: Iterable[LogMessage]
+    ) -> Iterator[LogMessageGroup]:
+        if self.key == "none":
+            # nothing to merge, so keep the pipeline streaming
+            for log_message in log_messages:
+                self.stats.messages += 1
+                self.stats.groups += 1
+                yield LogMessageGroup.from_log_message(
+                    log_message, template_id=self.mine(log_message)
+                )
+            return
+
+        groups: dict[str, _GroupState] = {}
+        for log_message in log_messages:
+            self.stats.messages += 1
+            template_id = self.mine(log_message)
+            group_key = create_group_key(log_message, self.key, template_id=template_id)
+            state = groups.get(group_key)
+            if state is None:
+                groups[group_key] = _GroupState(
+                    log_message=log_message,
+                    count=1,
+                    first_timestamp=log_message.timestamp,
+                    last_timestamp=log_message.timestamp,
+                    request_ids=[],
+                    template_id=template_id,
+                )
+                state = groups[group_key]
+            else:
+                state.count += 1
+                state.first_timestamp = min(
+                    state.first_timestamp, log_message.timestamp
+                )
+                state.last_timestamp = max(state.last_timestamp, log_message.timestamp)
+            request_id = log_message.lambda_request_id
+            if (
+                request_id is not None
+                and len(state.request_ids) < self.max_request_ids
+                and request_id not in state.request_ids
+            ):
+                state.request_ids.append(request_id)
+
+        self.stats.groups = len(groups)
+        for group_key, state in groups.items():
+            yield LogMessageGroup(
+                key=group_key,
+                log_message=state.log_message,
+                count=state.count,
+                first_timestamp=state.first_timestamp,
+                last_timestamp=state.last_timestamp,
+                request_ids=tuple(state.request_ids),
+                template_id=state.template_id,
+            )
@@ -0,0 +1,130 @@
+import codecs
+import json
+import re
+import zlib
+from base64 import b64decode
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+PATTERN_LOG_EVENTS = re.compile(r'"logEvents"\s*:\s*\[')
+PATTERN_SEPARATOR = re.compile(r"[\s,]*")
+HEADER_KEYS = frozenset(
+    {"messageType", "owner", "logGroup", "logStream", "subscriptionFilters"}
+)
+
+
+@dataclass(frozen=True, slots=True)
+class LogEventRecord:
+    id: str
+    timestamp: int
+    message: str
+
+
+@dataclass(frozen=True)
+class LogsDataHeader:
+    message_type: str
+    owner: str
+    log_group: str
+    log_stream: str
+    subscription_filters: list[str]
+
+
+def iter_decoded_text(data: str, *, chunk_size: int = 64 * 1024) -> Iterator[str]:
+    # base64 has to be sliced on 4 char boundaries to be decoded piece by piece
+    size = chunk_size - chunk_size % 4
+    inflater = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for i in range(0, len(data), size):
+        text = decoder.decode(inflater.decompress(b64decode(data[i : i + size])))
+        if len(text) > 0:
+            yield text
+    text = decoder.decode(inflater.flush(), final=True)
+    if len(text) > 0:
+        yield text
+
+
+class _TextBuffer:
+    chunks: Iterator[str]
+    text: str
+    pos: int
+
+    def __init__(self, chunks: Iterator[str]):
+        self.chunks = chunks
+        self.text = ""
+        self.pos = 0
+
+    def read_more(self) -> bool:
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            return False
+        # drop what has already been consumed so the buffer stays bounded
+        self.text = self.text[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+
+def decode_logs_data(
+    data: str, *, chunk_size: int = 64 * 1024
+) -> tuple[LogsDataHeader, Iterator[LogEventRecord]]:
+    buffer = _TextBuffer(iter_decoded_text(data, chunk_size=chunk_size))
+
+    while (m := PATTERN_LOG_EVENTS.search(buffer.text)) is None:
+        if not buffer.read_more():
+            # unexpected layout; fall back to decoding the whole document at once
+            return _decode_whole(buffer)
+
+    raw_header = json.loads(buffer.text[: m.start()] + '"logEvents":[]}')
+    if not HEADER_KEYS <= raw_header.keys():
+        # some header keys come after logEvents, so only the whole document has them
+        return _decode_whole(buffer)
+    buffer.pos = m.end()
+    return _create_header(raw_header), _iter_log_events(buffer)
+
+
+def _decode_whole(
+    buffer: _TextBuffer,
+) -> tuple[LogsDataHeader, Iterator[LogEventRecord]]:
+    while buffer.read_more():
+        pass
+    raw = json.loads(buffer.text[buffer.pos :])
+    return _create_header(raw), iter([_create_record(x) for x in raw["logEvents"]])
+
+
+def _iter_log_events(buffer: _TextBuffer) -> Iterator[LogEventRecord]:
+    decoder = json.JSONDecoder()
+    while True:
+        buffer.pos = PATTERN_SEPARATOR.match(buffer.text, buffer.pos).end()
+        if buffer.pos == len(buffer.text):
+            if not buffer.read_more():
+                raise ValueError("unexpected end of logs data")
+            continue
+        if buffer.text[buffer.pos] == "]":
+            return
+        try:
+            raw, end = decoder.raw_decode(buffer.text, buffer.pos)
+        except json.JSONDecodeError:
+            # the log event is split across chunks
+            if not buffer.read_more():
+                raise
+            continue
+        buffer.pos = end
+        yield _create_record(raw)
+
+
+def _create_header(raw: dict) -> LogsDataHeader:
+    return LogsDataHeader(
+        message_type=raw["messageType"],
+        owner=raw["owner"],
+        log_group=raw["logGroup"],
+        log_stream=raw["logStream"],
+        subscription_filters=raw["subscriptionFilters"],
+    )
+
+
+def _create_record(raw: dict) -> LogEventRecord:
+    return LogEventRecord(
+        id=raw["id"], timestamp=raw["timestamp"], message=raw["message"]
+    )
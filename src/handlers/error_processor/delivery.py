@@ -0,0 +1,179 @@
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from utils.logger import create_logger, logging_function
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from mypy_boto3_events import EventBridgeClient
+    from mypy_boto3_events.type_defs import PutEventsRequestEntryTypeDef
+
+RETRYABLE_ERROR_CODES = frozenset(
+    {
+        "ThrottlingException",
+        "InternalException",
+        "InternalFailure",
+        "ServiceUnavailable",
+    }
+)
+
+logger = create_logger(__name__)
+
+# rewrites an entry right before each attempt sends it; must keep its size
+type BeforeSend = Callable[
+    [str, PutEventsRequestEntryTypeDef], PutEventsRequestEntryTypeDef
+]
+
+
+@dataclass(frozen=True)
+class ChunkResult:
+    index: int
+    size: int
+    attempts: int
+    duration: float
+    event_ids: dict[str, str]
+    failed: dict[str, str]
+    # epoch seconds at which each entry got its EventId
+    delivered_at: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class DeliveryReport:
+    chunks: tuple[ChunkResult, ...]
+
+    @property
+    def succeeded(self) -> dict[str, str]:
+        return {k: v for c in self.chunks for k, v in c.event_ids.items()}
+
+    @property
+    def failed(self) -> dict[str, str]:
+        return {k: v for c in self.chunks for k, v in c.failed.items()}
+
+    @property
+    def delivered_at(self) -> dict[str, float]:
+        return {k: v for c in self.chunks for k, v in c.delivered_at.items()}
+
+    @property
+    def retries(self) -> int:
+        return sum(c.attempts - 1 for c in self.chunks)
+
+
+def compute_backoff(*, attempt: int, base_delay: float, max_delay: float) -> float:
+    # full jitter: https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+    return random.uniform(0, min(max_delay, base_delay * (2**attempt)))
+
+
+def send_chunk(
+    *,
+    index: int,
+    chunk: list[tuple[str, PutEventsRequestEntryTypeDef]],
+    client: EventBridgeClient,
+    max_attempts: int,
+    base_delay: float,
+    max_delay: float,
+    before_send: BeforeSend | None = None,
+) -> ChunkResult:
+    # botocore is already loaded by the client, so this costs nothing
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    pending = dict(chunk)
+    event_ids = {}
+    delivered_at = {}
+    errors = {}
+    attempts = 0
+    start = time.perf_counter()
+
+    while len(pending) > 0 and attempts < max_attempts:
+        if attempts > 0:
+            # only retryable entries are left, whatever their error code
+            time.sleep(
+                compute_backoff(
+                    attempt=attempts - 1, base_delay=base_delay, max_delay=max_delay
+                )
+            )
+        attempts += 1
+        keys = list(pending.keys())
+        entries = [pending[k] for k in keys]
+        if before_send is not None:
+            entries = [before_send(k, e) for k, e in zip(keys, entries)]
+        try:
+            resp = client.put_events(Entries=entries)
+        except (ClientError, BotoCoreError) as e:
+            # the whole request failed: every entry in it shares the error, and
+            # the other chunks keep going
+            code = (
+                e.response.get("Error", {}).get("Code", "Unknown")
+                if isinstance(e, ClientError)
+                else type(e).__name__
+            )
+            logger.warning(
+                f"put events request failed: {e}",
+                exc_info=True,
+                data={"index": index, "size": len(keys), "ErrorCode": code},
+            )
+            errors.update(dict.fromkeys(keys, code))
+            if code not in RETRYABLE_ERROR_CODES:
+                pending.clear()
+            continue
+        received_at = time.time()
+        for k, entry in zip(keys, resp["Entries"]):
+            if "EventId" in entry:
+                event_ids[k] = entry["EventId"]
+                delivered_at[k] = received_at
+                errors.pop(k, None)
+                del pending[k]
+                continue
+            errors[k] = entry.get("ErrorCode", "Unknown")
+            if errors[k] not in RETRYABLE_ERROR_CODES:
+                del pending[k]
+
+    return ChunkResult(
+        index=index,
+        size=len(chunk),
+        attempts=attempts,
+        duration=time.perf_counter() - start,
+        event_ids=event_ids,
+        failed=errors,
+        delivered_at=delivered_at,
+    )
+
+
+@logging_function(logger, with_args=False)
+def deliver_entries(
+    *,
+    chunks: Iterable[list[tuple[str, PutEventsRequestEntryTypeDef]]],
+    client: EventBridgeClient,
+    max_workers: int = 4,
+    max_attempts: int = 5,
+    base_delay: float = 0.1,
+    max_delay: float = 2.0,
+    before_send: BeforeSend | None = None,
+) -> DeliveryReport:
+    results = []
+    pending: set[Future[ChunkResult]] = set()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for index, chunk in enumerate(chunks):
+            # keep at most one queued chunk per worker so lazy inputs stay lazy
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results += [f.result() for f in done]
+            pending.add(
+                executor.submit(
+                    send_chunk,
+                    index=index,
+                    chunk=chunk,
+                    client=client,
+                    max_attempts=max_attempts,
+                    base_delay=base_delay,
+                    max_delay=max_delay,
+                    before_send=before_send,
+                )
+            )
+        results += [f.result() for f in wait(pending).done]
+
+    return DeliveryReport(chunks=tuple(sorted(results, key=lambda x: x.index)))
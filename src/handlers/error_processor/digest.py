@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .renderer import BLOCK_SEPARATOR, DIGEST_HEADER_BLOCKS, SLACK_MAX_BLOCKS
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from datetime import datetime
+
+    from .renderer import SlackPayloadTemplate
+
+# well below the 256 KiB PutEvents limit and what Slack renders comfortably
+MAX_DIGEST_BYTES = 40_000
+
+
+@dataclass
+class DigestStats:
+    errors: int = 0
+    messages: int = 0
+
+    def as_dict(self) -> dict:
+        return {"errors": self.errors, "messages": self.messages}
+
+
+class DigestPacker:
+    template: SlackPayloadTemplate
+    max_errors: int
+    max_bytes: int
+    stats: DigestStats
+
+    def __init__(
+        self,
+        *,
+        template: SlackPayloadTemplate,
+        max_errors: int = 10,
+        max_blocks: int = SLACK_MAX_BLOCKS,
+        max_bytes: int = MAX_DIGEST_BYTES,
+    ):
+        self.template = template
+        self.max_errors = max(1, min(max_errors, max_blocks - DIGEST_HEADER_BLOCKS))
+        self.max_bytes = max_bytes
+        self.stats = DigestStats()
+
+    def pack(self, sections: Iterable[str], *, now: datetime) -> Iterator[str]:
+        for message, _ in self.pack_with_timestamps(
+            ((x, 0) for x in sections), now=now
+        ):
+            yield message
+
+    def pack_with_timestamps(
+        self, items: Iterable[tuple[str, int]], *, now: datetime
+    ) -> Iterator[tuple[str, tuple[int, ...]]]:
+        # sections are ascii-escaped json, so len() is already the byte size
+        base = len(self.template.render_digest(now=now, sections=[]))
+        batch: list[str] = []
+        timestamps: list[int] = []
+        size = base
+        for section, timestamp in items:
+            self.stats.errors += 1
+            grown = size + len(section) + len(BLOCK_SEPARATOR)
+            if len(batch) > 0 and (
+                len(batch) >= self.max_errors or grown > self.max_bytes
+            ):
+                yield self._flush(batch, now=now), tuple(timestamps)
+                batch = []
+                timestamps = []
+                grown = base + len(section) + len(BLOCK_SEPARATOR)
+            batch.append(section)
+            timestamps.append(timestamp)
+            size = grown
+        if len(batch) > 0:
+            yield self._flush(batch, now=now), tuple(timestamps)
+
+    def _flush(self, batch: list[str], *, now: datetime) -> str:
+        self.stats.messages += 1
+        return self.template.render_digest(now=now, sections=batch)
@@ -1,34 +1,92 @@
-import json
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
+from itertools import chain
+from logging import DEBUG
 from os.path import basename
 from typing import TYPE_CHECKING
 
-from aws_cloudwatch_logs_url import create_url_log_events
-from aws_lambda_powertools.logging.types import (
-    PowertoolsLogRecord,
-    PowertoolsStackTrace,
-)
-from aws_lambda_powertools.utilities.data_classes import (
-    event_source,
-)
-from aws_lambda_powertools.utilities.data_classes.cloud_watch_logs_event import (
-    CloudWatchLogsEvent,
-    CloudWatchLogsLogEvent,
-)
+from aws_lambda_powertools.metrics import MetricUnit
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
-from utils.aws import create_client
-from utils.logger import create_logger, logging_function, logging_handler
+from utils import json_codec
+from utils.aws import create_client, get_pool_stats
+from utils.logger import create_logger, lazy, logging_function, logging_handler
+from utils.metrics import create_metrics, metrics_handler
+from utils.priming import register_before_snapshot
+from utils.settings import get_settings
+
+from .aggregator import AggregateKey, Aggregator, LogMessageGroup
+from .decoder import LogEventRecord, decode_logs_data
+from .delivery import DeliveryReport, deliver_entries
+from .digest import MAX_DIGEST_BYTES, DigestPacker
+from .lag import LagTracker, embed_trace
+from .packer import EntryPacker
+from .prefilter import DEFAULT_MARKERS, DEFAULT_PATTERNS, Prefilter
+from .rate_limiter import (
+    DynamoDBStateStore,
+    RateLimitBackend,
+    RateLimiter,
+    get_in_memory_state_store,
+)
+from .renderer import (
+    JST,
+    SlackPayloadTemplate,
+    compile_slack_template,
+    render_digest_section,
+)
+from .template_miner import get_template_miner
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from aws_lambda_powertools.logging.types import (
+        PowertoolsLogRecord,
+        PowertoolsStackTrace,
+    )
+    from aws_lambda_powertools.utilities.data_classes.cloud_watch_logs_event import (
+        CloudWatchLogsEvent,
+        CloudWatchLogsLogEvent,
+    )
     from mypy_boto3_events import EventBridgeClient
 
+    from utils.metrics import Metrics
+
 
 class EnvironmentVariables(BaseSettings):
     event_bus_name: str
     aws_default_region: str
     system_name: str
+    put_events_max_workers: int = 4
+    put_events_max_attempts: int = 5
+    prefilter_enabled: bool = False
+    prefilter_markers: list[str] = list(DEFAULT_MARKERS)
+    prefilter_patterns: list[str] = list(DEFAULT_PATTERNS)
+    aggregate_by: AggregateKey = "none"
+    aggregate_max_request_ids: int = 5
+    rate_limit_backend: RateLimitBackend = "none"
+    rate_limit_capacity: float = 5
+    rate_limit_refill_per_second: float = 1 / 60
+    rate_limit_ttl_seconds: int = 3600
+    rate_limit_max_keys: int = 1024
+    rate_limit_table_name: str | None = None
+    template_mining_enabled: bool = False
+    template_depth: int = 4
+    template_similarity_threshold: float = 0.4
+    template_max_clusters: int = 1000
+    digest_enabled: bool = False
+    digest_max_errors: int = 10
+    digest_max_bytes: int = MAX_DIGEST_BYTES
+    trace_header_enabled: bool = False
+
+    @model_validator(mode="after")
+    def check_rate_limit_table_name(self) -> EnvironmentVariables:
+        # fail on load rather than on the first GetItem of an invocation
+        if self.rate_limit_backend == "dynamodb" and self.rate_limit_table_name is None:
+            raise ValueError(
+                "RATE_LIMIT_TABLE_NAME is required when RATE_LIMIT_BACKEND is dynamodb"
+            )
+        return self
 
 
 @dataclass(frozen=True)
@@ -39,45 +97,248 @@ class LogMessage:
     error_message: str | None
 
 
-JST = timezone(offset=timedelta(hours=+9), name="JST")
 logger = create_logger(__name__)
+metrics = create_metrics()
 
 
-@event_source(data_class=CloudWatchLogsEvent)
+# the raw event is enough: main only reads event["awslogs"]["data"]
 @logging_handler(logger)
-def handler(event: CloudWatchLogsEvent, context):
+@metrics_handler(metrics)
+def handler(event: dict, context):
     main(event=event)
 
 
 @logging_function(logger)
 def main(
     *,
-    event: CloudWatchLogsEvent,
-    client_events: EventBridgeClient = create_client("events"),
+    event: CloudWatchLogsEvent | dict,
+    client_events: EventBridgeClient | None = None,
+    env: EnvironmentVariables | None = None,
 ):
-    env = EnvironmentVariables()
-    decompressed_log = event.parse_logs_data()
-    messages = [
-        create_slack_payload(
-            log_group=decompressed_log.log_group,
-            log_stream=decompressed_log.log_stream,
+    env = get_settings(EnvironmentVariables) if env is None else env
+    lag = LagTracker(metrics=metrics)
+    header, log_events = decode_logs_data(event["awslogs"]["data"])
+    log_events = lag.observe_events(metrics.timed(log_events, "DecodeDuration"))
+    prefilter = Prefilter(
+        markers=env.prefilter_markers if env.prefilter_enabled else None,
+        patterns=env.prefilter_patterns,
+    )
+    aggregator = Aggregator(
+        key=env.aggregate_by,
+        max_request_ids=env.aggregate_max_request_ids,
+        miner=(
+            get_template_miner(
+                depth=env.template_depth,
+                similarity_threshold=env.template_similarity_threshold,
+                max_clusters=env.template_max_clusters,
+            )
+            if env.template_mining_enabled or env.aggregate_by == "template"
+            else None
+        ),
+    )
+    rate_limiter = create_rate_limiter(env=env)
+    template = create_slack_template(
+        log_group=header.log_group,
+        log_stream=header.log_stream,
+        region=env.aws_default_region,
+        system_name=env.system_name,
+    )
+    log_messages = metrics.timed(
+        (
+            parse_message(log_event=log_event)
+            for log_event in metrics.timed(
+                prefilter.filter(log_events), "FilterDuration"
+            )
+        ),
+        "ParseDuration",
+    )
+    groups = metrics.timed(
+        (
+            aggregator.aggregate(log_messages)
+            if rate_limiter is None
+            else rate_limiter.filter(
+                aggregator.aggregate(log_messages), log_group=header.log_group
+            )
+        ),
+        "AggregateDuration",
+    )
+    digest = (
+        DigestPacker(
+            template=template,
+            max_errors=env.digest_max_errors,
+            max_bytes=env.digest_max_bytes,
+        )
+        if env.digest_enabled
+        else None
+    )
+    if digest is None:
+        messages = (
+            (
+                render_slack_payload(
+                    template=template,
+                    log_group=header.log_group,
+                    log_stream=header.log_stream,
+                    region=env.aws_default_region,
+                    group=group,
+                ),
+                (group.first_timestamp,),
+            )
+            for group in groups
+        )
+    else:
+        # several errors share one webhook call through the API destination
+        messages = digest.pack_with_timestamps(
+            (
+                (
+                    render_slack_digest_section(
+                        log_group=header.log_group,
+                        log_stream=header.log_stream,
+                        region=env.aws_default_region,
+                        group=group,
+                    ),
+                    group.first_timestamp,
+                )
+                for group in groups
+            ),
+            now=datetime.now(tz=JST),
+        )
+    try:
+        with metrics.timer("DeliverDuration"):
+            put_events(
+                messages=debug_messages(
+                    messages=metrics.timed(lag.track(messages), "RenderDuration")
+                ),
+                event_bus_name=env.event_bus_name,
+                client=client_events,
+                max_workers=env.put_events_max_workers,
+                max_attempts=env.put_events_max_attempts,
+                metrics=metrics,
+                lag=lag,
+                trace_header=env.trace_header_enabled,
+            )
+    finally:
+        logger.info("lag", data=lag.as_dict())
+        logger.info("prefilter", data=prefilter.stats.as_dict())
+        logger.info("aggregator", data=aggregator.stats.as_dict())
+        metrics.count("EventsIn", prefilter.stats.seen)
+        metrics.count("EventsFiltered", prefilter.stats.skipped)
+        metrics.count("Groups", aggregator.stats.groups)
+        if rate_limiter is not None:
+            logger.info("rate limiter", data=rate_limiter.stats.as_dict())
+            metrics.count("EventsSuppressed", rate_limiter.stats.suppressed)
+        if digest is not None:
+            logger.info("digest", data=digest.stats.as_dict())
+
+
+@register_before_snapshot
+def prime():
+    # SnapStart: pay for settings, codecs, templates and the client model before
+    # the snapshot instead of on the first restored invocation
+    from botocore.stub import Stubber
+
+    env = get_settings(EnvironmentVariables)
+    log_group = "/aws/lambda/priming"
+    log_stream = "priming"
+    log_message = parse_message(
+        log_event=LogEventRecord(
+            id="0",
+            timestamp=0,
+            message=json_codec.dumps(
+                {
+                    "level": "ERROR",
+                    "message": "priming",
+                    "stack_trace": {
+                        "module": "builtins",
+                        "type": "Exception",
+                        "value": "priming",
+                    },
+                }
+            ),
+        )
+    )
+    message = render_slack_payload(
+        template=create_slack_template(
+            log_group=log_group,
+            log_stream=log_stream,
             region=env.aws_default_region,
             system_name=env.system_name,
-            log_event=log_event,
+        ),
+        log_group=log_group,
+        log_stream=log_stream,
+        region=env.aws_default_region,
+        group=LogMessageGroup.from_log_message(log_message),
+    )
+    # the same cached client put_events picks up
+    client = create_client(
+        "events",
+        max_pool_connections=env.put_events_max_workers,
+        operations=("PutEvents",),
+    )
+    # the stubbed call still validates, serializes and resolves the endpoint,
+    # but nothing leaves the sandbox before the snapshot
+    with Stubber(client) as stubber:
+        stubber.add_response(
+            "put_events",
+            {"FailedEntryCount": 0, "Entries": [{"EventId": "priming"}]},
         )
-        for log_event in decompressed_log.log_events
-    ]
-    for i, m in enumerate(messages):
-        logger.debug(f"log_event {i}", data={"index": i, "message": json.loads(m)})
-    put_events(
-        messages=messages, event_bus_name=env.event_bus_name, client=client_events
+        client.put_events(
+            Entries=[
+                {
+                    "Source": "a",
+                    "DetailType": "a",
+                    "Detail": message,
+                    "EventBusName": env.event_bus_name,
+                }
+            ]
+        )
+    if env.rate_limit_backend == "dynamodb":
+        # the same cached client create_rate_limiter picks up
+        client_dynamodb = create_client("dynamodb", operations=("GetItem", "PutItem"))
+        with Stubber(client_dynamodb) as stubber:
+            stubber.add_response("get_item", {})
+            DynamoDBStateStore(
+                table_name=env.rate_limit_table_name, client=client_dynamodb
+            ).load("priming")
+
+
+@logging_function(logger)
+def create_rate_limiter(*, env: EnvironmentVariables) -> RateLimiter | None:
+    match env.rate_limit_backend:
+        case "memory":
+            store = get_in_memory_state_store(
+                max_size=env.rate_limit_max_keys, ttl=env.rate_limit_ttl_seconds
+            )
+        case "dynamodb":
+            store = DynamoDBStateStore(
+                table_name=env.rate_limit_table_name,
+                client=create_client("dynamodb", operations=("GetItem", "PutItem")),
+                ttl=env.rate_limit_ttl_seconds,
+            )
+        case _:
+            return None
+    return RateLimiter(
+        store=store,
+        capacity=env.rate_limit_capacity,
+        refill_per_second=env.rate_limit_refill_per_second,
     )
 
 
+def debug_messages(*, messages: Iterable[str]) -> Iterator[str]:
+    if not logger.is_enabled_for(DEBUG):
+        yield from messages
+        return
+    for i, m in enumerate(messages):
+        logger.debug(
+            f"log_event {i}",
+            data={"index": i, "message": lazy(json_codec.loads, m)},
+        )
+        yield m
+
+
 @logging_function(logger)
-def parse_message(*, log_event: CloudWatchLogsLogEvent):
+def parse_message(*, log_event: CloudWatchLogsLogEvent | LogEventRecord):
     try:
-        data: PowertoolsLogRecord = json.loads(log_event.message)
+        data: PowertoolsLogRecord = json_codec.loads(log_event.message)
     except Exception:
         return LogMessage(
             lambda_request_id=None,
@@ -128,6 +389,9 @@ def create_url_logs(
     timestamp: int,
     function_request_id: str | None,
 ) -> str:
+    # only needed once an error is rendered, so kept off the cold start path
+    from aws_cloudwatch_logs_url import create_url_log_events
+
     if function_request_id is None:
         start = timestamp - 900_000  # 1000 ms/s * 60 s/m * 15 m = 900,000 ms
         end = timestamp + 10_000
@@ -148,17 +412,27 @@ def create_url_logs(
 
 
 @logging_function(logger)
-def create_slack_payload(
+def create_slack_template(
+    *, log_group: str, log_stream: str, region: str, system_name: str
+) -> SlackPayloadTemplate:
+    return compile_slack_template(
+        system_name=system_name,
+        log_group=log_group,
+        log_stream=log_stream,
+        url_lambda=create_url_lambda(function_name=basename(log_group), region=region),
+    )
+
+
+@logging_function(logger)
+def render_slack_payload(
     *,
+    template: SlackPayloadTemplate,
     log_group: str,
     log_stream: str,
     region: str,
-    system_name: str,
-    log_event: CloudWatchLogsLogEvent,
+    group: LogMessageGroup,
 ) -> str:
-    function_name = basename(log_group)
-    log_message = parse_message(log_event=log_event)
-    url_lambda = create_url_lambda(function_name=function_name, region=region)
+    log_message = group.log_message
     url_logs = create_url_logs(
         region=region,
         log_group=log_group,
@@ -166,122 +440,147 @@ def create_slack_payload(
         timestamp=log_message.timestamp,
         function_request_id=log_message.lambda_request_id,
     )
-    blocks = [
-        {
-            "type": "section",
-            "text": {"type": "mrkdwn", "text": f"<!channel> `{datetime.now(tz=JST)}`"},
-        },
-        {"type": "divider"},
-        {
-            "type": "section",
-            "text": {"type": "mrkdwn", "text": f"*System Name:* `{system_name}`"},
-        },
-        {
-            "type": "section",
-            "text": {"type": "mrkdwn", "text": f"*Log Group:* `{log_group}`"},
-        },
-        {
-            "type": "section",
-            "text": {"type": "mrkdwn", "text": f"*Log Stream:* `{log_stream}`"},
-        },
-        {
-            "type": "section",
-            "text": {"type": "mrkdwn", "text": f"*Timestamp:* `{log_event.timestamp}`"},
-        },
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "*Datetime:* `{0}`".format(
-                    datetime.fromtimestamp(log_event.timestamp / 1000, tz=JST)
-                ),
-            },
-        },
-    ]
+    return template.render(
+        now=datetime.now(tz=JST),
+        timestamp=group.first_timestamp,
+        lambda_request_id=log_message.lambda_request_id,
+        url_logs=url_logs,
+        message=log_message.message,
+        error_message=log_message.error_message,
+        count=group.count,
+        last_timestamp=group.last_timestamp,
+        request_ids=group.request_ids,
+        suppressed=group.suppressed,
+        template_id=group.template_id,
+    )
 
-    if log_message.lambda_request_id is not None:
-        blocks.append(
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*Lambda Request ID:* `{log_message.lambda_request_id}`",
-                },
-            }
-        )
 
-    blocks += [
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*Lambda Console:* <{url_lambda}|link>",
-            },
-        },
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*CloudWatch Logs Link:* <{url_logs}|link>",
-            },
-        },
-        {"type": "section", "text": {"type": "mrkdwn", "text": "*Message:*"}},
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "```\n{0}\n```".format(log_message.message),
-            },
-        },
-    ]
+@logging_function(logger)
+def render_slack_digest_section(
+    *, log_group: str, log_stream: str, region: str, group: LogMessageGroup
+) -> str:
+    log_message = group.log_message
+    url_logs = create_url_logs(
+        region=region,
+        log_group=log_group,
+        log_stream=log_stream,
+        timestamp=log_message.timestamp,
+        function_request_id=log_message.lambda_request_id,
+    )
+    return render_digest_section(
+        timestamp=group.first_timestamp,
+        lambda_request_id=log_message.lambda_request_id,
+        url_logs=url_logs,
+        message=log_message.message,
+        error_message=log_message.error_message,
+        count=group.count,
+        suppressed=group.suppressed,
+        template_id=group.template_id,
+    )
 
-    if log_message.error_message is not None:
-        blocks += [
-            {"type": "section", "text": {"type": "mrkdwn", "text": "*Error Message:*"}},
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "```\n{0}\n```".format(log_message.error_message),
-                },
-            },
-        ]
 
-    return json.dumps({"blocks": blocks})
+@logging_function(logger)
+def create_slack_payload(
+    *,
+    log_group: str,
+    log_stream: str,
+    region: str,
+    system_name: str,
+    log_event: CloudWatchLogsLogEvent | LogEventRecord,
+) -> str:
+    template = create_slack_template(
+        log_group=log_group,
+        log_stream=log_stream,
+        region=region,
+        system_name=system_name,
+    )
+    return render_slack_payload(
+        template=template,
+        log_group=log_group,
+        log_stream=log_stream,
+        region=region,
+        group=LogMessageGroup.from_log_message(parse_message(log_event=log_event)),
+    )
 
 
 @logging_function(logger)
-def put_events(*, messages: list[str], event_bus_name: str, client: EventBridgeClient):
-    mapping_messages = {str(i): x for i, x in enumerate(messages)}
-    union_succeeded = set()
-    union_all = set(mapping_messages.keys())
-
-    while union_succeeded != union_all:
-        entries = []
-        keys = []
-        for k, v in mapping_messages.items():
-            if len(entries) == 10:
-                break
-            if k in union_succeeded:
-                continue
-            keys.append(k)
-            entries.append(
+def put_events(
+    *,
+    messages: Iterable[str],
+    event_bus_name: str,
+    client: EventBridgeClient | None = None,
+    max_workers: int = 4,
+    max_attempts: int = 5,
+    metrics: Metrics | None = None,
+    lag: LagTracker | None = None,
+    trace_header: bool = False,
+):
+    entries = (
+        (
+            str(i),
+            {
+                "Source": "a",
+                "DetailType": "a",
+                "Detail": (
+                    lag.embed_trace_header(str(i), m)
+                    if lag is not None and trace_header
+                    else embed_trace(m)
+                ),
+                "EventBusName": event_bus_name,
+            },
+        )
+        for i, m in enumerate(messages)
+    )
+    packer = EntryPacker()
+    chunks = packer.pack(entries)
+    first = next(chunks, None)
+    if first is None:
+        # nothing survived filtering: no client and no thread pool needed
+        report = DeliveryReport(chunks=())
+    else:
+        if client is None:
+            # sized so the delivery threads never wait on a pooled connection
+            client = create_client(
+                "events", max_pool_connections=max_workers, operations=("PutEvents",)
+            )
+        report = deliver_entries(
+            chunks=chain([first], chunks),
+            client=client,
+            max_workers=max_workers,
+            max_attempts=max_attempts,
+            before_send=(
+                lag.stamp_sent_at if lag is not None and trace_header else None
+            ),
+        )
+    logger.info(
+        "put events",
+        data={
+            "succeeded": len(report.succeeded),
+            "failed": len(report.failed),
+            "retries": report.retries,
+            "packing": packer.stats.as_dict(),
+            "chunks": [
                 {
-                    "Source": "a",
-                    "DetailType": "a",
-                    "Detail": v,
-                    "EventBusName": event_bus_name,
+                    "index": c.index,
+                    "size": c.size,
+                    "attempts": c.attempts,
+                    "duration": c.duration,
                 }
-            )
+                for c in report.chunks
+            ],
+            "pool": [x.as_dict() for x in get_pool_stats(client)],
+        },
+    )
+
+    if lag is not None:
+        lag.observe_delivery(report)
+    if metrics is not None:
+        metrics.count("EntriesDelivered", len(report.succeeded))
+        metrics.count("EntriesFailed", len(report.failed))
+        metrics.count("Retries", report.retries)
+        metrics.count("Requests", packer.stats.requests)
+        metrics.add("BytesSent", sum(packer.stats.bytes_per_request), MetricUnit.Bytes)
 
-        resp = client.put_events(Entries=entries)
-        failed_keys = []
-        for k, entry in zip(keys, resp["Entries"]):
-            if "EventId" in entry:
-                union_succeeded.add(k)
-            else:
-                failed_keys.append(k)
-
-        if len(failed_keys) > 0:
-            logger.warning("failed to put events", data={"failed index": failed_keys})
-            raise RuntimeError("has entries failed to put events")
+    if len(report.failed) > 0:
+        logger.warning("failed to put events", data={"failed index": report.failed})
+        raise RuntimeError("has entries failed to put events")
@@ -0,0 +1,115 @@
+import time
+from typing import TYPE_CHECKING
+from uuid import uuid7
+
+from utils.json_codec import dumps
+from utils.logger.latency import LatencyHistogram
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+    from utils.metrics import Metrics
+
+    from .decoder import LogEventRecord
+    from .delivery import DeliveryReport
+
+
+# valid json until stamped; as wide as epoch milliseconds
+SENT_AT_PLACEHOLDER = "null".ljust(13)
+SENT_AT_PREFIX = '"sent_at":'
+# the trace is always the last key of Detail. Quotes inside json strings are
+# escaped, so this can only match the key itself.
+TRACE_PREFIX = ',"trace":'
+
+
+def embed_trace(detail: str, trace: str = "null") -> str:
+    # the API destination binds $.detail.trace, so it is there even when tracing is off
+    return f"{detail[:-1]}{TRACE_PREFIX}{trace}}}"
+
+
+def split_trace(detail: str) -> tuple[str, str | None]:
+    i = detail.rfind(TRACE_PREFIX)
+    if i < 0:
+        return detail, None
+    return detail[:i] + "}", detail[i + len(TRACE_PREFIX) : -1]
+
+
+class LagTracker:
+    started_at: int
+    trace_id: str
+    sources: list[int]
+    ingest: LatencyHistogram
+    delivery: LatencyHistogram
+    metrics: Metrics | None
+
+    def __init__(
+        self, *, started_at: int | None = None, metrics: Metrics | None = None
+    ):
+        # epoch milliseconds, the same clock as the log event timestamps
+        self.started_at = int(time.time() * 1000) if started_at is None else started_at
+        self.trace_id = str(uuid7())
+        self.sources = []
+        self.ingest = LatencyHistogram()
+        self.delivery = LatencyHistogram()
+        self.metrics = metrics
+
+    def observe_ingest(self, timestamp: int):
+        lag = max(0, self.started_at - timestamp)
+        self.ingest.record(lag * 1_000_000)
+        if self.metrics is not None:
+            self.metrics.observe("IngestLag", lag)
+
+    def observe_events(
+        self, log_events: Iterable[LogEventRecord]
+    ) -> Iterator[LogEventRecord]:
+        for log_event in log_events:
+            self.observe_ingest(log_event.timestamp)
+            yield log_event
+
+    def track(self, items: Iterable[tuple[str, Sequence[int]]]) -> Iterator[str]:
+        # put_events numbers entries in this same order, so the index is the key
+        for detail, timestamps in items:
+            self.sources.append(min(timestamps, default=self.started_at))
+            yield detail
+
+    def observe_delivery(self, report: DeliveryReport):
+        for key, delivered_at in report.delivered_at.items():
+            lag = max(0, int(delivered_at * 1000) - self.sources[int(key)])
+            self.delivery.record(lag * 1_000_000)
+            if self.metrics is not None:
+                self.metrics.observe("DeliveryLag", lag)
+
+    def create_trace_header(self, key: str) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "entry": key,
+            "log_timestamp": self.sources[int(key)],
+            "handler_started_at": self.started_at,
+        }
+
+    def embed_trace_header(self, key: str, detail: str) -> str:
+        # sent_at is last, as a fixed width placeholder that stamp_sent_at fills in
+        # without changing the size the packer counted
+        header = dumps(self.create_trace_header(key))
+        return embed_trace(
+            detail, f"{header[:-1]},{SENT_AT_PREFIX}{SENT_AT_PLACEHOLDER}}}"
+        )
+
+    def stamp_sent_at(self, key: str, entry: dict) -> dict:
+        # called right before every put_events attempt, so retries move it too
+        detail = entry["Detail"]
+        start = detail.rfind(SENT_AT_PREFIX) + len(SENT_AT_PREFIX)
+        end = start + len(SENT_AT_PLACEHOLDER)
+        value = detail[start:end].strip()
+        if (
+            start < len(SENT_AT_PREFIX)
+            or detail[end:] != "}}"
+            or not (value == "null" or value.isdigit())
+        ):
+            # not the tail embed_trace_header wrote; leave it rather than break the json
+            return entry
+        sent_at = str(int(time.time() * 1000)).rjust(len(SENT_AT_PLACEHOLDER))
+        return {**entry, "Detail": detail[:start] + sent_at + detail[end:]}
+
+    def as_dict(self) -> dict:
+        return {"ingest": self.ingest.as_dict(), "delivery": self.delivery.as_dict()}
@@ -0,0 +1,172 @@
+import json
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from .lag import TRACE_PREFIX, embed_trace, split_trace
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from mypy_boto3_events.type_defs import PutEventsRequestEntryTypeDef
+
+# https://docs.aws.amazon.com/eventbridge/latest/userguide/eb-putevent-size.html
+MAX_ENTRIES_PER_REQUEST = 10
+MAX_BYTES_PER_REQUEST = 256 * 1024
+TIME_BYTES = 14
+TRUNCATION_MARKER = "\n... (truncated)"
+
+
+@dataclass
+class PackingStats:
+    entries_per_request: list[int] = field(default_factory=list)
+    bytes_per_request: list[int] = field(default_factory=list)
+    trimmed: int = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.entries_per_request)
+
+    @property
+    def entries(self) -> int:
+        return sum(self.entries_per_request)
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "entries": self.entries,
+            "trimmed": self.trimmed,
+            "entries_per_request": self.entries_per_request,
+            "bytes_per_request": self.bytes_per_request,
+        }
+
+
+@dataclass
+class _Bin:
+    items: list[tuple[str, PutEventsRequestEntryTypeDef]] = field(default_factory=list)
+    size: int = 0
+
+
+def compute_entry_size(entry: PutEventsRequestEntryTypeDef) -> int:
+    size = TIME_BYTES
+    for key in ["Source", "DetailType", "Detail"]:
+        if key in entry:
+            size += len(entry[key].encode())
+    for resource in entry.get("Resources", []):
+        size += len(resource.encode())
+    return size
+
+
+def trim_detail(detail: str, limit: int) -> str:
+    if len(detail.encode()) <= limit:
+        return detail
+    # the trace is forwarded as it is, so only the blocks in front of it are trimmed
+    body, trace = split_trace(detail)
+    if trace is None:
+        return trim_blocks(body, limit)
+    return embed_trace(
+        trim_blocks(body, limit - len(TRACE_PREFIX) - len(trace.encode())), trace
+    )
+
+
+def trim_blocks(detail: str, limit: int) -> str:
+    size = len(detail.encode())
+    if size <= limit:
+        return detail
+
+    try:
+        payload = json.loads(detail)
+        texts = [
+            b["text"]
+            for b in payload["blocks"]
+            if isinstance(b.get("text"), dict)
+            and isinstance(b["text"].get("text"), str)
+        ]
+    except Exception:
+        texts = []
+
+    while size > limit and len(texts) > 0:
+        longest = max(texts, key=lambda x: len(x["text"]))
+        text: str = longest["text"]
+        fence = "\n```" if text.endswith("\n```") else ""
+        keep = len(text) - (size - limit) - len(TRUNCATION_MARKER) - len(fence)
+        if keep <= 0:
+            break
+        longest["text"] = text[:keep] + TRUNCATION_MARKER + fence
+        detail = json.dumps(payload)
+        size = len(detail.encode())
+
+    if size <= limit:
+        return detail
+    return json.dumps(
+        {
+            "blocks": [
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"payload was dropped because it was too large ({size} bytes)",
+                    },
+                }
+            ]
+        }
+    )
+
+
+class EntryPacker:
+    max_entries: int
+    max_bytes: int
+    max_open_bins: int
+    stats: PackingStats
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = MAX_ENTRIES_PER_REQUEST,
+        max_bytes: int = MAX_BYTES_PER_REQUEST,
+        max_open_bins: int = 4,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_open_bins = max_open_bins
+        self.stats = PackingStats()
+
+    def pack(
+        self, entries: Iterable[tuple[str, PutEventsRequestEntryTypeDef]]
+    ) -> Iterator[list[tuple[str, PutEventsRequestEntryTypeDef]]]:
+        # first-fit over a small window of open bins so the input can stay lazy
+        bins: list[_Bin] = []
+        for key, entry in entries:
+            size = compute_entry_size(entry)
+            if size > self.max_bytes:
+                entry = {
+                    **entry,
+                    "Detail": trim_detail(
+                        entry["Detail"],
+                        self.max_bytes - (size - len(entry["Detail"].encode())),
+                    ),
+                }
+                size = compute_entry_size(entry)
+                self.stats.trimmed += 1
+
+            target = next((b for b in bins if b.size + size <= self.max_bytes), None)
+            if target is None:
+                target = _Bin()
+                bins.append(target)
+            target.items.append((key, entry))
+            target.size += size
+
+            if len(target.items) == self.max_entries:
+                bins.remove(target)
+                yield self._emit(target)
+            elif len(bins) > self.max_open_bins:
+                fullest = max(bins, key=lambda x: x.size)
+                bins.remove(fullest)
+                yield self._emit(fullest)
+
+        for b in bins:
+            yield self._emit(b)
+
+    def _emit(self, b: _Bin) -> list[tuple[str, PutEventsRequestEntryTypeDef]]:
+        self.stats.entries_per_request.append(len(b.items))
+        self.stats.bytes_per_request.append(b.size)
+        return b.items
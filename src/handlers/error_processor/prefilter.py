@@ -0,0 +1,66 @@
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from .decoder import LogEventRecord
+
+# a superset of the subscription filters in terraform/modules/lambda_function,
+# so nothing they forward is dropped here
+DEFAULT_MARKERS = (
+    "stack_trace",
+    "Traceback",
+    "Task timed out",
+    "Runtime exited",
+    "Runtime.ExitError",
+    "Runtime.ImportModuleError",
+)
+# regular expressions; `{ $.level = "ERROR" }` matches with any spacing
+DEFAULT_PATTERNS = (r'"level"\s*:\s*"(?:ERROR|CRITICAL)"',)
+
+
+@dataclass
+class PrefilterStats:
+    seen: int = 0
+    skipped: int = 0
+
+    @property
+    def passed(self) -> int:
+        return self.seen - self.skipped
+
+    def as_dict(self) -> dict:
+        return {"seen": self.seen, "skipped": self.skipped, "passed": self.passed}
+
+
+class Prefilter:
+    pattern: re.Pattern | None
+    stats: PrefilterStats
+
+    def __init__(
+        self,
+        *,
+        markers: Iterable[str] | None = DEFAULT_MARKERS,
+        patterns: Iterable[str] = DEFAULT_PATTERNS,
+    ):
+        # a single alternation scans each message once regardless of marker count;
+        # without markers the prefilter is disabled and the patterns are not used
+        markers = list(markers) if markers is not None else []
+        self.pattern = (
+            re.compile("|".join([*(re.escape(x) for x in markers), *patterns]))
+            if len(markers) > 0
+            else None
+        )
+        self.stats = PrefilterStats()
+
+    def match(self, message: str) -> bool:
+        return self.pattern is None or self.pattern.search(message) is not None
+
+    def filter(self, log_events: Iterable[LogEventRecord]) -> Iterator[LogEventRecord]:
+        for log_event in log_events:
+            self.stats.seen += 1
+            if self.match(log_event.message):
+                yield log_event
+            else:
+                self.stats.skipped += 1
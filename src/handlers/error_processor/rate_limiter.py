@@ -0,0 +1,268 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from hashlib import sha1
+from typing import TYPE_CHECKING, Any, Literal, Protocol
+
+from utils.logger import create_logger
+
+from .aggregator import create_group_key
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from botocore.client import BaseClient
+
+    from .aggregator import LogMessageGroup
+
+RateLimitBackend = Literal["none", "memory", "dynamodb"]
+
+logger = create_logger(__name__)
+
+
+@dataclass(frozen=True)
+class BucketState:
+    tokens: float
+    updated_at: float
+    suppressed: int
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    suppressed: int
+
+
+@dataclass
+class RateLimiterStats:
+    allowed: int = 0
+    suppressed: int = 0
+
+    def as_dict(self) -> dict:
+        return {"allowed": self.allowed, "suppressed": self.suppressed}
+
+
+class StateStoreError(Exception):
+    pass
+
+
+class StateStore(Protocol):
+    def load(self, key: str) -> tuple[BucketState | None, Any]: ...
+
+    def save(self, key: str, state: BucketState, version: Any) -> bool: ...
+
+
+class InMemoryStateStore:
+    max_size: int
+    ttl: float
+    clock: Callable[[], float]
+    _items: OrderedDict[str, tuple[float, BucketState]]
+    _lock: threading.Lock
+
+    def __init__(self, *, max_size: int = 1024, ttl: float = 3600, clock=time.time):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, key: str) -> tuple[BucketState | None, Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None, None
+            expires_at, state = item
+            if expires_at <= self.clock():
+                del self._items[key]
+                return None, None
+            self._items.move_to_end(key)
+            return state, None
+
+    def save(self, key: str, state: BucketState, version: Any) -> bool:
+        with self._lock:
+            self._items[key] = (self.clock() + self.ttl, state)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class DynamoDBStateStore:
+    table_name: str
+    client: BaseClient
+    ttl: float
+    clock: Callable[[], float]
+
+    def __init__(
+        self, *, table_name: str, client: BaseClient, ttl: float = 3600, clock=time.time
+    ):
+        self.table_name = table_name
+        self.client = client
+        self.ttl = ttl
+        self.clock = clock
+
+    def load(self, key: str) -> tuple[BucketState | None, Any]:
+        # botocore is already loaded by the client, so this costs nothing
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        try:
+            resp = self.client.get_item(
+                TableName=self.table_name, Key={"key": {"S": key}}, ConsistentRead=True
+            )
+        except (ClientError, BotoCoreError) as e:
+            raise StateStoreError(str(e)) from e
+        item = resp.get("Item")
+        if item is None:
+            return None, None
+        version = int(item["version"]["N"])
+        if float(item["expires_at"]["N"]) <= self.clock():
+            # DynamoDB TTL deletes lazily, so expired items can still be read
+            return None, version
+        state = BucketState(
+            tokens=float(item["tokens"]["N"]),
+            updated_at=float(item["updated_at"]["N"]),
+            suppressed=int(item["suppressed"]["N"]),
+        )
+        return state, version
+
+    def save(self, key: str, state: BucketState, version: Any) -> bool:
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        # optimistic locking so concurrent containers cannot lose each other's updates
+        condition = (
+            {"ConditionExpression": "attribute_not_exists(#key)"}
+            if version is None
+            else {
+                "ConditionExpression": "#version = :version",
+                "ExpressionAttributeValues": {":version": {"N": str(version)}},
+            }
+        )
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    "key": {"S": key},
+                    "tokens": {"N": str(state.tokens)},
+                    "updated_at": {"N": str(state.updated_at)},
+                    "suppressed": {"N": str(state.suppressed)},
+                    "version": {"N": str(0 if version is None else version + 1)},
+                    "expires_at": {"N": str(int(self.clock() + self.ttl))},
+                },
+                ExpressionAttributeNames=(
+                    {"#key": "key"} if version is None else {"#version": "version"}
+                ),
+                **condition,
+            )
+            return True
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return False
+        except (ClientError, BotoCoreError) as e:
+            raise StateStoreError(str(e)) from e
+
+
+def consume_token(
+    state: BucketState | None,
+    *,
+    now: float,
+    capacity: float,
+    refill_per_second: float,
+    weight: int = 1,
+) -> tuple[BucketState, RateLimitDecision]:
+    if state is None:
+        tokens = capacity
+        suppressed = 0
+    else:
+        elapsed = max(0.0, now - state.updated_at)
+        tokens = min(capacity, state.tokens + elapsed * refill_per_second)
+        suppressed = state.suppressed
+
+    if tokens >= 1:
+        return (
+            BucketState(tokens=tokens - 1, updated_at=now, suppressed=0),
+            RateLimitDecision(allowed=True, suppressed=suppressed),
+        )
+    return (
+        BucketState(tokens=tokens, updated_at=now, suppressed=suppressed + weight),
+        RateLimitDecision(allowed=False, suppressed=suppressed + weight),
+    )
+
+
+def create_fingerprint(*, log_group: str, group: LogMessageGroup) -> str:
+    # the bucket is shared by every container, so the key must not depend on what
+    # one container has seen: the normalized message, never the template id
+    key = create_group_key(group.log_message, "error_message")
+    return sha1(f"{log_group}\n{key}".encode()).hexdigest()
+
+
+class RateLimiter:
+    store: StateStore
+    capacity: float
+    refill_per_second: float
+    max_attempts: int
+    clock: Callable[[], float]
+    stats: RateLimiterStats
+
+    def __init__(
+        self,
+        *,
+        store: StateStore,
+        capacity: float = 5,
+        refill_per_second: float = 1 / 60,
+        max_attempts: int = 3,
+        clock=time.time,
+    ):
+        self.store = store
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self.stats = RateLimiterStats()
+
+    def acquire(self, key: str, *, weight: int = 1) -> RateLimitDecision:
+        try:
+            for _ in range(self.max_attempts):
+                state, version = self.store.load(key)
+                new_state, decision = consume_token(
+                    state,
+                    now=self.clock(),
+                    capacity=self.capacity,
+                    refill_per_second=self.refill_per_second,
+                    weight=weight,
+                )
+                if self.store.save(key, new_state, version):
+                    return decision
+        except StateStoreError as e:
+            # throttled, denied, missing table, timed out: alerting wins over suppression
+            logger.warning(
+                f"rate limit state store is unavailable: {e}",
+                exc_info=True,
+                data={"key": key, "ErrorType": str(type(e.__cause__))},
+            )
+            return RateLimitDecision(allowed=True, suppressed=0)
+        # the state store is contended; alerting wins over suppression
+        logger.warning("failed to update rate limit state", data={"key": key})
+        return RateLimitDecision(allowed=True, suppressed=0)
+
+    def filter(
+        self, groups: Iterable[LogMessageGroup], *, log_group: str
+    ) -> Iterator[LogMessageGroup]:
+        for group in groups:
+            decision = self.acquire(
+                create_fingerprint(log_group=log_group, group=group), weight=group.count
+            )
+            if decision.allowed:
+                self.stats.allowed += 1
+                yield replace(group, suppressed=decision.suppressed)
+            else:
+                self.stats.suppressed += 1
+
+
+@functools.lru_cache(maxsize=None)
+def get_in_memory_state_store(*, max_size: int, ttl: float) -> InMemoryStateStore:
+    # cached so warm invocations of the same container share the buckets
+    return InMemoryStateStore(max_size=max_size, ttl=ttl)
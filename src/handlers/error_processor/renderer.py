@@ -0,0 +1,161 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from json.encoder import encode_basestring_ascii
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+JST = timezone(offset=timedelta(hours=+9), name="JST")
+
+# fragments of json.dumps({"blocks": [...]}) with the default separators
+SECTION_PREFIX = '{"type": "section", "text": {"type": "mrkdwn", "text": '
+SECTION_SUFFIX = "}}"
+BLOCK_SEPARATOR = ", "
+DIVIDER = json.dumps({"type": "divider"})
+
+# https://api.slack.com/reference/block-kit/blocks#section
+SLACK_MAX_BLOCKS = 50
+SLACK_MAX_SECTION_TEXT = 3000
+DIGEST_HEADER_BLOCKS = 6
+
+
+def render_section(text: str) -> str:
+    return SECTION_PREFIX + encode_basestring_ascii(text) + SECTION_SUFFIX
+
+
+BLOCK_MESSAGE = render_section("*Message:*")
+BLOCK_ERROR_MESSAGE = render_section("*Error Message:*")
+
+
+@dataclass(frozen=True)
+class SlackPayloadTemplate:
+    block_system_name: str
+    block_log_group: str
+    block_log_stream: str
+    block_lambda_console: str
+
+    def render(
+        self,
+        *,
+        now: datetime,
+        timestamp: int,
+        lambda_request_id: str | None,
+        url_logs: str,
+        message: str,
+        error_message: str | None,
+        count: int = 1,
+        last_timestamp: int | None = None,
+        request_ids: Sequence[str] = (),
+        suppressed: int = 0,
+        template_id: str | None = None,
+    ) -> str:
+        blocks = [
+            render_section(f"<!channel> `{now}`"),
+            DIVIDER,
+            self.block_system_name,
+            self.block_log_group,
+            self.block_log_stream,
+            render_section(f"*Timestamp:* `{timestamp}`"),
+            render_section(
+                "*Datetime:* `{0}`".format(
+                    datetime.fromtimestamp(timestamp / 1000, tz=JST)
+                )
+            ),
+        ]
+        if lambda_request_id is not None:
+            blocks.append(render_section(f"*Lambda Request ID:* `{lambda_request_id}`"))
+        if count > 1:
+            blocks.append(
+                render_section(
+                    "*Occurrences:* `{0}` (`{1}` - `{2}`)".format(
+                        count,
+                        datetime.fromtimestamp(timestamp / 1000, tz=JST),
+                        datetime.fromtimestamp(
+                            (last_timestamp or timestamp) / 1000, tz=JST
+                        ),
+                    )
+                )
+            )
+        if len(request_ids) > 1:
+            blocks.append(
+                render_section(
+                    "*Sample Request IDs:* " + ", ".join(f"`{x}`" for x in request_ids)
+                )
+            )
+        if template_id is not None:
+            blocks.append(render_section(f"*Template ID:* `{template_id}`"))
+        if suppressed > 0:
+            blocks.append(
+                render_section(
+                    f"*Suppressed:* `{suppressed}` similar alerts since the last notification"
+                )
+            )
+        blocks += [
+            self.block_lambda_console,
+            render_section(f"*CloudWatch Logs Link:* <{url_logs}|link>"),
+            BLOCK_MESSAGE,
+            render_section("```\n{0}\n```".format(message)),
+        ]
+        if error_message is not None:
+            blocks += [
+                BLOCK_ERROR_MESSAGE,
+                render_section("```\n{0}\n```".format(error_message)),
+            ]
+        return '{"blocks": [' + BLOCK_SEPARATOR.join(blocks) + "]}"
+
+    def render_digest(self, *, now: datetime, sections: Sequence[str]) -> str:
+        blocks = [
+            render_section(f"<!channel> `{now}` *Errors:* `{len(sections)}`"),
+            DIVIDER,
+            self.block_system_name,
+            self.block_log_group,
+            self.block_log_stream,
+            self.block_lambda_console,
+            *sections,
+        ]
+        return '{"blocks": [' + BLOCK_SEPARATOR.join(blocks) + "]}"
+
+
+def render_digest_section(
+    *,
+    timestamp: int,
+    lambda_request_id: str | None,
+    url_logs: str,
+    message: str,
+    error_message: str | None,
+    count: int = 1,
+    suppressed: int = 0,
+    template_id: str | None = None,
+) -> str:
+    # one section per error so a digest spends a single block on each
+    fields = [
+        f"*<{url_logs}|Logs>*",
+        "`{0}`".format(datetime.fromtimestamp(timestamp / 1000, tz=JST)),
+    ]
+    if lambda_request_id is not None:
+        fields.append(f"*Request ID:* `{lambda_request_id}`")
+    if count > 1:
+        fields.append(f"*Occurrences:* `{count}`")
+    if suppressed > 0:
+        fields.append(f"*Suppressed:* `{suppressed}`")
+    if template_id is not None:
+        fields.append(f"*Template ID:* `{template_id}`")
+    head = " ".join(fields)
+    body = message if error_message is None else f"{message}\n{error_message}"
+    room = SLACK_MAX_SECTION_TEXT - len(head) - len("\n```\n\n```")
+    if len(body) > room:
+        body = body[: max(0, room - 3)] + "..."
+    return render_section(f"{head}\n```\n{body}\n```")
+
+
+def compile_slack_template(
+    *, system_name: str, log_group: str, log_stream: str, url_lambda: str
+) -> SlackPayloadTemplate:
+    return SlackPayloadTemplate(
+        block_system_name=render_section(f"*System Name:* `{system_name}`"),
+        block_log_group=render_section(f"*Log Group:* `{log_group}`"),
+        block_log_stream=render_section(f"*Log Stream:* `{log_stream}`"),
+        block_lambda_console=render_section(f"*Lambda Console:* <{url_lambda}|link>"),
+    )
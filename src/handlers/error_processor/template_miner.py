@@ -0,0 +1,156 @@
+import functools
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from hashlib import sha1
+
+# Drain: https://jiemingzhu.github.io/pub/pjhe_icws2017.pdf
+WILDCARD = "<*>"
+PATTERN_VARIABLE = re.compile(r"\d")
+
+
+@dataclass(frozen=True)
+class LogTemplate:
+    template_id: str
+    template: str
+    size: int
+
+
+@dataclass
+class _Node:
+    children: dict[str, _Node] = field(default_factory=dict)
+    clusters: list[_Cluster] = field(default_factory=list)
+
+
+@dataclass(eq=False)
+class _Cluster:
+    key: int
+    template_id: str
+    tokens: list[str]
+    size: int
+    path: list[tuple[_Node, str]]
+
+
+def tokenize(message: str) -> list[str]:
+    return [WILDCARD if PATTERN_VARIABLE.search(x) else x for x in message.split()]
+
+
+def compute_similarity(template: list[str], tokens: list[str]) -> tuple[float, int]:
+    if len(tokens) == 0:
+        return 1.0, 0
+    same = 0
+    wildcards = 0
+    for a, b in zip(template, tokens):
+        if a == WILDCARD:
+            wildcards += 1
+        elif a == b:
+            same += 1
+    return same / len(tokens), wildcards
+
+
+class TemplateMiner:
+    depth: int
+    similarity_threshold: float
+    max_children: int
+    max_clusters: int
+    _root: _Node
+    _clusters: OrderedDict[int, _Cluster]
+    _next_key: int
+
+    def __init__(
+        self,
+        *,
+        depth: int = 4,
+        similarity_threshold: float = 0.4,
+        max_children: int = 100,
+        max_clusters: int = 1000,
+    ):
+        self.depth = depth
+        self.similarity_threshold = similarity_threshold
+        self.max_children = max_children
+        self.max_clusters = max_clusters
+        self._root = _Node()
+        self._clusters = OrderedDict()
+        self._next_key = 0
+
+    def __len__(self) -> int:
+        return len(self._clusters)
+
+    def add(self, message: str) -> LogTemplate:
+        tokens = tokenize(message)
+        leaf, path = self._find_leaf(tokens)
+
+        cluster = self._match(leaf, tokens)
+        if cluster is None:
+            self._next_key += 1
+            cluster = _Cluster(
+                key=self._next_key,
+                # derived from the first message this container saw for the
+                # template, so it is container-local: another container, or this
+                # one after eviction, may give the same template another id
+                template_id=sha1(" ".join(tokens).encode()).hexdigest()[:16],
+                tokens=tokens,
+                size=1,
+                path=path,
+            )
+            leaf.clusters.append(cluster)
+            self._clusters[cluster.key] = cluster
+            if len(self._clusters) > self.max_clusters:
+                self._evict()
+        else:
+            cluster.tokens = [
+                a if a == b else WILDCARD for a, b in zip(cluster.tokens, tokens)
+            ]
+            cluster.size += 1
+            self._clusters.move_to_end(cluster.key)
+
+        return LogTemplate(
+            template_id=cluster.template_id,
+            template=" ".join(cluster.tokens),
+            size=cluster.size,
+        )
+
+    def _find_leaf(self, tokens: list[str]) -> tuple[_Node, list[tuple[_Node, str]]]:
+        node = self._root
+        path = []
+        for token in [str(len(tokens)), *tokens[: self.depth - 2]]:
+            if token not in node.children and len(node.children) >= self.max_children:
+                token = WILDCARD
+            path.append((node, token))
+            node = node.children.setdefault(token, _Node())
+        return node, path
+
+    def _match(self, leaf: _Node, tokens: list[str]) -> _Cluster | None:
+        best = None
+        best_score = (-1.0, -1)
+        for cluster in leaf.clusters:
+            score = compute_similarity(cluster.tokens, tokens)
+            if score > best_score:
+                best, best_score = cluster, score
+        if best is None or best_score[0] < self.similarity_threshold:
+            return None
+        return best
+
+    def _evict(self):
+        _, cluster = self._clusters.popitem(last=False)
+        parent, token = cluster.path[-1]
+        leaf = parent.children[token]
+        leaf.clusters.remove(cluster)
+        # prune the now empty branch so the tree stays bounded as well
+        for parent, token in reversed(cluster.path):
+            node = parent.children[token]
+            if len(node.children) > 0 or len(node.clusters) > 0:
+                break
+            del parent.children[token]
+
+
+@functools.lru_cache(maxsize=None)
+def get_template_miner(
+    *, depth: int, similarity_threshold: float, max_clusters: int
+) -> TemplateMiner:
+    # cached so the templates keep growing across warm invocations
+    return TemplateMiner(
+        depth=depth,
+        similarity_threshold=similarity_threshold,
+        max_clusters=max_clusters,
+    )
@@ -1,3 +1,18 @@
-from .aws import BOTOCORE_CONFIG_DEFAULT, create_client, create_resource
+from .aws import create_client, create_resource, get_default_config, get_session
+from .pool import PoolStats, get_pool_stats
 
-__all__ = ["BOTOCORE_CONFIG_DEFAULT", "create_client", "create_resource"]
+__all__ = [
+    "BOTOCORE_CONFIG_DEFAULT",
+    "PoolStats",
+    "create_client",
+    "create_resource",
+    "get_default_config",
+    "get_pool_stats",
+    "get_session",
+]
+
+
+def __getattr__(name: str):
+    if name == "BOTOCORE_CONFIG_DEFAULT":
+        return get_default_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from utils.logger import register_flush_hook
+from utils.logger.latency import LatencyHistogram
+
+from .pool import get_connection_pool, is_pool_exhausted
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+    from utils.logger.logger import Logger
+
+# botocore.retries.standard.ThrottledRetryableChecker._THROTTLED_ERROR_CODES
+THROTTLING_ERROR_CODES = frozenset(
+    {
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestThrottledException",
+        "TooManyRequestsException",
+        "ProvisionedThroughputExceededException",
+        "TransactionInProgressException",
+        "RequestLimitExceeded",
+        "BandwidthLimitExceeded",
+        "LimitExceededException",
+        "RequestThrottled",
+        "SlowDown",
+        "PriorRequestNotComplete",
+        "EC2ThrottledException",
+    }
+)
+
+# keys in botocore's per-call request context
+CONTEXT_STARTED_AT = "api_stats_started_at"
+CONTEXT_ATTEMPTS = "api_stats_attempts"
+
+
+@dataclass
+class OperationStats:
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    throttles: int = 0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    pool_exhausted: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "throttles": self.throttles,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "pool_exhausted": self.pool_exhausted,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class ApiStatsRegistry:
+    _operations: dict[str, OperationStats]
+    _lock: threading.Lock
+
+    def __init__(self):
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> OperationStats:
+        stats = self._operations.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._operations.setdefault(name, OperationStats())
+        return stats
+
+    def update(self, name: str, **deltas: int):
+        # clients are shared across the delivery threads
+        stats = self.get(name)
+        with self._lock:
+            for key, delta in deltas.items():
+                setattr(stats, key, getattr(stats, key) + delta)
+
+    def drain(self) -> dict[str, OperationStats]:
+        with self._lock:
+            operations = self._operations
+            self._operations = {}
+        return operations
+
+
+registry = ApiStatsRegistry()
+
+
+def is_api_stats_enabled() -> bool:
+    return os.getenv("AWS_API_STATS", "true").lower() not in ("false", "0", "off")
+
+
+def count_bytes(body) -> int:
+    return len(body) if isinstance(body, (bytes, bytearray, str)) else 0
+
+
+def get_operation_name(event_name: str) -> str:
+    # e.g. "after-call.eventbridge.PutEvents" -> "eventbridge.PutEvents"
+    return event_name.split(".", 1)[1]
+
+
+def on_before_call(*, event_name: str, params: dict, context: dict, **kwargs):
+    context[CONTEXT_STARTED_AT] = time.perf_counter_ns()
+    context[CONTEXT_ATTEMPTS] = 0
+    registry.update(
+        get_operation_name(event_name),
+        request_bytes=count_bytes(params.get("body")),
+    )
+
+
+def on_response_received(
+    *,
+    event_name: str,
+    response_dict: dict | None,
+    parsed_response: dict | None,
+    context: dict,
+    **kwargs,
+):
+    # fired once per attempt, so retries and throttled attempts are visible here
+    context[CONTEXT_ATTEMPTS] = context.get(CONTEXT_ATTEMPTS, 0) + 1
+    error_code = (parsed_response or {}).get("Error", {}).get("Code")
+    registry.update(
+        get_operation_name(event_name),
+        throttles=int(error_code in THROTTLING_ERROR_CODES),
+        response_bytes=count_bytes((response_dict or {}).get("body")),
+    )
+
+
+def record_call(event_name: str, context: dict, *, error: bool):
+    started_at = context.pop(CONTEXT_STARTED_AT, None)
+    attempts = context.pop(CONTEXT_ATTEMPTS, 0)
+    name = get_operation_name(event_name)
+    registry.update(name, calls=1, errors=int(error), retries=max(0, attempts - 1))
+    if started_at is not None:
+        registry.get(name).latency.record(time.perf_counter_ns() - started_at)
+
+
+def on_after_call(*, event_name: str, http_response, context: dict, **kwargs):
+    record_call(event_name, context, error=http_response.status_code >= 300)
+
+
+def on_after_call_error(*, event_name: str, context: dict, **kwargs):
+    record_call(event_name, context, error=True)
+
+
+def register_api_stats(client: BaseClient):
+    def on_before_send(*, event_name: str, request, **kwargs):
+        # checked per attempt, right before urllib3 takes a connection
+        pool = get_connection_pool(client, request.url)
+        registry.update(
+            get_operation_name(event_name),
+            pool_exhausted=int(pool is not None and is_pool_exhausted(pool)),
+        )
+
+    events = client.meta.events
+    events.register("before-call", on_before_call)
+    events.register("before-send", on_before_send)
+    events.register("response-received", on_response_received)
+    events.register("after-call", on_after_call)
+    events.register("after-call-error", on_after_call_error)
+
+
+def flush_api_stats(logger: Logger):
+    operations = {k: v for k, v in registry.drain().items() if v.calls > 0}
+    if len(operations) == 0:
+        return
+    logger.info(
+        "aws api calls",
+        data={k: v.as_dict() for k, v in sorted(operations.items())},
+    )
+
+
+register_flush_hook(flush_api_stats)
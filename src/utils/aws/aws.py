@@ -1,33 +1,181 @@
 import functools
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-import boto3
-from boto3.resources.base import ServiceResource
-from botocore.client import BaseClient
-from botocore.config import Config
-
+from utils import json_codec
 from utils.logger import create_logger, logging_function
 
-BOTOCORE_CONFIG_DEFAULT = Config(
-    connect_timeout=5, read_timeout=5, retries={"mode": "standard"}
-)
+from .api_stats import is_api_stats_enabled, register_api_stats
+from .pool import DEFAULT_MAX_POOL_CONNECTIONS
+
+if TYPE_CHECKING:
+    from boto3 import Session
+    from boto3.resources.base import ServiceResource
+    from botocore.client import BaseClient
+    from botocore.config import Config
+
+# built by `make build-botocore-models` and shipped inside the deploy package
+DIR_BOTOCORE_MODELS = Path(__file__).parents[2] / "botocore_models"
 
 logger = create_logger(__name__)
 
 
+def __getattr__(name: str):
+    # boto3 and botocore cost ~200 ms to import, so defer them until first use
+    if name == "BOTOCORE_CONFIG_DEFAULT":
+        return get_default_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 @functools.lru_cache(maxsize=None)
-@logging_function(logger)
-def create_client(name: str, *, config: Config | None = None, **kwargs) -> BaseClient:
-    return boto3.client(
-        name, config=BOTOCORE_CONFIG_DEFAULT if config is None else config, **kwargs
+def get_default_config() -> Config:
+    from botocore.config import Config
+
+    # keep-alive stops idle pooled connections from being dropped between invocations
+    return Config(
+        connect_timeout=5,
+        read_timeout=5,
+        retries={"mode": "standard"},
+        tcp_keepalive=True,
+    )
+
+
+def resolve_config(
+    config: Config | None, *, max_pool_connections: int | None = None
+) -> Config:
+    config = get_default_config() if config is None else config
+    if max_pool_connections is None:
+        return config
+
+    from botocore.config import Config
+
+    # one connection per concurrent caller, never below botocore's default
+    return config.merge(
+        Config(
+            max_pool_connections=max(max_pool_connections, DEFAULT_MAX_POOL_CONNECTIONS)
+        )
     )
 
 
-# boto3 resources are not thread-safe; avoid sharing cached instances across threads.
+@functools.lru_cache(maxsize=None)
+def get_session() -> Session:
+    import boto3
+
+    return boto3.Session()
+
+
+@functools.lru_cache(maxsize=None)
+def get_trimmed_session() -> Session:
+    import boto3
+    import botocore.session
+
+    session = botocore.session.get_session()
+    # searched before botocore's own data, so the trimmed models are parsed
+    # instead of the full ones
+    session.set_config_variable("data_path", str(DIR_BOTOCORE_MODELS))
+    return boto3.Session(botocore_session=session)
+
+
+@functools.lru_cache(maxsize=None)
+def get_trimmed_operations() -> dict[str, frozenset[str]]:
+    from botocore.loaders import Loader
+
+    path = DIR_BOTOCORE_MODELS / "manifest.json"
+    if not path.is_file():
+        logger.info("trimmed botocore models are not built", data={"path": str(path)})
+        return {}
+    manifest = json_codec.loads(path.read_bytes())
+    # the runtime's botocore rarely matches the build's exactly, so each service is
+    # kept while its bundled model is still the api version that was trimmed
+    loader = Loader()
+    operations = {}
+    for name, service in manifest["services"].items():
+        api_version = loader.determine_latest_version(name, "service-2")
+        if api_version != service["api_version"]:
+            logger.warning(
+                "trimmed botocore model is skipped",
+                data={
+                    "service": name,
+                    "trimmed": service["api_version"],
+                    "runtime": api_version,
+                },
+            )
+            continue
+        operations[name] = frozenset(service["operations"])
+    return operations
+
+
+def select_session(name: str, operations: tuple[str, ...] | None) -> Session:
+    # trimmed models are opt-in: only a caller that lists every operation it
+    # calls gets them, and only when the build kept all of those operations
+    if operations is not None and get_trimmed_operations().get(
+        name, frozenset()
+    ).issuperset(operations):
+        return get_trimmed_session()
+    return get_session()
+
+
+# clients are thread-safe, so one per argument set is shared by every thread.
+# pass the caller's concurrency as max_pool_connections when sharing across threads.
 @functools.lru_cache(maxsize=None)
 @logging_function(logger)
+def create_client(
+    name: str,
+    *,
+    config: Config | None = None,
+    max_pool_connections: int | None = None,
+    operations: tuple[str, ...] | None = None,
+    **kwargs,
+) -> BaseClient:
+    client = select_session(name, operations).client(
+        name,
+        config=resolve_config(config, max_pool_connections=max_pool_connections),
+        **kwargs,
+    )
+    if is_api_stats_enabled():
+        register_api_stats(client)
+    return client
+
+
+_local = threading.local()
+
+
+# boto3 resources and sessions are not thread-safe, so each thread builds and
+# caches its own. resources use a plain session: their actions need the full
+# service models.
 def create_resource(
-    name: str, *, config: Config | None = None, **kwargs
+    name: str,
+    *,
+    config: Config | None = None,
+    max_pool_connections: int | None = None,
+    **kwargs,
 ) -> ServiceResource:
-    return boto3.resource(
-        name, config=BOTOCORE_CONFIG_DEFAULT if config is None else config, **kwargs
+    resources = _local.__dict__.setdefault("resources", {})
+    key = (name, config, max_pool_connections, tuple(sorted(kwargs.items())))
+    resource = resources.get(key)
+    if resource is None:
+        resource = resources[key] = _create_resource(
+            name, config=config, max_pool_connections=max_pool_connections, **kwargs
+        )
+    return resource
+
+
+@logging_function(logger)
+def _create_resource(
+    name: str,
+    *,
+    config: Config | None = None,
+    max_pool_connections: int | None = None,
+    **kwargs,
+) -> ServiceResource:
+    import boto3
+
+    resource = boto3.session.Session().resource(
+        name,
+        config=resolve_config(config, max_pool_connections=max_pool_connections),
+        **kwargs,
     )
+    if is_api_stats_enabled():
+        register_api_stats(resource.meta.client)
+    return resource
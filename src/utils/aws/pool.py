@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+    from urllib3 import HTTPConnectionPool, PoolManager
+
+# botocore.endpoint.MAX_POOL_CONNECTIONS
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    host: str
+    max_size: int
+    idle: int
+    in_use: int
+    # opened over the pool's lifetime; beyond max_size means the pool overflowed
+    connections: int
+    requests: int
+
+    def as_dict(self) -> dict:
+        return {
+            "host": self.host,
+            "max_size": self.max_size,
+            "idle": self.idle,
+            "in_use": self.in_use,
+            "connections": self.connections,
+            "requests": self.requests,
+        }
+
+
+def get_pool_manager(client: BaseClient) -> PoolManager | None:
+    # botocore keeps its urllib3 PoolManager private; bail out on anything else
+    endpoint = getattr(client, "_endpoint", None)
+    http_session = getattr(endpoint, "http_session", None)
+    return getattr(http_session, "_manager", None)
+
+
+def get_connection_pool(client: BaseClient, url: str) -> HTTPConnectionPool | None:
+    manager = get_pool_manager(client)
+    return None if manager is None else manager.connection_from_url(url)
+
+
+def is_pool_exhausted(pool: HTTPConnectionPool) -> bool:
+    # botocore pools never block: an empty queue means the next request opens
+    # a connection that is discarded afterwards instead of waiting for one
+    return pool.pool is not None and pool.pool.qsize() == 0
+
+
+def get_pool_stats(client: BaseClient) -> list[PoolStats]:
+    manager = get_pool_manager(client)
+    if manager is None:
+        return []
+    stats = []
+    for key in list(manager.pools.keys()):
+        pool = manager.pools.get(key)
+        if pool is None or pool.pool is None:
+            continue
+        queued = list(pool.pool.queue)
+        stats.append(
+            PoolStats(
+                host=pool.host,
+                max_size=pool.pool.maxsize,
+                idle=sum(1 for x in queued if x is not None),
+                in_use=pool.pool.maxsize - len(queued),
+                connections=pool.num_connections,
+                requests=pool.num_requests,
+            )
+        )
+    return stats
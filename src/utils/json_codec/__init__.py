@@ -0,0 +1,3 @@
+from .json_codec import BACKEND, RawJson, dumps, dumps_bytes, loads
+
+__all__ = ["BACKEND", "RawJson", "dumps", "dumps_bytes", "loads"]
@@ -0,0 +1,82 @@
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "json" if orjson is None else "orjson"
+
+if orjson is not None:
+    # leave datetime and dataclass to `default` so output matches the stdlib backend
+    ORJSON_OPTION = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+class RawJson:
+    # JSON encoded earlier, embedded as is instead of being decoded and encoded again
+    __slots__ = ("data",)
+    data: bytes
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def encode(self) -> Any:
+        # for a `default` hook; the stdlib has no raw values, so it pays the decode
+        if orjson is not None:
+            return orjson.Fragment(self.data)
+        return json.loads(self.data)
+
+
+def loads(s: str | bytes | bytearray) -> Any:
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
+
+
+def stdlib_default(
+    default: Callable[[Any], Any] | None,
+) -> Callable[[Any], Any] | None:
+    if default is None:
+        return None
+
+    # `default` may turn RawJson into an orjson.Fragment, which the stdlib cannot write
+    def wrapped(obj):
+        if isinstance(obj, RawJson):
+            return json.loads(obj.data)
+        return default(obj)
+
+    return wrapped
+
+
+def dumps_bytes(obj: Any, *, default: Callable[[Any], Any] | None = None) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=ORJSON_OPTION)
+        except TypeError:
+            # e.g. integers wider than 64 bits; the stdlib handles them
+            pass
+    return json.dumps(
+        obj,
+        default=stdlib_default(default),
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode()
+
+
+def dumps(obj: Any, *, default: Callable[[Any], Any] | None = None) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=ORJSON_OPTION).decode()
+        except TypeError:
+            pass
+    return json.dumps(
+        obj,
+        default=stdlib_default(default),
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
@@ -1,5 +1,12 @@
 from .create_logger import create_logger
+from .lazy import lazy
 from .logging_function import logging_function
-from .logging_handler import logging_handler
+from .logging_handler import logging_handler, register_flush_hook
 
-__all__ = ["create_logger", "logging_function", "logging_handler"]
+__all__ = [
+    "create_logger",
+    "lazy",
+    "logging_function",
+    "logging_handler",
+    "register_flush_hook",
+]
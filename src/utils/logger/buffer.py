@@ -0,0 +1,66 @@
+import logging
+import os
+import sys
+
+# the buffer is written out as soon as it holds this much
+DEFAULT_MAX_BYTES = 256 * 1024
+
+
+# Records held in the buffer are lost when the runtime is killed before the flush
+# at the end of the invocation: a timeout, an out-of-memory kill or a crash. Those
+# are the lines leading up to "Task timed out", so keep LOG_BUFFERED off for
+# functions whose failures have to be diagnosed from their logs.
+def is_buffer_enabled() -> bool:
+    return os.getenv("LOG_BUFFERED", "false").lower() in ("true", "1", "on")
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    max_bytes: int
+    _buffer: list[str]
+    _size: int
+
+    def __init__(self, stream=None, *, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(stream)
+        self.max_bytes = max_bytes
+        self._buffer = []
+        self._size = 0
+
+    def emit(self, record: logging.LogRecord):
+        # Handler.handle holds self.lock around emit
+        try:
+            line = self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return
+        self._buffer.append(line)
+        self._size += len(line)
+        if self._size >= self.max_bytes:
+            try:
+                self._write()
+            except Exception:
+                self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            self._write()
+
+    def _write(self):
+        if len(self._buffer) > 0:
+            # one write per chunk instead of one per record
+            chunk = "".join(self._buffer)
+            # dropped even if the write fails, so a broken stream cannot grow the buffer
+            self._buffer.clear()
+            self._size = 0
+            self.stream.write(chunk)
+        if hasattr(self.stream, "flush"):
+            self.stream.flush()
+
+
+def create_handler() -> logging.Handler | None:
+    if not is_buffer_enabled():
+        # Powertools falls back to its own unbuffered stdout handler
+        return None
+    return BufferedStreamHandler(
+        sys.stdout,
+        max_bytes=int(os.getenv("LOG_BUFFER_MAX_BYTES", DEFAULT_MAX_BYTES)),
+    )
@@ -0,0 +1,98 @@
+import os
+import random
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from hashlib import sha256
+from logging import DEBUG
+from typing import TYPE_CHECKING, Any
+
+from utils.json_codec import RawJson, dumps_bytes
+
+from .logger import parse_level
+from .serializer import custom_default
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+
+@dataclass(frozen=True)
+class CapturePolicy:
+    # events up to this size are logged as they are
+    max_inline_bytes: int = 16 * 1024
+    # bytes of the serialized event kept from each end when it is not inlined
+    preview_bytes: int = 512
+    # share of invocations whose event is captured at all
+    sample_rate: float = 1.0
+    # oversized events are written here when set, and only referenced in the log
+    offload_bucket: str | None = None
+    offload_prefix: str = "events/"
+    # logged at this level, independent of the rest of the handler's DEBUG records
+    level: int = DEBUG
+
+    @classmethod
+    def from_env(cls) -> CapturePolicy:
+        return cls(
+            max_inline_bytes=int(
+                os.getenv("EVENT_CAPTURE_MAX_INLINE_BYTES", cls.max_inline_bytes)
+            ),
+            preview_bytes=int(
+                os.getenv("EVENT_CAPTURE_PREVIEW_BYTES", cls.preview_bytes)
+            ),
+            sample_rate=float(os.getenv("EVENT_CAPTURE_SAMPLE_RATE", cls.sample_rate)),
+            offload_bucket=os.getenv("EVENT_CAPTURE_BUCKET") or None,
+            offload_prefix=os.getenv("EVENT_CAPTURE_PREFIX", cls.offload_prefix),
+            level=parse_level(os.getenv("EVENT_CAPTURE_LEVEL", cls.level)),
+        )
+
+    def is_sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+
+def get_s3_client() -> BaseClient:
+    # utils.aws logs through this package, and boto3 is only worth importing
+    # once an event actually has to be offloaded
+    from utils.aws import create_client
+
+    return create_client("s3", operations=("PutObject",))
+
+
+def create_offload_key(policy: CapturePolicy, request_id: str) -> str:
+    return f"{policy.offload_prefix}{datetime.now(UTC):%Y/%m/%d}/{request_id}.json"
+
+
+def offload_event(payload: bytes, *, bucket: str, key: str, client=None):
+    client = get_s3_client() if client is None else client
+    client.put_object(
+        Bucket=bucket, Key=key, Body=payload, ContentType="application/json"
+    )
+
+
+def create_preview(payload: bytes, size: int) -> dict[str, str]:
+    # cut bytes may split a character; the preview is for reading, not decoding
+    return {
+        "head": payload[:size].decode(errors="replace"),
+        "tail": payload[-size:].decode(errors="replace"),
+    }
+
+
+def capture_event(event: Any, *, policy: CapturePolicy, request_id: str) -> Any:
+    payload = dumps_bytes(event, default=custom_default)
+    if len(payload) <= policy.max_inline_bytes:
+        # the record embeds these bytes, so the event is serialized only once
+        return RawJson(payload)
+
+    captured: dict[str, Any] = {
+        "size": len(payload),
+        "sha256": sha256(payload).hexdigest(),
+    }
+    if policy.offload_bucket is not None:
+        key = create_offload_key(policy, request_id)
+        try:
+            offload_event(payload, bucket=policy.offload_bucket, key=key)
+            captured["offloaded"] = f"s3://{policy.offload_bucket}/{key}"
+            return captured
+        except Exception as e:
+            # fall back to the preview, so the invocation keeps some trace of its input
+            captured["offload_error"] = {"Type": str(type(e)), "Message": str(e)}
+    captured["preview"] = create_preview(payload, policy.preview_bytes)
+    return captured
@@ -1,5 +1,5 @@
 from .logger import Logger
 
 
-def create_logger(name: str) -> Logger:
-    return Logger(name=name)
+def create_logger(name: str, *, level: str | int | None = None) -> Logger:
+    return Logger(name=name, level=level)
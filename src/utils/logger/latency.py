@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from .logger import Logger
+
+# 1 us doubling up to about 67 s, plus one overflow bucket
+BUCKET_BOUNDS_NS = tuple(1_000 * 2**i for i in range(27))
+QUANTILES = (0.5, 0.9, 0.99)
+EMF_NAMESPACE = "LoggingFunction"
+EMF_STATS = ("count", "max_ms", "p50_ms", "p99_ms")
+# CloudWatch rejects a whole EMF document that declares more metrics than this
+MAX_EMF_METRICS = 100
+
+
+class LatencyHistogram:
+    count: int
+    sum_ns: int
+    min_ns: int | None
+    max_ns: int | None
+    buckets: list[int]
+    _lock: threading.Lock
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.count = 0
+        self.sum_ns = 0
+        self.min_ns = None
+        self.max_ns = None
+        self.buckets = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+
+    def drain(self) -> LatencyHistogram:
+        # decorators keep recording into this instance, so hand out a copy
+        snapshot = LatencyHistogram()
+        with self._lock:
+            snapshot.count = self.count
+            snapshot.sum_ns = self.sum_ns
+            snapshot.min_ns = self.min_ns
+            snapshot.max_ns = self.max_ns
+            snapshot.buckets = self.buckets
+            self._reset()
+        return snapshot
+
+    def record(self, ns: int):
+        index = bisect_left(BUCKET_BOUNDS_NS, ns)
+        with self._lock:
+            self.count += 1
+            self.sum_ns += ns
+            if self.min_ns is None or ns < self.min_ns:
+                self.min_ns = ns
+            if self.max_ns is None or ns > self.max_ns:
+                self.max_ns = ns
+            self.buckets[index] += 1
+
+    def quantile(self, q: float) -> int | None:
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n > 0:
+                upper = (
+                    BUCKET_BOUNDS_NS[index]
+                    if index < len(BUCKET_BOUNDS_NS)
+                    else self.max_ns
+                )
+                # the bucket bound is an estimate, the observed extremes are exact
+                return max(self.min_ns, min(upper, self.max_ns))
+        return self.max_ns
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_ms": self.sum_ns / 1e6,
+            "min_ms": None if self.min_ns is None else self.min_ns / 1e6,
+            "max_ms": None if self.max_ns is None else self.max_ns / 1e6,
+            **{
+                f"p{int(q * 100)}_ms": (
+                    None if (v := self.quantile(q)) is None else v / 1e6
+                )
+                for q in QUANTILES
+            },
+        }
+
+
+_histograms: dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def is_latency_enabled() -> bool:
+    return os.getenv("LOGGING_FUNCTION_LATENCY", "true").lower() not in (
+        "false",
+        "0",
+        "off",
+    )
+
+
+def get_histogram(name: str) -> LatencyHistogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(name, LatencyHistogram())
+    return histogram
+
+
+def flush_latency(logger: Logger):
+    with _histograms_lock:
+        items = list(_histograms.items())
+    histograms = {k: v for k, h in items if (v := h.drain()).count > 0}
+    if len(histograms) == 0:
+        return
+    if os.getenv("LOGGING_FUNCTION_LATENCY_FORMAT", "log").lower() == "emf":
+        for document in create_emf(histograms):
+            logger.info("function latency", **document)
+    else:
+        logger.info(
+            "function latency",
+            data={k: v.as_dict() for k, v in sorted(histograms.items())},
+        )
+
+
+def create_emf(histograms: dict[str, LatencyHistogram]) -> list[dict]:
+    # https://docs.aws.amazon.com/AmazonCloudWatch/latest/monitoring/CloudWatch_Embedded_Metric_Format_Specification.html
+    # one statistic set per function keyed by a FunctionName dimension would need
+    # a record each, so the function name is folded into the metric name instead
+    names = sorted(histograms)
+    per_document = MAX_EMF_METRICS // len(EMF_STATS)
+    timestamp = int(time.time() * 1000)
+    documents = []
+    for i in range(0, len(names), per_document):
+        metrics = []
+        values = {}
+        for name in names[i : i + per_document]:
+            stats = histograms[name].as_dict()
+            for stat in EMF_STATS:
+                metric = f"{name}.{stat}"
+                metrics.append(
+                    {
+                        "Name": metric,
+                        "Unit": "Count" if stat == "count" else "Milliseconds",
+                    }
+                )
+                values[metric] = stats[stat]
+        documents.append(
+            {
+                "_aws": {
+                    "Timestamp": timestamp,
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": EMF_NAMESPACE,
+                            "Dimensions": [[]],
+                            "Metrics": metrics,
+                        }
+                    ],
+                },
+                **values,
+            }
+        )
+    return documents
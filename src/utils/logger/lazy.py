@@ -0,0 +1,26 @@
+from typing import Any, Callable
+
+
+class Lazy:
+    __slots__ = ("func", "args", "kwargs")
+
+    func: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+
+    def __init__(self, func: Callable[..., Any], *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self) -> Any:
+        return self.func(*self.args, **self.kwargs)
+
+    def __repr__(self) -> str:
+        return f"lazy({self.func!r})"
+
+
+def lazy(func: Callable[..., Any], *args, **kwargs) -> Lazy:
+    # evaluated by the JSON serializer, so a record that is never emitted costs
+    # only this wrapper
+    return Lazy(func, *args, **kwargs)
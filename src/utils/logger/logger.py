@@ -1,59 +1,71 @@
 import logging
-from base64 import b64encode
-from dataclasses import asdict, is_dataclass
-from datetime import datetime
-from decimal import Decimal
-from gzip import compress
-from logging import DEBUG
+import os
+from functools import partial
+from logging import CRITICAL, DEBUG, ERROR, INFO, WARNING
 from typing import TYPE_CHECKING
 
 from aws_lambda_powertools import Logger as PowertoolsLogger
-from aws_lambda_powertools.utilities.data_classes.common import DictWrapper
-from pydantic import BaseModel
+
+from .buffer import create_handler
+from .serializer import SerializerLimits, custom_default, dumps_record
 
 if TYPE_CHECKING:
     from collections.abc import Mapping
 
 
-def custom_default(obj):
-    if isinstance(obj, tuple) or isinstance(obj, set):
-        return {"type": str(type(obj)), "items": list(obj)}
-    if isinstance(obj, datetime):
-        return {"type": str(type(obj)), "value": obj.isoformat()}
-    if isinstance(obj, bytes):
-        compressed = compress(obj, compresslevel=7)
-        encoded = b64encode(compressed).decode()
-        return {"type": "bytes (base64 encoded, gzip compressed)", "value": encoded}
-    if isinstance(obj, Decimal):
-        return num if (num := int(obj)) == obj else float(str(obj))
-    if isinstance(obj, DictWrapper):
-        return {"type": str(type(obj)), "value": obj.raw_event}
-    if isinstance(obj, BaseModel):
-        return {"type": str(type(obj)), "value": obj.model_dump()}
-    if is_dataclass(obj):
-        if isinstance(obj, type):
-            return {"type": str(obj)}
-        else:
-            return asdict(obj)
-    try:
-        return {"type": str(type(obj)), "value": str(obj)}
-    except Exception as e:
-        return {
-            "type": str(type(obj)),
-            "failed to str": {"error": str(type(e)), "message": str(e)},
-        }
+def parse_level(value: str | int) -> int:
+    if isinstance(value, int) or value.isdigit():
+        return int(value)
+    level = logging.getLevelName(value.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"unknown log level: {value}")
+    return level
+
+
+def resolve_level(name: str) -> int:
+    # LOG_LEVELS="utils.aws=INFO,handlers=DEBUG" overrides LOG_LEVEL per logger;
+    # the longest dotted prefix of the logger name wins
+    overrides = {}
+    for item in os.getenv("LOG_LEVELS", "").split(","):
+        prefix, sep, level = item.partition("=")
+        if sep != "":
+            overrides[prefix.strip()] = level.strip()
+    parts = name.split(".")
+    for i in range(len(parts), 0, -1):
+        level = overrides.get(".".join(parts[:i]))
+        if level is not None:
+            return parse_level(level)
+    return parse_level(os.getenv("LOG_LEVEL", "DEBUG"))
 
 
 class Logger:
     _powertools_logger: PowertoolsLogger
     _name: str
+    _level: int
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, *, level: str | int | None = None):
         self._name = name
+        self._level = resolve_level(name) if level is None else parse_level(level)
+        # loggers of one service share a Python logger, so the per-logger level is
+        # enforced here and the shared one stays at DEBUG
         self._powertools_logger = PowertoolsLogger(
-            level=DEBUG, use_rfc3339=True, json_default=custom_default
+            level=DEBUG,
+            use_rfc3339=True,
+            json_default=custom_default,
+            # only the first logger of a service installs its handler and formatter
+            logger_handler=create_handler(),
+            json_serializer=partial(dumps_record, limits=SerializerLimits.from_env()),
         )
 
+    def flush(self):
+        # writes out whatever a buffered handler is still holding
+        for handler in self._powertools_logger.handlers:
+            handler.flush()
+
+    def is_enabled_for(self, level: int) -> bool:
+        # compared first so disabled levels return before reaching Powertools
+        return level >= self._level and self._powertools_logger.isEnabledFor(level)
+
     def debug(
         self,
         msg: object,
@@ -64,6 +76,8 @@ class Logger:
         extra: Mapping[str, object] | None = None,
         **kwargs: object,
     ) -> None:
+        if DEBUG < self._level:
+            return
         self._powertools_logger.debug(
             msg=msg,
             *args,
@@ -85,6 +99,8 @@ class Logger:
         extra: Mapping[str, object] | None = None,
         **kwargs: object,
     ) -> None:
+        if INFO < self._level:
+            return
         self._powertools_logger.info(
             msg=msg,
             *args,
@@ -106,6 +122,8 @@ class Logger:
         extra: Mapping[str, object] | None = None,
         **kwargs: object,
     ) -> None:
+        if WARNING < self._level:
+            return
         self._powertools_logger.warning(
             msg=msg,
             *args,
@@ -127,6 +145,8 @@ class Logger:
         extra: Mapping[str, object] | None = None,
         **kwargs: object,
     ) -> None:
+        if ERROR < self._level:
+            return
         self._powertools_logger.error(
             msg=msg,
             *args,
@@ -148,6 +168,8 @@ class Logger:
         extra: Mapping[str, object] | None = None,
         **kwargs: object,
     ) -> None:
+        if CRITICAL < self._level:
+            return
         self._powertools_logger.critical(
             msg=msg,
             *args,
@@ -169,6 +191,8 @@ class Logger:
         extra: Mapping[str, object] | None = None,
         **kwargs: object,
     ) -> None:
+        if ERROR < self._level:
+            return
         self._powertools_logger.exception(
             msg=msg,
             *args,
@@ -1,13 +1,31 @@
+import os
 from datetime import datetime
 from functools import wraps
+from logging import DEBUG
+from time import perf_counter_ns
 from typing import Callable
 from uuid import uuid7
 from zoneinfo import ZoneInfo
 
+from .latency import get_histogram, is_latency_enabled
 from .logger import Logger
 
 jst = ZoneInfo("Asia/Tokyo")
 
+# bumped by logging_handler so sample_first counts restart on every invocation
+_invocation = 0
+
+
+def reset_sampling():
+    global _invocation
+    _invocation += 1
+
+
+def is_tracing_enabled(logger: Logger) -> bool:
+    if os.getenv("LOGGING_FUNCTION_TRACE", "true").lower() in ("false", "0", "off"):
+        return False
+    return logger.is_enabled_for(DEBUG)
+
 
 def logging_function(
     logger: Logger,
@@ -15,22 +33,70 @@ def logging_function(
     write: bool = True,
     with_return: bool = True,
     with_args: bool = True,
+    trace: bool | None = None,
+    sample_every: int = 1,
+    sample_first: int | None = None,
+    latency: bool | None = None,
 ) -> Callable:
     def decorator(func: Callable) -> Callable:
+        name_function = func.__name__
+        histogram = (
+            get_histogram(f"{func.__module__}.{func.__qualname__}")
+            if (latency if latency is not None else is_latency_enabled())
+            else None
+        )
+
+        def log_failure(id_call, dt_start, args, kwargs, e):
+            data = {"FunctionName": name_function, "CallID": id_call}
+            if dt_start is not None:
+                delta = datetime.now(tz=jst) - dt_start
+                data["Duration"] = {
+                    "str": str(delta),
+                    "TotalSeconds": delta.total_seconds(),
+                }
+            data["Args"] = args
+            data["KwArgs"] = kwargs
+            data["Error"] = {"type": str(type(e)), "message": str(e)}
+            logger.debug(
+                f'failed function "{name_function}" ({id_call})',
+                exc_info=True,
+                data=data,
+            )
+
+        @wraps(func)
+        def call(*args, **kwargs):
+            # untraced: nothing is logged unless the call fails
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                log_failure(str(uuid7()), None, args, kwargs, e)
+                raise
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            # untraced, but the duration still feeds the latency histogram
+            ns_start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                log_failure(str(uuid7()), None, args, kwargs, e)
+                raise
+            finally:
+                histogram.record(perf_counter_ns() - ns_start)
+
         @wraps(func)
         def process(*args, **kwargs):
-            name_function = func.__name__
             id_call = str(uuid7())
             dt_start = datetime.now(tz=jst)
+            ns_start = perf_counter_ns()
             try:
                 data_start = {"FunctionName": name_function, "CallID": id_call}
                 if with_args:
                     data_start["Args"] = args
                     data_start["KwArgs"] = kwargs
-                if write:
-                    logger.debug(
-                        f'start function "{name_function}" ({id_call})', data=data_start
-                    )
+                logger.debug(
+                    f'start function "{name_function}" ({id_call})', data=data_start
+                )
 
                 result = func(*args, **kwargs)
 
@@ -49,34 +115,43 @@ def logging_function(
                     data_end["KwArgs"] = kwargs
                 if with_return:
                     data_end["Return"] = result
-                if write:
-                    logger.debug(
-                        f'succeeded function "{name_function}" ({id_call})',
-                        data=data_end,
-                    )
+                logger.debug(
+                    f'succeeded function "{name_function}" ({id_call})',
+                    data=data_end,
+                )
 
                 return result
             except Exception as e:
-                dt_end = datetime.now(tz=jst)
-                delta = dt_end - dt_start
-
-                logger.debug(
-                    f'failed function "{name_function}" ({id_call})',
-                    exc_info=True,
-                    data={
-                        "FunctionName": name_function,
-                        "CallID": id_call,
-                        "Duration": {
-                            "str": str(delta),
-                            "TotalSeconds": delta.total_seconds(),
-                        },
-                        "Args": args,
-                        "KwArgs": kwargs,
-                        "Error": {"type": str(type(e)), "message": str(e)},
-                    },
-                )
+                log_failure(id_call, dt_start, args, kwargs, e)
                 raise
+            finally:
+                if histogram is not None:
+                    histogram.record(perf_counter_ns() - ns_start)
+
+        untraced = call if histogram is None else timed
+        # decided once here so a disabled trace costs nothing per call
+        tracing = write and (trace if trace is not None else is_tracing_enabled(logger))
+        if not tracing:
+            return untraced
+        if sample_every <= 1 and sample_first is None:
+            return process
+
+        # [invocation, calls]; races between threads only skew the sample slightly
+        state = [_invocation, 0]
+
+        @wraps(func)
+        def sample(*args, **kwargs):
+            if state[0] != _invocation:
+                state[0] = _invocation
+                state[1] = 0
+            count = state[1]
+            state[1] = count + 1
+            # the first calls of an invocation, then one in every sample_every
+            sampled = (sample_first is not None and count < sample_first) or (
+                sample_every > 1 and count % sample_every == 0
+            )
+            return process(*args, **kwargs) if sampled else untraced(*args, **kwargs)
 
-        return process
+        return sample
 
     return decorator
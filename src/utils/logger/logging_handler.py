@@ -1,8 +1,18 @@
 import os
+import time
+from dataclasses import dataclass
 from functools import wraps
+from hashlib import sha256
+from logging import DEBUG, getLevelName
 from typing import Callable
+from uuid import uuid4
 
+from utils.json_codec import dumps_bytes
+
+from .capture import CapturePolicy, capture_event
+from .latency import flush_latency
 from .logger import Logger
+from .logging_function import reset_sampling
 
 EXCLUDE_ENV_KEYS = {
     "AWS_ACCESS_KEY_ID",
@@ -18,28 +28,135 @@ EXCLUDE_ENV_KEYS = {
 }
 
 
-def logging_handler(logger: Logger, *, with_return: bool = True) -> Callable:
+# hex digits of the environment digest that tag every record
+ENV_HASH_LENGTH = 12
+
+
+def get_environments() -> dict[str, str | None]:
+    return {
+        k: os.getenv(k) for k in sorted(os.environ.keys()) if k not in EXCLUDE_ENV_KEYS
+    }
+
+
+@dataclass(frozen=True)
+class EnvironmentSnapshot:
+    env: dict[str, str | None]
+    digest: str
+
+
+def take_environment_snapshot() -> EnvironmentSnapshot:
+    env = get_environments()
+    digest = sha256(dumps_bytes(env)).hexdigest()[:ENV_HASH_LENGTH]
+    return EnvironmentSnapshot(env=env, digest=digest)
+
+
+# the environment does not change within a container, so it is logged by the
+# first invocation only; a restored snapshot counts as a new container
+_environment: EnvironmentSnapshot | None = None
+_init_started_ns = time.perf_counter_ns()
+_restore_hook_installed = False
+
+
+def reset_environment_snapshot():
+    global _environment, _init_started_ns
+    _environment = None
+    _init_started_ns = time.perf_counter_ns()
+
+
+def install_restore_hook():
+    global _restore_hook_installed
+    if _restore_hook_installed:
+        return
+    _restore_hook_installed = True
+    # imported here because utils.priming logs through this package
+    from utils.priming import register_after_restore
+
+    register_after_restore(reset_environment_snapshot)
+
+
+def log_cold_start(logger: Logger) -> EnvironmentSnapshot:
+    global _environment
+    since_import_ns = time.perf_counter_ns() - _init_started_ns
+    _environment = take_environment_snapshot()
+    data = {
+        "InitializationType": os.getenv("AWS_LAMBDA_INITIALIZATION_TYPE"),
+        # from importing this module (or the restore) to the first invocation; the
+        # runtime bootstrap is not included, so this is not the platform's Init Duration
+        "SinceLoggerImportMs": since_import_ns / 1_000_000,
+        "EnvHash": _environment.digest,
+    }
+    # the variables themselves stay at DEBUG, so production logs only carry the hash
+    if logger.is_enabled_for(DEBUG):
+        data["env"] = _environment.env
+    logger.info("cold start", data=data)
+    return _environment
+
+
+# per-container aggregates written out at the end of every invocation
+_flush_hooks: list[Callable[[Logger], None]] = [flush_latency]
+
+
+def register_flush_hook(hook: Callable[[Logger], None]):
+    if hook not in _flush_hooks:
+        _flush_hooks.append(hook)
+
+
+def flush(logger: Logger):
+    for hook in list(_flush_hooks):
+        try:
+            hook(logger)
+        except Exception as e:
+            logger.warning(
+                f"error occurred in flush hook {hook.__name__}: {e}",
+                exc_info=True,
+                data={"ErrorType": str(type(e)), "ErrorMessage": str(e)},
+            )
+
+
+def logging_handler(
+    logger: Logger,
+    *,
+    with_return: bool = True,
+    capture: CapturePolicy | None = None,
+) -> Callable:
+    policy = CapturePolicy.from_env() if capture is None else capture
+    log_event = getattr(logger, getLevelName(policy.level).lower())
+    install_restore_hook()
+
     def decorator(handler: Callable) -> Callable:
 
         # noinspection PyProtectedMember
         @wraps(handler)
         @logger._powertools_logger.inject_lambda_context()
         def process(event, context, *args, **kwargs):
+            reset_sampling()
             try:
-                logger.debug(
-                    "event and environment variables",
-                    data={
-                        "event": event,
-                        "env": {
-                            k: os.getenv(k)
-                            for k in sorted(os.environ.keys())
-                            if k not in EXCLUDE_ENV_KEYS
-                        },
-                    },
+                environment = _environment
+                cold_start = environment is None
+                if cold_start:
+                    environment = log_cold_start(logger)
+                # replaces the Powertools flag, which stays False after a restore
+                logger._powertools_logger.append_keys(
+                    cold_start=cold_start, env_hash=environment.digest
+                )
+            except Exception as e:
+                logger.warning(
+                    f"error occurred in logging environment variables: {e}",
+                    exc_info=True,
+                    data={"ErrorType": str(type(e)), "ErrorMessage": str(e)},
                 )
+
+            try:
+                # checked up front: capturing serializes the event and may upload it
+                if logger.is_enabled_for(policy.level) and policy.is_sampled():
+                    request_id = getattr(context, "aws_request_id", None)
+                    captured = capture_event(
+                        event, policy=policy, request_id=request_id or str(uuid4())
+                    )
+                    log_event("handler event", data={"event": captured})
             except Exception as e:
                 logger.warning(
-                    f"error occurred in logging event and environment variables: {e}",
+                    f"error occurred in logging event: {e}",
                     exc_info=True,
                     data={"ErrorType": str(type(e)), "ErrorMessage": str(e)},
                 )
@@ -48,14 +165,20 @@ def logging_handler(logger: Logger, *, with_return: bool = True) -> Callable:
                 result = handler(event, context, *args, **kwargs)
                 if with_return:
                     logger.debug("handler return", data={"Return": result})
+                flush(logger)
                 return result
             except Exception as e:
+                # the handler error stays the last record of the invocation
+                flush(logger)
                 logger.error(
                     f"error occurred in handler: {e}",
                     exc_info=True,
                     data={"Error": {"Type": str(type(e)), "Message": str(e)}},
                 )
                 raise
+            finally:
+                # the sandbox may freeze right after returning, so nothing stays buffered
+                logger.flush()
 
         return process
 
@@ -0,0 +1,223 @@
+import functools
+import os
+from base64 import b64encode
+from dataclasses import dataclass, fields, is_dataclass
+from datetime import date, time
+from decimal import Decimal
+from gzip import compress
+from typing import Any, Callable
+
+from utils.json_codec import RawJson, dumps
+
+from .lazy import Lazy
+
+# bytes shorter than this are only base64 encoded; gzip would make them longer
+COMPRESS_MIN_BYTES = 256
+# above this, gzip drops to its fastest level: log payloads are read rarely
+FAST_COMPRESS_MIN_BYTES = 64 * 1024
+
+TRUNCATED_DEPTH = "<truncated: max depth>"
+TRUNCATED_BUDGET = "<truncated: byte budget>"
+
+# what a scalar or a bounded serializer's output is charged against the budget
+SCALAR_COST = 8
+BOUNDED_COST = 64
+SCALAR_TYPES = frozenset({int, float, bool, type(None)})
+
+Serializer = Callable[[Any], Any]
+
+
+@dataclass(frozen=True)
+class SerializerLimits:
+    # spent only by values handled here, not by plain dicts and strings
+    max_bytes: int = 64 * 1024
+    max_depth: int = 8
+    max_items: int = 100
+
+    @classmethod
+    def from_env(cls) -> SerializerLimits:
+        return cls(
+            max_bytes=int(os.getenv("LOG_SERIALIZER_MAX_BYTES", cls.max_bytes)),
+            max_depth=int(os.getenv("LOG_SERIALIZER_MAX_DEPTH", cls.max_depth)),
+            max_items=int(os.getenv("LOG_SERIALIZER_MAX_ITEMS", cls.max_items)),
+        )
+
+
+# keyed by type, or by "module.QualName" for types that must not be imported here
+_serializers: dict[type | str, Serializer] = {}
+# serializers whose output is small and flat, so it is not walked for the budget
+_bounded: set[Serializer] = set()
+
+
+def register_serializer(
+    key: type | str, serializer: Serializer, *, bounded: bool = False
+):
+    _serializers[key] = serializer
+    if bounded:
+        _bounded.add(serializer)
+    get_serializer.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def get_serializer(cls: type) -> Serializer:
+    # resolved once per type, so the MRO walk is not repeated for every value
+    for c in cls.__mro__:
+        serializer = _serializers.get(c) or _serializers.get(
+            f"{c.__module__}.{c.__qualname__}"
+        )
+        if serializer is not None:
+            return serializer
+    if is_dataclass(cls):
+        return serialize_dataclass
+    return serialize_str
+
+
+@functools.lru_cache(maxsize=None)
+def get_field_names(cls: type) -> tuple[str, ...]:
+    return tuple(f.name for f in fields(cls))
+
+
+def serialize_str(obj) -> dict:
+    try:
+        return {"type": str(type(obj)), "value": str(obj)}
+    except Exception as e:
+        return {
+            "type": str(type(obj)),
+            "failed to str": {"error": str(type(e)), "message": str(e)},
+        }
+
+
+def serialize_bytes(obj: bytes) -> dict:
+    if len(obj) < COMPRESS_MIN_BYTES:
+        return {"type": "bytes (base64 encoded)", "value": b64encode(obj).decode()}
+    level = 1 if len(obj) >= FAST_COMPRESS_MIN_BYTES else 6
+    return {
+        "type": "bytes (base64 encoded, gzip compressed)",
+        "value": b64encode(compress(obj, compresslevel=level)).decode(),
+    }
+
+
+def serialize_dataclass(obj) -> dict:
+    # one level at a time: nested dataclasses are converted by the budget walk
+    return {name: getattr(obj, name) for name in get_field_names(type(obj))}
+
+
+def serialize_decimal(obj: Decimal) -> int | float:
+    return num if (num := int(obj)) == obj else float(str(obj))
+
+
+def serialize_items(obj) -> dict:
+    return {"type": str(type(obj)), "items": list(obj)}
+
+
+def serialize_isoformat(obj: date | time) -> dict:
+    return {"type": str(type(obj)), "value": obj.isoformat()}
+
+
+register_serializer(tuple, serialize_items)
+register_serializer(set, serialize_items)
+register_serializer(frozenset, serialize_items)
+register_serializer(bytes, serialize_bytes)
+register_serializer(bytearray, lambda obj: serialize_bytes(bytes(obj)))
+register_serializer(date, serialize_isoformat, bounded=True)
+register_serializer(time, serialize_isoformat, bounded=True)
+register_serializer(Decimal, serialize_decimal, bounded=True)
+register_serializer(Lazy, lambda obj: obj())
+# already bounded by whoever encoded it, e.g. the inline cap of the event capture
+register_serializer(RawJson, RawJson.encode, bounded=True)
+register_serializer(type, lambda obj: {"type": str(obj)}, bounded=True)
+register_serializer(
+    "aws_lambda_powertools.utilities.data_classes.common.DictWrapper",
+    lambda obj: {"type": str(type(obj)), "value": obj.raw_event},
+)
+register_serializer(
+    "pydantic.main.BaseModel",
+    lambda obj: {"type": str(type(obj)), "value": obj.model_dump()},
+)
+
+
+def custom_default(obj):
+    return get_serializer(type(obj))(obj)
+
+
+class Budget:
+    limits: SerializerLimits
+    remaining: int
+
+    def __init__(self, limits: SerializerLimits):
+        self.limits = limits
+        self.remaining = limits.max_bytes
+
+    def default(self, obj):
+        return self.convert(obj, 0)
+
+    def convert(self, obj, depth: int):
+        if self.remaining <= 0:
+            return TRUNCATED_BUDGET
+        if isinstance(obj, (bytes, bytearray)) and len(obj) * 4 // 3 > self.remaining:
+            # cut before encoding so the kept prefix still decodes
+            kept = self.remaining * 3 // 4
+            value = self.prune(serialize_bytes(bytes(obj[:kept])), depth)
+            value["truncated"] = f"{len(obj) - kept} bytes"
+            return value
+        serializer = get_serializer(type(obj))
+        if serializer in _bounded:
+            self.remaining -= BOUNDED_COST
+            return serializer(obj)
+        return self.prune(serializer(obj), depth)
+
+    def prune(self, value, depth: int):
+        if type(value) in SCALAR_TYPES:
+            self.remaining -= SCALAR_COST
+            return value
+        if isinstance(value, str):
+            return self.take(value)
+        if depth >= self.limits.max_depth:
+            return TRUNCATED_DEPTH
+        if isinstance(value, dict):
+            pruned = {}
+            for i, (k, v) in enumerate(value.items()):
+                if i >= self.limits.max_items or self.remaining <= 0:
+                    pruned["<truncated>"] = f"{len(value) - i} items"
+                    break
+                self.remaining -= len(k) if isinstance(k, str) else SCALAR_COST
+                pruned[k] = self.prune(v, depth + 1)
+            return pruned
+        if isinstance(value, (list, tuple)):
+            if len(value) <= self.limits.max_items:
+                # flat lists of strings and scalars are charged without a walk
+                cost = 0
+                for v in value:
+                    if type(v) is str:
+                        cost += len(v)
+                    elif type(v) in SCALAR_TYPES:
+                        cost += SCALAR_COST
+                    else:
+                        break
+                else:
+                    if cost <= self.remaining:
+                        self.remaining -= cost
+                        return value
+            pruned = []
+            for i, v in enumerate(value):
+                if i >= self.limits.max_items or self.remaining <= 0:
+                    pruned.append(f"<truncated: {len(value) - i} items>")
+                    break
+                pruned.append(self.prune(v, depth + 1))
+            return pruned
+        # converted here rather than by another trip through the encoder, so
+        # nested objects keep counting depth
+        return self.convert(value, depth + 1)
+
+    def take(self, value: str) -> str:
+        if len(value) <= self.remaining:
+            self.remaining -= len(value)
+            return value
+        kept = max(0, self.remaining)
+        self.remaining = 0
+        return f"{value[:kept]}...<truncated {len(value) - kept} chars>"
+
+
+def dumps_record(obj, *, limits: SerializerLimits) -> str:
+    # a fresh budget per record, shared by every value the encoder hands back
+    return dumps(obj, default=Budget(limits).default)
@@ -0,0 +1,5 @@
+from .create_metrics import create_metrics
+from .metrics import Metrics
+from .metrics_handler import metrics_handler
+
+__all__ = ["Metrics", "create_metrics", "metrics_handler"]
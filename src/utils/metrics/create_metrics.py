@@ -0,0 +1,6 @@
+from .metrics import Metrics
+
+
+def create_metrics(namespace: str | None = None) -> Metrics:
+    # None falls back to POWERTOOLS_METRICS_NAMESPACE
+    return Metrics(namespace=namespace)
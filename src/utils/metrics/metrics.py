@@ -0,0 +1,99 @@
+import random
+import threading
+from contextlib import contextmanager
+from time import perf_counter_ns
+from typing import TYPE_CHECKING
+
+from aws_lambda_powertools import Metrics as PowertoolsMetrics
+from aws_lambda_powertools.metrics import MetricUnit
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# an EMF metric carries at most 100 values and Powertools publishes early on
+# reaching that, so stay one below to keep a single document per invocation
+MAX_VALUES = 99
+
+
+class Metrics:
+    _powertools_metrics: PowertoolsMetrics
+    _values: dict[str, tuple[MetricUnit, float]]
+    _samples: dict[str, tuple[MetricUnit, int, list[float]]]
+    _local: threading.local
+
+    def __init__(self, namespace: str | None = None):
+        self._powertools_metrics = PowertoolsMetrics(namespace=namespace)
+        self._values = {}
+        self._samples = {}
+        self._local = threading.local()
+
+    def add(self, name: str, value: float, unit: MetricUnit = MetricUnit.Count):
+        # summed here so each metric is a single value in the EMF document
+        _, current = self._values.get(name, (unit, 0))
+        self._values[name] = (unit, current + value)
+
+    def observe(
+        self, name: str, value: float, unit: MetricUnit = MetricUnit.Milliseconds
+    ):
+        # kept as a distribution for percentiles, reservoir sampled down to MAX_VALUES
+        _, seen, values = self._samples.get(name, (unit, 0, []))
+        if len(values) < MAX_VALUES:
+            values.append(value)
+        elif (index := random.randrange(seen + 1)) < MAX_VALUES:
+            values[index] = value
+        self._samples[name] = (unit, seen + 1, values)
+
+    def count(self, name: str, value: int = 1):
+        self.add(name, value, MetricUnit.Count)
+
+    def add_duration(self, name: str, ns: int):
+        self.add(name, ns / 1e6, MetricUnit.Milliseconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        stack = self._get_stack()
+        stack.append(0)
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._pop_timing(name, stack, perf_counter_ns() - start)
+
+    def timed(self, iterable: Iterable, name: str) -> Iterator:
+        # self time only: nested timers (upstream stages) are subtracted
+        iterator = iter(iterable)
+        stack = self._get_stack()
+        while True:
+            stack.append(0)
+            start = perf_counter_ns()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._pop_timing(name, stack, perf_counter_ns() - start)
+                return
+            self._pop_timing(name, stack, perf_counter_ns() - start)
+            yield item
+
+    def _get_stack(self) -> list[int]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _pop_timing(self, name: str, stack: list[int], elapsed: int):
+        nested = stack.pop()
+        self.add_duration(name, elapsed - nested)
+        if len(stack) > 0:
+            stack[-1] += elapsed
+
+    def flush(self):
+        values, self._values = self._values, {}
+        samples, self._samples = self._samples, {}
+        if len(values) == 0 and len(samples) == 0:
+            return
+        for name, (unit, value) in values.items():
+            self._powertools_metrics.add_metric(name=name, unit=unit, value=value)
+        for name, (unit, _, observed) in samples.items():
+            for value in observed:
+                self._powertools_metrics.add_metric(name=name, unit=unit, value=value)
+        self._powertools_metrics.flush_metrics()
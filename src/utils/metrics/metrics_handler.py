@@ -0,0 +1,30 @@
+from functools import wraps
+from typing import Callable
+
+from utils.logger import create_logger
+
+from .metrics import Metrics
+
+logger = create_logger(__name__)
+
+
+def metrics_handler(metrics: Metrics) -> Callable:
+    def decorator(handler: Callable) -> Callable:
+        @wraps(handler)
+        def process(event, context, *args, **kwargs):
+            try:
+                return handler(event, context, *args, **kwargs)
+            finally:
+                # one EMF document per invocation, failed ones included
+                try:
+                    metrics.flush()
+                except Exception as e:
+                    logger.warning(
+                        f"error occurred in flushing metrics: {e}",
+                        exc_info=True,
+                        data={"ErrorType": str(type(e)), "ErrorMessage": str(e)},
+                    )
+
+        return process
+
+    return decorator
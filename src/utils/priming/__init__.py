@@ -0,0 +1,15 @@
+from .priming import (
+    is_snap_start,
+    register_after_restore,
+    register_before_snapshot,
+    run_after_restore,
+    run_before_snapshot,
+)
+
+__all__ = [
+    "is_snap_start",
+    "register_after_restore",
+    "register_before_snapshot",
+    "run_after_restore",
+    "run_before_snapshot",
+]
@@ -0,0 +1,74 @@
+import os
+import random
+import uuid
+from typing import Callable
+
+from utils.logger import create_logger
+
+logger = create_logger(__name__)
+
+_before_snapshot: list[Callable[[], object]] = []
+_after_restore: list[Callable[[], object]] = []
+_installed = False
+
+
+def is_snap_start() -> bool:
+    return os.getenv("AWS_LAMBDA_INITIALIZATION_TYPE") == "snap-start"
+
+
+def install():
+    # https://docs.aws.amazon.com/lambda/latest/dg/snapstart-runtime-hooks-python.html
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    try:
+        from snapshot_restore_py import register_after_restore as after
+        from snapshot_restore_py import register_before_snapshot as before
+    except ImportError:
+        # not running under SnapStart (or locally); hooks can still be run by hand
+        return
+    before(run_before_snapshot)
+    after(run_after_restore)
+
+
+def register_before_snapshot(func: Callable[[], object]) -> Callable[[], object]:
+    install()
+    _before_snapshot.append(func)
+    return func
+
+
+def register_after_restore(func: Callable[[], object]) -> Callable[[], object]:
+    install()
+    _after_restore.append(func)
+    return func
+
+
+def run_hooks(name: str, hooks: list[Callable[[], object]]):
+    for hook in hooks:
+        try:
+            hook()
+        except Exception as e:
+            # a failed warm-up only costs latency later, never the snapshot
+            logger.warning(
+                f"error occurred in {name} hook {hook.__qualname__}: {e}",
+                exc_info=True,
+                data={"ErrorType": str(type(e)), "ErrorMessage": str(e)},
+            )
+
+
+def run_before_snapshot():
+    run_hooks("before snapshot", _before_snapshot)
+
+
+def run_after_restore():
+    reseed()
+    run_hooks("after restore", _after_restore)
+
+
+def reseed():
+    # every environment restored from one snapshot starts with the same state
+    random.seed()
+    if hasattr(uuid, "_last_timestamp_v7"):
+        uuid._last_timestamp_v7 = None
+        uuid._last_counter_v7 = 0
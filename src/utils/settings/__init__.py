@@ -0,0 +1,3 @@
+from .settings import get_settings, refresh_settings
+
+__all__ = ["get_settings", "refresh_settings"]
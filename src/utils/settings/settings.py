@@ -0,0 +1,40 @@
+import threading
+from typing import TYPE_CHECKING
+
+from utils.priming import register_after_restore
+
+if TYPE_CHECKING:
+    from pydantic_settings import BaseSettings
+
+_settings: dict[type, BaseSettings] = {}
+_lock = threading.Lock()
+
+
+def get_settings[T: BaseSettings](cls: type[T]) -> T:
+    # read and validated once per container instead of once per invocation
+    settings = _settings.get(cls)
+    if settings is None:
+        with _lock:
+            settings = _settings.get(cls)
+            if settings is None:
+                settings = _settings[cls] = cls()
+    return settings
+
+
+def refresh_settings(cls: type[BaseSettings] | None = None):
+    with _lock:
+        if cls is None:
+            _settings.clear()
+        else:
+            _settings.pop(cls, None)
+
+
+@register_after_restore
+def reload_settings():
+    # read again on restore, since the snapshot holds the values read before it.
+    # run_hooks only logs a validation error, so the first invocation raises it.
+    with _lock:
+        classes = list(_settings.keys())
+        _settings.clear()
+    for cls in classes:
+        get_settings(cls)
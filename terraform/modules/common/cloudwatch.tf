@@ -20,3 +20,41 @@ resource "aws_cloudwatch_metric_alarm" "catch_error_lambda_error_processor" {
   threshold          = 0
   treat_missing_data = "notBreaching"
 }
+
+resource "aws_cloudwatch_metric_alarm" "error_processor_entries_failed" {
+  alarm_name          = "error-processor-entries-failed"
+  alarm_actions       = [aws_sns_topic.catch_error_lambda_error_processor.arn]
+  comparison_operator = "GreaterThanThreshold"
+  evaluation_periods  = 1
+  datapoints_to_alarm = 1
+
+  dimensions = {
+    service = "error_processor"
+  }
+
+  metric_name        = "EntriesFailed"
+  namespace          = var.system_name
+  period             = 60
+  statistic          = "Sum"
+  threshold          = 0
+  treat_missing_data = "notBreaching"
+}
+
+resource "aws_cloudwatch_metric_alarm" "error_processor_deliver_duration" {
+  alarm_name          = "error-processor-deliver-duration"
+  alarm_actions       = [aws_sns_topic.catch_error_lambda_error_processor.arn]
+  comparison_operator = "GreaterThanThreshold"
+  evaluation_periods  = 5
+  datapoints_to_alarm = 3
+
+  dimensions = {
+    service = "error_processor"
+  }
+
+  metric_name        = "DeliverDuration"
+  namespace          = var.system_name
+  period             = 60
+  extended_statistic = "p99"
+  threshold          = 10000
+  treat_missing_data = "notBreaching"
+}
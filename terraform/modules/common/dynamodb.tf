@@ -0,0 +1,19 @@
+# ================================================================
+# Error Processor Rate Limit State
+# ================================================================
+
+resource "aws_dynamodb_table" "error_processor_rate_limit" {
+  name         = "${var.system_name}-error-processor-rate-limit"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "key"
+
+  attribute {
+    name = "key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+}
@@ -72,6 +72,42 @@ resource "aws_iam_policy" "event_bridge_invoke_api_destination" {
   policy = data.aws_iam_policy_document.policy_event_bridge_invoke_api_destination.json
 }
 
+# ================================================================
+# Policy Error Processor Rate Limit State
+# ================================================================
+
+data "aws_iam_policy_document" "policy_error_processor_rate_limit" {
+  policy_id = "policy_error_processor_rate_limit"
+  statement {
+    sid       = "AllowErrorProcessorRateLimitState"
+    effect    = local.iam.effect.allow
+    actions   = ["dynamodb:GetItem", "dynamodb:PutItem"]
+    resources = [aws_dynamodb_table.error_processor_rate_limit.arn]
+  }
+}
+
+resource "aws_iam_policy" "error_processor_rate_limit" {
+  policy = data.aws_iam_policy_document.policy_error_processor_rate_limit.json
+}
+
+# ================================================================
+# Policy Event Capture
+# ================================================================
+
+data "aws_iam_policy_document" "policy_event_capture" {
+  policy_id = "policy_event_capture"
+  statement {
+    sid       = "AllowEventCapturePutObject"
+    effect    = local.iam.effect.allow
+    actions   = ["s3:PutObject"]
+    resources = ["${aws_s3_bucket.event_capture.arn}/*"]
+  }
+}
+
+resource "aws_iam_policy" "event_capture" {
+  policy = data.aws_iam_policy_document.policy_event_capture.json
+}
+
 # ================================================================
 # Role Lambda Error Processor
 # ================================================================
@@ -84,6 +120,8 @@ resource "aws_iam_role_policy_attachment" "lambda_error_processor" {
   for_each = {
     a = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
     b = aws_iam_policy.event_bridge_put_events.arn
+    c = aws_iam_policy.error_processor_rate_limit.arn
+    d = aws_iam_policy.event_capture.arn
   }
   policy_arn = each.value
   role       = aws_iam_role.lambda_error_processor.name
@@ -29,8 +29,20 @@ module "lambda_error_processor" {
   layers     = ["arn:aws:lambda:${var.region}:043309354008:layer:LuciferousPublicLayerAwsCloudwatchLogsUrlPython314:1"]
 
   environment_variables = {
-    SYSTEM_NAME    = var.system_name
-    EVENT_BUS_NAME = aws_cloudwatch_event_bus.slack_error_notifier.name
+    SYSTEM_NAME           = var.system_name
+    EVENT_BUS_NAME        = aws_cloudwatch_event_bus.slack_error_notifier.name
+    PREFILTER_ENABLED     = "true"
+    AGGREGATE_BY          = "error_message"
+    RATE_LIMIT_BACKEND    = "dynamodb"
+    RATE_LIMIT_TABLE_NAME = aws_dynamodb_table.error_processor_rate_limit.name
+
+    # INFO, so events are still captured under LOG_LEVEL = "INFO"
+    EVENT_CAPTURE_LEVEL  = "INFO"
+    EVENT_CAPTURE_BUCKET = aws_s3_bucket.event_capture.bucket
+    EVENT_CAPTURE_PREFIX = "error-processor/"
+
+    LOG_LEVEL                    = "INFO"
+    POWERTOOLS_METRICS_NAMESPACE = var.system_name
   }
 
   s3_bucket_deploy_package = aws_s3_object.lambda_deploy_package.bucket
@@ -4,4 +4,27 @@
 
 resource "aws_s3_bucket" "lambda_artifacts" {
   bucket_prefix = "${var.system_name}-lambda-artifacts-"
-}
\ No newline at end of file
+}
+
+# ================================================================
+# Event Capture Bucket
+# ================================================================
+
+resource "aws_s3_bucket" "event_capture" {
+  bucket_prefix = "${var.system_name}-event-capture-"
+}
+
+resource "aws_s3_bucket_lifecycle_configuration" "event_capture" {
+  bucket = aws_s3_bucket.event_capture.id
+
+  rule {
+    id     = "expire-captured-events"
+    status = "Enabled"
+
+    filter {}
+
+    expiration {
+      days = 14
+    }
+  }
+}
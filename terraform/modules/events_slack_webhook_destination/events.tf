@@ -20,9 +20,11 @@ resource "aws_cloudwatch_event_target" "slack" {
   role_arn       = var.iam_role_arn
 
   input_transformer {
-    input_template = "{\"blocks\": <blocks>}"
+    # the function always sends detail.trace, as null when tracing is off
+    input_template = "{\"blocks\": <blocks>, \"trace\": <trace>}"
     input_paths = {
       blocks = "$.detail.blocks"
+      trace  = "$.detail.trace"
     }
   }
 }
\ No newline at end of file
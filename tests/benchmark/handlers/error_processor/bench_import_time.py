@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+DIR_ROOT = Path(__file__).parents[4]
+
+MODULE = "handlers.error_processor.error_processor"
+# what the handler keeps off its import, measured after it for comparison
+DEFERRED_MODULES = [
+    "boto3",
+    "aws_cloudwatch_logs_url",
+    "aws_lambda_powertools.utilities.data_classes",
+]
+
+
+def measure(statement: str) -> dict[str, int]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        x for x in [str(DIR_ROOT / "src"), env.get("PYTHONPATH")] if x
+    )
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    cumulative = {}
+    for line in stderr.splitlines():
+        _, us, name = line.split("|")
+        if name.strip() in [MODULE, *DEFERRED_MODULES]:
+            cumulative[name.strip()] = int(us)
+    return cumulative
+
+
+def main():
+    statement = "; ".join(f"import {x}" for x in [MODULE, *DEFERRED_MODULES])
+    # the first run includes compiling the bytecode, so the fastest run is reported
+    runs = [measure(statement) for _ in range(5)]
+    for name in [MODULE, *DEFERRED_MODULES]:
+        us = min(x.get(name, 0) for x in runs)
+        print(f"{name:>45}: {us / 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
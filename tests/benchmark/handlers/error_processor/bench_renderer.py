@@ -0,0 +1,92 @@
+import json
+from datetime import datetime
+from timeit import timeit
+
+from handlers.error_processor.renderer import JST, compile_slack_template
+
+INVARIANT = {
+    "system_name": "test",
+    "log_group": "/aws/lambda/luciferous-animanch-bbs-database-cloud-threads-dumper",
+    "log_stream": "2024/04/11/[$LATEST]480fd5a847364142b5a45bd5d79041fa",
+    "url_lambda": "https://ap-northeast-1.console.aws.amazon.com/lambda/home?region=ap-northeast-1#/functions/luciferous-animanch-bbs-database-cloud-threads-dumper",
+}
+
+
+def section(text: str) -> dict:
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+
+def render_dict(
+    *, now, timestamp, lambda_request_id, url_logs, message, error_message
+) -> str:
+    # the implementation before the template renderer
+    blocks = [
+        section(f"<!channel> `{now}`"),
+        {"type": "divider"},
+        section(f"*System Name:* `{INVARIANT['system_name']}`"),
+        section(f"*Log Group:* `{INVARIANT['log_group']}`"),
+        section(f"*Log Stream:* `{INVARIANT['log_stream']}`"),
+        section(f"*Timestamp:* `{timestamp}`"),
+        section(
+            "*Datetime:* `{0}`".format(datetime.fromtimestamp(timestamp / 1000, tz=JST))
+        ),
+    ]
+    if lambda_request_id is not None:
+        blocks.append(section(f"*Lambda Request ID:* `{lambda_request_id}`"))
+    blocks += [
+        section(f"*Lambda Console:* <{INVARIANT['url_lambda']}|link>"),
+        section(f"*CloudWatch Logs Link:* <{url_logs}|link>"),
+        section("*Message:*"),
+        section("```\n{0}\n```".format(message)),
+    ]
+    if error_message is not None:
+        blocks += [
+            section("*Error Message:*"),
+            section("```\n{0}\n```".format(error_message)),
+        ]
+    return json.dumps({"blocks": blocks})
+
+
+def create_events(count: int) -> list[dict]:
+    return [
+        {
+            "now": datetime.now(tz=JST),
+            "timestamp": 1712809901901 + i,
+            "lambda_request_id": f"7e652eb8-0555-4c0c-9449-{i:012d}",
+            "url_logs": f"https://ap-northeast-1.console.aws.amazon.com/cloudwatch/home#logsV2:log-groups/{i}",
+            "message": f"error occurred in handler: name 'Error' is not defined ({i})",
+            "error_message": "[builtins.NameError] {'type': \"<class 'NameError'>\"}",
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    for count in [1_000, 10_000]:
+        events = create_events(count)
+
+        def run_dict():
+            for e in events:
+                render_dict(**e)
+
+        def run_template():
+            template = compile_slack_template(**INVARIANT)
+            for e in events:
+                template.render(**e)
+
+        assert all(
+            render_dict(**e) == compile_slack_template(**INVARIANT).render(**e)
+            for e in events
+        )
+        number = 5
+        dict_seconds = timeit(run_dict, number=number) / number
+        template_seconds = timeit(run_template, number=number) / number
+        print(
+            f"{count:>6} events: dict+json.dumps {dict_seconds * 1000:8.2f} ms,"
+            f" template {template_seconds * 1000:8.2f} ms,"
+            f" speedup x{dict_seconds / template_seconds:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from statistics import median
+
+DIR_ROOT = Path(__file__).parents[4]
+
+# a fresh interpreter each time: the point is the cold start cost, the imports
+# are paid before the clock starts since they do not depend on the models
+SNIPPET = """
+import json, sys, time, tracemalloc
+from pathlib import Path
+import boto3, botocore.session
+import utils.aws.aws as aws
+aws.DIR_BOTOCORE_MODELS = Path(sys.argv[1])
+tracemalloc.start()
+start = time.perf_counter()
+aws.create_client("events", region_name="ap-northeast-1", operations=("PutEvents",))
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "peak": tracemalloc.get_traced_memory()[1]}))
+"""
+
+
+def measure(models: Path, number: int) -> tuple[float, int]:
+    env = dict(os.environ, LOGGING_FUNCTION_TRACE="false")
+    env["PYTHONPATH"] = os.pathsep.join(
+        x for x in [str(DIR_ROOT / "src"), env.get("PYTHONPATH")] if x
+    )
+    results = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", SNIPPET, str(models)],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.splitlines()[-1]
+        )
+        for _ in range(number)
+    ]
+    return median(x["seconds"] for x in results), max(x["peak"] for x in results)
+
+
+def main():
+    sys.path.insert(0, str(DIR_ROOT / "scripts"))
+    from build_botocore_models import OPERATIONS, build
+
+    with tempfile.TemporaryDirectory() as tmp:
+        models = Path(tmp) / "botocore_models"
+        build(models, OPERATIONS)
+        number = 5
+        for name, path in [("full", Path(tmp) / "missing"), ("trimmed", models)]:
+            seconds, peak = measure(path, number)
+            print(
+                f"{name:>8} models: create_client('events') {seconds * 1000:8.2f} ms,"
+                f" peak {peak / 1024 / 1024:6.2f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
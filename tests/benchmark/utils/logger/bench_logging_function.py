@@ -0,0 +1,35 @@
+import os
+import sys
+from timeit import timeit
+
+from utils.logger import create_logger, logging_function
+
+
+def add(x, y):
+    return x + y
+
+
+def main():
+    # Powertools binds sys.stdout when the first logger is created
+    sys.stdout = open(os.devnull, "w")
+    logger = create_logger("bench")
+    variants = {
+        "bare call": add,
+        "trace=False": logging_function(logger, trace=False, latency=False)(add),
+        "latency only": logging_function(logger, trace=False)(add),
+        "sample_every=100": logging_function(logger, sample_every=100)(add),
+        "traced": logging_function(logger)(add),
+    }
+
+    number = 10_000
+    bare = timeit(lambda: add(1, 2), number=number) / number
+    for name, func in variants.items():
+        seconds = timeit(lambda: func(1, 2), number=number) / number
+        print(
+            f"{name:>18}: {seconds * 1e9:10.0f} ns/call, x{seconds / bare:.2f} of bare",
+            file=sys.__stdout__,
+        )
+
+
+if __name__ == "__main__":
+    main()
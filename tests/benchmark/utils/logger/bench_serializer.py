@@ -0,0 +1,98 @@
+import sys
+from base64 import b64encode
+from dataclasses import asdict, dataclass, is_dataclass
+from datetime import datetime
+from decimal import Decimal
+from gzip import compress
+from timeit import timeit
+
+from aws_lambda_powertools.utilities.data_classes.cloud_watch_logs_event import (
+    CloudWatchLogsEvent,
+)
+from aws_lambda_powertools.utilities.data_classes.common import DictWrapper
+from pydantic import BaseModel
+
+from utils.json_codec import BACKEND, dumps
+from utils.logger.serializer import SerializerLimits, dumps_record
+
+
+def legacy_default(obj):
+    # custom_default before the serializer registry, kept as the baseline
+    if isinstance(obj, tuple) or isinstance(obj, set):
+        return {"type": str(type(obj)), "items": list(obj)}
+    if isinstance(obj, datetime):
+        return {"type": str(type(obj)), "value": obj.isoformat()}
+    if isinstance(obj, bytes):
+        compressed = compress(obj, compresslevel=7)
+        encoded = b64encode(compressed).decode()
+        return {"type": "bytes (base64 encoded, gzip compressed)", "value": encoded}
+    if isinstance(obj, Decimal):
+        return num if (num := int(obj)) == obj else float(str(obj))
+    if isinstance(obj, DictWrapper):
+        return {"type": str(type(obj)), "value": obj.raw_event}
+    if isinstance(obj, BaseModel):
+        return {"type": str(type(obj)), "value": obj.model_dump()}
+    if is_dataclass(obj):
+        if isinstance(obj, type):
+            return {"type": str(obj)}
+        else:
+            return asdict(obj)
+    try:
+        return {"type": str(type(obj)), "value": str(obj)}
+    except Exception as e:
+        return {
+            "type": str(type(obj)),
+            "failed to str": {"error": str(type(e)), "message": str(e)},
+        }
+
+
+@dataclass
+class Node:
+    name: str
+    children: list
+
+
+class Model(BaseModel):
+    name: str
+    tags: list[str]
+
+
+def create_tree(depth: int) -> Node:
+    if depth == 0:
+        return Node(name="leaf", children=[])
+    return Node(name=f"node{depth}", children=[create_tree(depth - 1)] * 3)
+
+
+def main():
+    limits = SerializerLimits()
+    cases = {
+        "small bytes": b"x" * 64,
+        "large bytes": bytes(range(256)) * 1024,
+        "datetime": datetime(2024, 4, 11, 15, 7, 17),
+        "decimal": Decimal("123.45"),
+        "set": set(range(50)),
+        "dataclass tree": create_tree(6),
+        "pydantic": Model(name="a", tags=["t"] * 20),
+        "cloudwatch event": CloudWatchLogsEvent(
+            {"awslogs": {"data": "H4sI" + "A" * 200_000}}
+        ),
+    }
+    print(f"json backend: {BACKEND}", file=sys.stderr)
+    for name, obj in cases.items():
+        record = {"message": "bench", "data": {"value": obj}}
+        number = max(
+            1, 2_000 // (1 + len(dumps(record, default=legacy_default)) // 1000)
+        )
+        legacy = timeit(lambda: dumps(record, default=legacy_default), number=number)
+        current = timeit(lambda: dumps_record(record, limits=limits), number=number)
+        size_legacy = len(dumps(record, default=legacy_default))
+        size_current = len(dumps_record(record, limits=limits))
+        print(
+            f"{name:>16}: legacy {legacy / number * 1e6:10.1f} us {size_legacy:>8} B,"
+            f" current {current / number * 1e6:10.1f} us {size_current:>8} B,"
+            f" x{legacy / current:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,13 @@ from dataclasses import dataclass, field
 from uuid import uuid4
 
 import boto3
+from botocore.config import Config
 from mypy_boto3_events import EventBridgeClient
 from pytest import MonkeyPatch, fixture
 
+from utils.aws.api_stats import registry
+from utils.settings import refresh_settings
+
 LOCALSTACK_ENDPOINT_URL = "http://localhost:4566"
 
 
@@ -25,6 +29,22 @@ class DummyLambdaContext:
     client_context: None = field(default=None)
 
 
+@fixture(autouse=True)
+def reset_settings():
+    # tests change environment variables, so never reuse cached settings
+    refresh_settings()
+    yield
+    refresh_settings()
+
+
+@fixture(autouse=True)
+def reset_api_stats():
+    # calls made by earlier tests must not be flushed by a later handler
+    registry.drain()
+    yield
+    registry.drain()
+
+
 @fixture(scope="function")
 def dummy_context():
     return DummyLambdaContext()
@@ -49,3 +69,45 @@ def events_event_bus(request, client_events):
     client_events.create_event_bus(Name=event_bus_name)
     yield
     client_events.delete_event_bus(Name=event_bus_name)
+
+
+@fixture(scope="session")
+def client_dynamodb():
+    return boto3.client("dynamodb", endpoint_url=LOCALSTACK_ENDPOINT_URL)
+
+
+@fixture(scope="function")
+def dynamodb_table(request, client_dynamodb):
+    table_name: str = request.param
+    client_dynamodb.create_table(
+        TableName=table_name,
+        KeySchema=[{"AttributeName": "key", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "key", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    yield
+    client_dynamodb.delete_table(TableName=table_name)
+
+
+@fixture(scope="session")
+def client_s3():
+    # path style, so bucket names need no DNS entry on the local stand-in
+    return boto3.client(
+        "s3",
+        endpoint_url=LOCALSTACK_ENDPOINT_URL,
+        config=Config(s3={"addressing_style": "path"}),
+    )
+
+
+@fixture(scope="function")
+def s3_bucket(request, client_s3):
+    bucket_name: str = request.param
+    client_s3.create_bucket(
+        Bucket=bucket_name,
+        CreateBucketConfiguration={"LocationConstraint": "ap-northeast-1"},
+    )
+    yield
+    objects = client_s3.list_objects_v2(Bucket=bucket_name).get("Contents", [])
+    for obj in objects:
+        client_s3.delete_object(Bucket=bucket_name, Key=obj["Key"])
+    client_s3.delete_bucket(Bucket=bucket_name)
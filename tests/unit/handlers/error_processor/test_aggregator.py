@@ -0,0 +1,90 @@
+import pytest
+
+import handlers.error_processor.aggregator as aggregator
+from handlers.error_processor.error_processor import LogMessage
+
+
+def create_log_message(
+    *,
+    timestamp: int,
+    message: str = "error occurred in handler",
+    error_message: str | None = "[builtins.ValueError] invalid",
+    lambda_request_id: str | None = None,
+) -> LogMessage:
+    return LogMessage(
+        lambda_request_id=lambda_request_id,
+        timestamp=timestamp,
+        message=message,
+        error_message=error_message,
+    )
+
+
+class TestNormalizeMessage:
+    @pytest.mark.parametrize(
+        "message, expected",
+        [
+            (
+                "request 7e652eb8-0555-4c0c-9449-437d9253937d failed",
+                "request <uuid> failed",
+            ),
+            (
+                "user 123 not found after 3.5 seconds",
+                "user <num> not found after <num>.<num> seconds",
+            ),
+            ("object 0x7f3a2b1c9d00 at  deadbeef01", "object <hex> at <hex>"),
+        ],
+    )
+    def test_normal(self, message, expected):
+        assert aggregator.normalize_message(message) == expected
+
+
+class TestAggregator:
+    def test_none_is_pass_through(self):
+        a = aggregator.Aggregator(key="none")
+        log_messages = [create_log_message(timestamp=i) for i in range(3)]
+
+        actual = list(a.aggregate(log_messages))
+
+        assert [x.log_message for x in actual] == log_messages
+        assert all(x.count == 1 for x in actual)
+        assert a.stats.as_dict() == {"messages": 3, "groups": 3}
+
+    def test_error_message(self):
+        a = aggregator.Aggregator(key="error_message", max_request_ids=2)
+        log_messages = [
+            create_log_message(
+                timestamp=1000 + i,
+                error_message=f"[builtins.KeyError] 'item-{i}'",
+                lambda_request_id=f"req-{i % 3}",
+            )
+            for i in range(10)
+        ] + [
+            create_log_message(
+                timestamp=500,
+                error_message=None,
+                message="Task timed out after 3.00 seconds",
+            )
+        ]
+
+        actual = list(a.aggregate(log_messages))
+
+        assert len(actual) == 2
+        assert actual[0].count == 10
+        assert actual[0].first_timestamp == 1000
+        assert actual[0].last_timestamp == 1009
+        assert actual[0].request_ids == ("req-0", "req-1")
+        assert actual[0].log_message == log_messages[0]
+        assert actual[1].count == 1
+        assert a.stats.as_dict() == {"messages": 11, "groups": 2}
+
+    def test_request_id(self):
+        a = aggregator.Aggregator(key="request_id")
+        log_messages = [
+            create_log_message(timestamp=1, lambda_request_id="a", message="x"),
+            create_log_message(timestamp=2, lambda_request_id="a", message="y"),
+            create_log_message(timestamp=3, lambda_request_id="b", message="x"),
+        ]
+
+        actual = list(a.aggregate(log_messages))
+
+        assert [(x.key, x.count) for x in actual] == [("a", 2), ("b", 1)]
@@ -0,0 +1,103 @@
+import gzip
+import json
+from base64 import b64encode
+
+import pytest
+from aws_lambda_powertools.utilities.data_classes.cloud_watch_logs_event import (
+    CloudWatchLogsEvent,
+)
+
+import handlers.error_processor.decoder as decoder
+
+DATA_TIMEOUT = "H4sIAAAAAAAA/zWQy07dMBRFfyU66jAmx287syv1lkk7uhkVrpBjn0DUvBQ7hQrx7xWFzpf20l6vMFPO4ZG6PxtBC19P3enhx/lyOd2eoYb1eaEdWvBWo0ZhjEADNUzr4+2+Hhu00ITn3Exh7lNopiOOA+3rkVlYxjks8Yn1fWYplNCHTCxO65FYedoppMzSMW+0f8xdyk5hhhYECtWgajhv7r58P3XnS3eV0shBe20HjCoOMWjkFi2h9egFDVBDPvoc93Er47p8G6dCe4b2Do6FXjaKhRKjlzEXuP6znX/TUt6BVxgTtCAd98YrZVFKgxKVst6h5FJzK7QxqKQQRgnjrTUevbMCUXMBNZRxplzCvEHLLReOo5BOa17/D/v5iaFinHeoWmlb7m60xp9V4tIM0vQsYq+Z8soz50LPhLcoELnVQlRdyL+qd02q1qNUYSi0V9zhDccqU1yXlO+X+wXerm9/AVZ5B8DOAQAA"
+DATA_ERROR = "H4sIAAAAAAAA/61UXW/bNhT9KwQxIGknRaRFfRH7QIC6felWIPFblRkUee0IoUiNpJJ4Qf77IMn24q4L1mF8oaB77uHhvefyCXfgvdjCatcD5vjd5epy/cvy+vrywxJH2D4YcJjjqshIRhZ5viA5jrC22w/ODj3mOBEPPtGia5RI9CDbDTg7+FiYthNG3sZN42MlgmiEh1hqO6g43DoQysdq6HpwM911cCA6zPGCLFhCWEJp8vm7j5er5fXqhpVkozJRsiLNGWWLJhMsa1SmioowuhE4wn5ovHRtH1pr3rc6gPOYf8bgnHWxtlt8Mx2zvAcTxsgTbhXmOC1plVdpQauspIylaVoxlpdlxmiRZiylpMoqmhUpTcuC5hnNWZmSIsMRDm0HPoiux5wWdFGSqiK0IjQ6VBRz/FRjDfega8xrvLy6+nRV46jG2koxCp1+985K8J5n5RTbJ0+hST2yUg7OgUKtQbfCKA2OIyM6QGfLEXCGWo+MDUjBpjWgJpqjuoloLGpMWEzpijCeUs7oRVlV3xPCCZnwHtx9K+dj9/1Zz/2ZwtJqtfZBuFBjHtwAUY03g5HjLdajlinxP/V/4j9yddBZt1v79o+ZkpIFO0UIN9dNOMPFg+ez97joY2NduAXhQ0z5S8PyQy7/HwQ6+H0AH9atmlQUkGcLaMqYZFkWM0lkXDFWxSwtVLXI0iot5obAo4T+2PSVExIaIe/QeWd9QA4kmICk0Bpp4cMbXtcGofetBlTXNU5sH5J+F26tSaTtOmsSbbdbcNPWmu1674yLfjfiI6RbAyhLo9E1e4tNlAg58IMO6MeDmc5hHIoISWsCPIYIvRVu6yP09u3dw/j1Zp93XL/9y/XFFe6FS4Lwd8mpv04Vp7PivbSDYtF6QJPZz0dsAB/G/VTZ4cxfRQcT9tUpuUDvWoV2dkAdCMPR2afrGffzabv+cveRdx6YIOTdOox9rDF/qnHY9V/D3Qs9fIn4QWrhPTo7Is9+OsHW+NXxfh6fCasGPWObodWhNX72qRMd+Hp84Wq8afeQb7LP9EK1ZszM0hfWf/laHUoQoAMTpsi32wo/RyciXzHIC03p3zQdzPIVTf9oHPx8M5bx0Ynd3MTDQNM4z2mRF0LGOSlBNSwnlVK0XChWkCpjBavxc21Ggj8Bnrtc6D0HAAA="
+
+
+def create_logs_data(messages: list[str]) -> str:
+    raw = {
+        "messageType": "DATA_MESSAGE",
+        "owner": "123456789012",
+        "logGroup": "/aws/lambda/test",
+        "logStream": "2024/04/11/[$LATEST]0123456789abcdef",
+        "subscriptionFilters": ["test"],
+        "logEvents": [
+            {"id": str(i), "timestamp": 1712810238551 + i, "message": m}
+            for i, m in enumerate(messages)
+        ],
+    }
+    return b64encode(gzip.compress(json.dumps(raw).encode())).decode()
+
+
+class TestDecodeLogsData:
+    @pytest.mark.parametrize("data", [DATA_TIMEOUT, DATA_ERROR])
+    @pytest.mark.parametrize("chunk_size", [16, 64 * 1024])
+    def test_normal(self, data, chunk_size):
+        expected = CloudWatchLogsEvent({"awslogs": {"data": data}}).parse_logs_data()
+
+        header, log_events = decoder.decode_logs_data(data, chunk_size=chunk_size)
+
+        assert header.log_group == expected.log_group
+        assert header.log_stream == expected.log_stream
+        assert header.owner == expected.owner
+        assert header.subscription_filters == expected.subscription_filters
+        assert [(x.id, x.timestamp, x.message) for x in log_events] == [
+            (x.get_id, x.timestamp, x.message) for x in expected.log_events
+        ]
+
+    def test_multibyte_and_escaped_messages(self):
+        messages = ["日本語のエラー" * 50, '{"level":"ERROR","message":"a]b,c"}', ""]
+        data = create_logs_data(messages)
+
+        _, log_events = decoder.decode_logs_data(data, chunk_size=8)
+
+        assert [x.message for x in log_events] == messages
+
+    @pytest.mark.parametrize("chunk_size", [16, 64 * 1024])
+    def test_header_after_log_events(self, chunk_size):
+        """logEvents より後ろにヘッダーのキーがあっても読める"""
+        raw = {
+            "messageType": "DATA_MESSAGE",
+            "logEvents": [{"id": "1", "timestamp": 1712810238551, "message": "m"}],
+            "owner": "123456789012",
+            "logGroup": "/aws/lambda/test",
+            "logStream": "s",
+            "subscriptionFilters": ["test"],
+        }
+        data = b64encode(gzip.compress(json.dumps(raw).encode())).decode()
+
+        header, log_events = decoder.decode_logs_data(data, chunk_size=chunk_size)
+
+        assert header.log_group == "/aws/lambda/test"
+        assert header.subscription_filters == ["test"]
+        assert [x.message for x in log_events] == ["m"]
+
+    def test_lazy(self, monkeypatch):
+        data = create_logs_data([f"message {i}" * 100 for i in range(1000)])
+        original = decoder.iter_decoded_text
+        consumed = []
+
+        def iter_decoded_text(*args, **kwargs):
+            for chunk in original(*args, **kwargs):
+                consumed.append(chunk)
+                yield chunk
+
+        monkeypatch.setattr(decoder, "iter_decoded_text", iter_decoded_text)
+
+        _, log_events = decoder.decode_logs_data(data, chunk_size=4096)
+        first = next(log_events)
+
+        assert first.message.startswith("message 0")
+        assert len(consumed) < 5
+        assert len(list(log_events)) == 999
+
+    def test_truncated(self):
+        data = b64encode(
+            gzip.compress(
+                b'{"messageType":"DATA_MESSAGE","owner":"1","logGroup":"g","logStream":"s","subscriptionFilters":[],"logEvents":[{"id":"1"'
+            )
+        ).decode()
+
+        _, log_events = decoder.decode_logs_data(data)
+
+        with pytest.raises(json.JSONDecodeError):
+            list(log_events)
@@ -0,0 +1,190 @@
+import threading
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+import handlers.error_processor.delivery as delivery
+
+
+class ScriptedEventBridgeClient:
+    """エントリの Detail ごとに失敗させる回数とエラーコードを指定できる PutEvents クライアント。"""
+
+    def __init__(
+        self,
+        failures: dict[str, list[str]] | None = None,
+        request_errors: dict[str, list[Exception]] | None = None,
+    ):
+        self.failures = {k: list(v) for k, v in (failures or {}).items()}
+        # keyed by the first Detail of the request
+        self.request_errors = {k: list(v) for k, v in (request_errors or {}).items()}
+        self.calls: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def put_events(self, *, Entries):
+        with self._lock:
+            self.calls.append([x["Detail"] for x in Entries])
+            request_errors = self.request_errors.get(Entries[0]["Detail"], [])
+            if len(request_errors) > 0:
+                raise request_errors.pop(0)
+            resp = []
+            for entry in Entries:
+                codes = self.failures.get(entry["Detail"], [])
+                if len(codes) > 0:
+                    resp.append({"ErrorCode": codes.pop(0), "ErrorMessage": "dummy"})
+                else:
+                    resp.append({"EventId": f"id-{entry['Detail']}"})
+            return {"FailedEntryCount": 0, "Entries": resp}
+
+
+def create_client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": "dummy"}}, "PutEvents")
+
+
+def create_chunks(details: list[str], size: int):
+    entries = [(str(i), {"Detail": d}) for i, d in enumerate(details)]
+    return [entries[i : i + size] for i in range(0, len(entries), size)]
+
+
+class TestDeliverEntries:
+    def test_normal(self):
+        client = ScriptedEventBridgeClient()
+        details = [f"m{i}" for i in range(25)]
+
+        report = delivery.deliver_entries(
+            chunks=create_chunks(details, 10), client=client, max_workers=3
+        )
+
+        assert len(report.succeeded) == 25
+        assert report.failed == {}
+        assert report.retries == 0
+        assert [c.index for c in report.chunks] == [0, 1, 2]
+        assert [c.size for c in report.chunks] == [10, 10, 5]
+        assert all(c.duration >= 0 for c in report.chunks)
+        assert report.delivered_at.keys() == report.succeeded.keys()
+
+    def test_retry_only_failed_entries(self):
+        client = ScriptedEventBridgeClient(
+            {"m1": ["ThrottlingException"], "m3": ["InternalFailure"]}
+        )
+
+        report = delivery.deliver_entries(
+            chunks=create_chunks([f"m{i}" for i in range(5)], 10),
+            client=client,
+            base_delay=0,
+        )
+
+        assert len(report.succeeded) == 5
+        assert report.failed == {}
+        assert report.chunks[0].attempts == 2
+        assert client.calls[1] == ["m1", "m3"]
+
+    def test_before_send(self):
+        """再送も含め、送信の直前に毎回呼ばれる"""
+        client = ScriptedEventBridgeClient({"m1!": ["InternalFailure"]})
+        calls = []
+
+        def before_send(key, entry):
+            calls.append(key)
+            return {**entry, "Detail": entry["Detail"].rstrip("!") + "!"}
+
+        report = delivery.deliver_entries(
+            chunks=create_chunks(["m0", "m1"], 10),
+            client=client,
+            base_delay=0,
+            before_send=before_send,
+        )
+
+        assert len(report.succeeded) == 2
+        assert calls == ["0", "1", "1"]
+        assert client.calls == [["m0!", "m1!"], ["m1!"]]
+
+    def test_retry_budget_exhausted(self):
+        client = ScriptedEventBridgeClient({"m0": ["ThrottlingException"] * 10})
+
+        report = delivery.deliver_entries(
+            chunks=create_chunks(["m0", "m1"], 10),
+            client=client,
+            max_attempts=3,
+            base_delay=0,
+        )
+
+        assert report.failed == {"0": "ThrottlingException"}
+        assert report.succeeded == {"1": "id-m1"}
+        assert report.chunks[0].attempts == 3
+
+    def test_non_retryable_error_is_not_retried(self):
+        client = ScriptedEventBridgeClient({"m0": ["MalformedDetail"]})
+
+        report = delivery.deliver_entries(
+            chunks=create_chunks(["m0", "m1"], 10), client=client, base_delay=0
+        )
+
+        assert report.failed == {"0": "MalformedDetail"}
+        assert len(client.calls) == 1
+
+    @pytest.mark.parametrize(
+        "code", ["ThrottlingException", "InternalFailure", "ServiceUnavailable"]
+    )
+    def test_backoff(self, monkeypatch, code):
+        """スロットリング以外の再送可能なエラーでも待ってから再送する"""
+        sleeps = []
+        monkeypatch.setattr(delivery.time, "sleep", sleeps.append)
+        client = ScriptedEventBridgeClient({"m0": [code] * 2})
+
+        report = delivery.deliver_entries(
+            chunks=create_chunks(["m0"], 10), client=client, base_delay=0.1
+        )
+
+        assert report.succeeded == {"0": "id-m0"}
+        assert len(sleeps) == 2
+
+    def test_request_error(self):
+        """リクエスト全体の失敗はそのチャンクの失敗として数え、他のチャンクは送る"""
+        client = ScriptedEventBridgeClient(
+            request_errors={"m0": [create_client_error("AccessDeniedException")]}
+        )
+
+        report = delivery.deliver_entries(
+            chunks=create_chunks(["m0", "m1", "m2"], 2), client=client, base_delay=0
+        )
+
+        assert report.failed == {
+            "0": "AccessDeniedException",
+            "1": "AccessDeniedException",
+        }
+        assert report.succeeded == {"2": "id-m2"}
+        assert report.chunks[0].attempts == 1
+
+    def test_request_error_retryable(self):
+        client = ScriptedEventBridgeClient(
+            request_errors={
+                "m0": [
+                    create_client_error("ThrottlingException"),
+                    EndpointConnectionError(endpoint_url="https://events"),
+                ]
+            }
+        )
+
+        report = delivery.deliver_entries(
+            chunks=create_chunks(["m0", "m1"], 10), client=client, base_delay=0
+        )
+
+        # 接続エラーは botocore が再試行済みなので、ここでは再送しない
+        assert report.failed == {
+            "0": "EndpointConnectionError",
+            "1": "EndpointConnectionError",
+        }
+        assert report.chunks[0].attempts == 2
+
+
+class TestComputeBackoff:
+    @pytest.mark.parametrize(
+        "attempt, expected_max",
+        [(0, 0.1), (1, 0.2), (3, 0.8), (10, 2.0)],
+    )
+    def test_normal(self, attempt, expected_max):
+        for _ in range(100):
+            actual = delivery.compute_backoff(
+                attempt=attempt, base_delay=0.1, max_delay=2.0
+            )
+            assert 0 <= actual <= expected_max
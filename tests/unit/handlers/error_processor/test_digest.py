@@ -0,0 +1,86 @@
+import json
+from datetime import datetime
+
+import pytest
+
+import handlers.error_processor.digest as digest
+from handlers.error_processor.renderer import (
+    JST,
+    compile_slack_template,
+    render_digest_section,
+)
+
+NOW = datetime(2024, 4, 11, 15, 7, 17, 544914, tzinfo=JST)
+
+
+@pytest.fixture()
+def template():
+    return compile_slack_template(
+        system_name="test", log_group="g", log_stream="s", url_lambda="u"
+    )
+
+
+def create_sections(n: int, *, message: str = "m") -> list[str]:
+    return [
+        render_digest_section(
+            timestamp=1712810238551 + i,
+            lambda_request_id=f"req-{i}",
+            url_logs="l",
+            message=message,
+            error_message=None,
+        )
+        for i in range(n)
+    ]
+
+
+class TestDigestPacker:
+    def test_normal(self, template):
+        packer = digest.DigestPacker(template=template, max_errors=4)
+
+        actual = list(packer.pack(create_sections(10), now=NOW))
+
+        assert len(actual) == 3
+        blocks = [json.loads(x)["blocks"] for x in actual]
+        assert [len(x) - digest.DIGEST_HEADER_BLOCKS for x in blocks] == [4, 4, 2]
+        assert blocks[0][0]["text"]["text"] == f"<!channel> `{NOW}` *Errors:* `4`"
+        assert packer.stats.as_dict() == {"errors": 10, "messages": 3}
+
+    def test_max_blocks(self, template):
+        # Slackのブロック数上限を超えないようにエラー数が丸められる
+        packer = digest.DigestPacker(template=template, max_errors=100)
+
+        actual = list(packer.pack(create_sections(100), now=NOW))
+
+        assert all(
+            len(json.loads(x)["blocks"]) <= digest.SLACK_MAX_BLOCKS for x in actual
+        )
+        assert packer.stats.messages == 3
+
+    def test_max_bytes(self, template):
+        packer = digest.DigestPacker(template=template, max_bytes=5000)
+
+        actual = list(packer.pack(create_sections(6, message="x" * 1000), now=NOW))
+
+        assert all(len(x) <= 5000 for x in actual)
+        assert sum(len(json.loads(x)["blocks"]) - 6 for x in actual) == 6
+
+    def test_oversized_section(self, template):
+        # 予算を超える単独のエラーもそれだけで1通として送る
+        packer = digest.DigestPacker(template=template, max_bytes=100)
+
+        actual = list(packer.pack(create_sections(2), now=NOW))
+
+        assert len(actual) == 2
+
+    def test_empty(self, template):
+        packer = digest.DigestPacker(template=template)
+
+        assert list(packer.pack([], now=NOW)) == []
+
+    def test_pack_with_timestamps(self, template):
+        packer = digest.DigestPacker(template=template, max_errors=2)
+        sections = create_sections(3)
+
+        actual = list(packer.pack_with_timestamps(zip(sections, [30, 10, 20]), now=NOW))
+
+        assert [x[1] for x in actual] == [(30, 10), (20,)]
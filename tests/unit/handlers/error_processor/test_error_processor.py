@@ -1,13 +1,18 @@
+import gzip
 import json
+from base64 import b64encode
 
 import pytest
 from aws_lambda_powertools.utilities.data_classes.cloud_watch_logs_event import (
     CloudWatchLogsEvent,
     CloudWatchLogsLogEvent,
 )
+from botocore.stub import ANY, Stubber
 from freezegun import freeze_time
 
 import handlers.error_processor.error_processor as index
+import utils.priming.priming as priming
+from utils.aws import create_client
 
 
 class TestParseLogMessage:
@@ -332,6 +337,188 @@ class TestCreateSlackPayload:
         assert actual == expected[0]
 
 
+def create_logs_data(messages: list[str]) -> str:
+    raw = {
+        "messageType": "DATA_MESSAGE",
+        "owner": "123456789012",
+        "logGroup": "/aws/lambda/test",
+        "logStream": "2024/04/11/[$LATEST]0123456789abcdef",
+        "subscriptionFilters": ["test"],
+        "logEvents": [
+            {"id": str(i), "timestamp": 1712810238551 + i, "message": m}
+            for i, m in enumerate(messages)
+        ],
+    }
+    return b64encode(gzip.compress(json.dumps(raw).encode())).decode()
+
+
+@pytest.fixture
+def sent_details():
+    # create_client shares the client across tests, so the hook must not outlive one
+    client = create_client("events")
+    sent = []
+
+    def capture(params, **kwargs):
+        sent.extend(x["Detail"] for x in params["Entries"])
+
+    client.meta.events.register("provide-client-params.events.PutEvents", capture)
+    yield client, sent
+    client.meta.events.unregister("provide-client-params.events.PutEvents", capture)
+
+
+class TestDigest:
+    @freeze_time("2024-04-11 15:07:17.544914+09:00")
+    def test_normal(self, sent_details):
+        """ダイジェストを有効にすると、main は複数のエラーをまとめて送る"""
+        client_events, sent = sent_details
+        env = index.EnvironmentVariables(
+            event_bus_name="TestEventBus",
+            aws_default_region="ap-northeast-1",
+            system_name="test",
+            digest_enabled=True,
+            digest_max_errors=2,
+        )
+        event = {
+            "awslogs": {
+                "data": create_logs_data(
+                    [f"Task timed out after {i}.00 seconds" for i in range(5)]
+                )
+            }
+        }
+
+        with Stubber(client_events) as stub_events:
+            stub_events.add_response(
+                "put_events",
+                {
+                    "FailedEntryCount": 0,
+                    "Entries": [{"EventId": f"id-{i}"} for i in range(3)],
+                },
+                {"Entries": ANY},
+            )
+
+            index.main(event=event, client_events=client_events, env=env)
+
+            stub_events.assert_no_pending_responses()
+        assert len(sent) == 3
+        # トレースが無効でも入力変換が参照する trace キーは送る
+        assert all(json.loads(x)["trace"] is None for x in sent)
+        texts = [
+            x["text"]["text"]
+            for x in json.loads(sent[0])["blocks"]
+            if x["type"] == "section"
+        ]
+        assert texts[0] == "<!channel> `2024-04-11 15:07:17.544914+09:00` *Errors:* `2`"
+        assert texts[-1].endswith("```\nTask timed out after 1.00 seconds\n```")
+
+
+class TestEnvironmentVariables:
+    def test_rate_limit_table_name_required(self):
+        with pytest.raises(ValueError, match="RATE_LIMIT_TABLE_NAME"):
+            index.EnvironmentVariables(
+                event_bus_name="TestEventBus",
+                aws_default_region="ap-northeast-1",
+                system_name="test",
+                rate_limit_backend="dynamodb",
+            )
+
+
+class TestUnavailableRateLimitStore:
+    def test_normal(self, monkeypatch):
+        """レート制限の状態が読めなくても通知は送られる"""
+        client_dynamodb = create_client("dynamodb")
+        client_events = create_client("events")
+        monkeypatch.setattr(
+            index, "create_client", lambda name, **kwargs: client_dynamodb
+        )
+        env = index.EnvironmentVariables(
+            event_bus_name="TestEventBus",
+            aws_default_region="ap-northeast-1",
+            system_name="test",
+            rate_limit_backend="dynamodb",
+            rate_limit_table_name="TestRateLimitTable",
+        )
+        event = {
+            "awslogs": {"data": create_logs_data(["Task timed out after 3.00 seconds"])}
+        }
+
+        with (
+            Stubber(client_dynamodb) as stub_dynamodb,
+            Stubber(client_events) as stub_events,
+        ):
+            stub_dynamodb.add_client_error(
+                "get_item", service_error_code="ProvisionedThroughputExceededException"
+            )
+            stub_events.add_response(
+                "put_events",
+                {"FailedEntryCount": 0, "Entries": [{"EventId": "id-0"}]},
+                {"Entries": ANY},
+            )
+
+            index.main(event=event, client_events=client_events, env=env)
+
+            stub_events.assert_no_pending_responses()
+
+
+class TestPrime:
+    def test_normal(self, monkeypatch):
+        monkeypatch.setenv("EVENT_BUS_NAME", "TestEventBus")
+        monkeypatch.setenv("SYSTEM_NAME", "test")
+
+        # スタブ経由なのでネットワークに出ずに完了する
+        index.prime()
+
+        assert index.prime in priming._before_snapshot
+
+    def test_dynamodb(self, monkeypatch):
+        """DynamoDB でレート制限するなら、そのクライアントも温める"""
+        env = index.EnvironmentVariables(
+            event_bus_name="TestEventBus",
+            aws_default_region="ap-northeast-1",
+            system_name="test",
+            rate_limit_backend="dynamodb",
+            rate_limit_table_name="TestRateLimitTable",
+        )
+        monkeypatch.setattr(index, "get_settings", lambda cls: env)
+        names = []
+
+        def spy(name, **kwargs):
+            names.append(name)
+            return create_client(name, **kwargs)
+
+        monkeypatch.setattr(index, "create_client", spy)
+
+        index.prime()
+
+        assert names == ["events", "dynamodb"]
+
+
+class TestDebugMessages:
+    def test_normal(self, monkeypatch):
+        records = []
+        monkeypatch.setattr(
+            index.logger, "debug", lambda msg, data: records.append(data)
+        )
+
+        actual = list(index.debug_messages(messages=['{"a": 1}', '{"b": 2}']))
+
+        assert actual == ['{"a": 1}', '{"b": 2}']
+        assert [x["index"] for x in records] == [0, 1]
+        # JSON のデコードは出力時まで遅延される
+        assert records[0]["message"]() == {"a": 1}
+
+    def test_debug_disabled(self, monkeypatch):
+        """DEBUG が無効ならメッセージごとのログを組み立てない"""
+        logger = index.create_logger(index.__name__, level="INFO")
+        records = []
+        monkeypatch.setattr(logger, "debug", lambda msg, data: records.append(data))
+        monkeypatch.setattr(index, "logger", logger)
+
+        actual = list(index.debug_messages(messages=['{"a": 1}']))
+
+        assert actual == ['{"a": 1}']
+        assert records == []
+
+
 class TestPutEvents:
     @pytest.mark.parametrize(
         "events_event_bus, option",
@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+MODULE = "handlers.error_processor.error_processor"
+DIR_SRC = Path(__file__).parents[4] / "src"
+DEFERRED_MODULES = [
+    "boto3",
+    "botocore.client",
+    "aws_cloudwatch_logs_url",
+    "aws_lambda_powertools.utilities.data_classes",
+]
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        x for x in [str(DIR_SRC), env.get("PYTHONPATH")] if x
+    )
+    return subprocess.run(
+        [sys.executable, *args], env=env, capture_output=True, text=True, check=True
+    )
+
+
+# the import time itself depends on the machine, so it is measured by
+# tests/benchmark/handlers/error_processor/bench_import_time.py instead
+class TestImportTime:
+    @pytest.mark.parametrize("name", DEFERRED_MODULES)
+    def test_deferred_modules(self, name):
+        stdout = run_python(
+            "-c", f"import sys, {MODULE}; print({name!r} in sys.modules)"
+        ).stdout
+
+        assert stdout.strip() == "False"
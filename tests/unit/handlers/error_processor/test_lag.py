@@ -0,0 +1,126 @@
+import json
+
+import handlers.error_processor.lag as lag
+import handlers.error_processor.packer as packer
+from handlers.error_processor.decoder import LogEventRecord
+from handlers.error_processor.delivery import ChunkResult, DeliveryReport
+from utils.metrics import create_metrics
+
+
+def create_payload(text: str) -> str:
+    return json.dumps(
+        {
+            "blocks": [
+                {"type": "section", "text": {"type": "mrkdwn", "text": "*Message:*"}},
+                {
+                    "type": "section",
+                    "text": {"type": "mrkdwn", "text": "```\n{0}\n```".format(text)},
+                },
+            ]
+        }
+    )
+
+
+class TestLagTracker:
+    def test_normal(self):
+        metrics = create_metrics()
+        tracker = lag.LagTracker(started_at=10_000, metrics=metrics)
+        log_events = [
+            LogEventRecord(id="a", timestamp=7_000, message="x"),
+            LogEventRecord(id="b", timestamp=9_000, message="y"),
+        ]
+
+        assert list(tracker.observe_events(log_events)) == log_events
+        details = list(tracker.track([("d0", (7_000,)), ("d1", (9_000, 8_000))]))
+        tracker.observe_delivery(
+            DeliveryReport(
+                chunks=(
+                    ChunkResult(
+                        index=0,
+                        size=2,
+                        attempts=1,
+                        duration=0.1,
+                        event_ids={"0": "id-0", "1": "id-1"},
+                        failed={},
+                        delivered_at={"0": 10.5, "1": 11.0},
+                    ),
+                )
+            )
+        )
+
+        assert details == ["d0", "d1"]
+        actual = tracker.as_dict()
+        assert actual["ingest"]["count"] == 2
+        assert actual["ingest"]["max_ms"] == 3_000
+        # 配信ラグはメッセージに含まれる最も古いログから計測する
+        assert actual["delivery"]["min_ms"] == 3_000
+        assert actual["delivery"]["max_ms"] == 3_500
+        assert sorted(metrics._samples["DeliveryLag"][2]) == [3_000, 3_500]
+
+    def test_embed_trace_header(self):
+        tracker = lag.LagTracker(started_at=10_000)
+        list(tracker.track([('{"blocks": []}', (7_000,))]))
+
+        actual = json.loads(tracker.embed_trace_header("0", '{"blocks": []}'))
+
+        assert actual["blocks"] == []
+        assert actual["trace"]["trace_id"] == tracker.trace_id
+        assert actual["trace"]["log_timestamp"] == 7_000
+        assert actual["trace"]["handler_started_at"] == 10_000
+        # 送信直前まで sent_at は埋めない
+        assert actual["trace"]["sent_at"] is None
+
+    def test_stamp_sent_at(self, monkeypatch):
+        """送信のたびに sent_at を書き込み、サイズは変えない"""
+        tracker = lag.LagTracker(started_at=10_000)
+        list(tracker.track([('{"blocks": []}', (7_000,))]))
+        entry = {"Detail": tracker.embed_trace_header("0", '{"blocks": []}')}
+
+        monkeypatch.setattr(lag.time, "time", lambda: 1712810238.551)
+        first = tracker.stamp_sent_at("0", entry)
+        monkeypatch.setattr(lag.time, "time", lambda: 1712810239.0)
+        second = tracker.stamp_sent_at("0", first)
+
+        assert len(first["Detail"]) == len(entry["Detail"])
+        assert json.loads(first["Detail"])["trace"]["sent_at"] == 1712810238551
+        assert json.loads(second["Detail"])["trace"]["sent_at"] == 1712810239000
+
+    def test_stamp_sent_at_without_placeholder(self):
+        """プレースホルダーが無い Detail はそのまま送る"""
+        tracker = lag.LagTracker(started_at=10_000)
+        entry = {"Detail": json.dumps({"blocks": [], "trace": {"sent_at": None}})}
+
+        assert tracker.stamp_sent_at("0", entry) == entry
+
+    def test_stamp_sent_at_trimmed(self):
+        """大きすぎて削ったエントリにも sent_at を書き込める"""
+        tracker = lag.LagTracker(started_at=10_000)
+        detail = create_payload("x" * 5000)
+        list(tracker.track([(detail, (7_000,))]))
+        entries = [("0", {"Detail": tracker.embed_trace_header("0", detail)})]
+
+        [[(_, entry)]] = packer.EntryPacker(max_bytes=1000).pack(entries)
+        actual = json.loads(tracker.stamp_sent_at("0", entry)["Detail"])
+
+        assert packer.compute_entry_size(entry) <= 1000
+        assert actual["blocks"][1]["text"]["text"].endswith(
+            packer.TRUNCATION_MARKER + "\n```"
+        )
+        assert actual["trace"]["trace_id"] == tracker.trace_id
+        assert actual["trace"]["sent_at"] > 0
+
+
+class TestEmbedTrace:
+    def test_normal(self):
+        """トレースが無効でも trace キーは常に存在する"""
+        actual = json.loads(lag.embed_trace('{"blocks": []}'))
+
+        assert actual == {"blocks": [], "trace": None}
+
+    def test_split_trace(self):
+        detail = lag.embed_trace('{"blocks": [{"text": ",\\"trace\\":"}]}', "{}")
+
+        assert lag.split_trace(detail) == (
+            '{"blocks": [{"text": ",\\"trace\\":"}]}',
+            "{}",
+        )
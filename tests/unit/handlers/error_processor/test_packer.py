@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+import handlers.error_processor.packer as packer
+
+
+def create_entry(detail: str) -> dict:
+    return {
+        "Source": "a",
+        "DetailType": "a",
+        "Detail": detail,
+        "EventBusName": "TestEventBus",
+    }
+
+
+def create_payload(text: str) -> str:
+    return json.dumps(
+        {
+            "blocks": [
+                {"type": "section", "text": {"type": "mrkdwn", "text": "*Message:*"}},
+                {
+                    "type": "section",
+                    "text": {"type": "mrkdwn", "text": "```\n{0}\n```".format(text)},
+                },
+            ]
+        }
+    )
+
+
+class TestComputeEntrySize:
+    @pytest.mark.parametrize(
+        "entry, expected",
+        [
+            (create_entry("{}"), 14 + 1 + 1 + 2),
+            (
+                {
+                    "Source": "src",
+                    "DetailType": "dt",
+                    "Detail": '"あ"',
+                    "Resources": ["r"],
+                },
+                14 + 3 + 2 + 5 + 1,
+            ),
+        ],
+    )
+    def test_normal(self, entry, expected):
+        assert packer.compute_entry_size(entry) == expected
+
+
+class TestTrimDetail:
+    def test_not_trimmed(self):
+        detail = create_payload("short")
+        assert packer.trim_detail(detail, 1000) == detail
+
+    def test_trim_longest_text(self):
+        detail = create_payload("x" * 5000)
+
+        actual = packer.trim_detail(detail, 1000)
+
+        assert len(actual.encode()) <= 1000
+        blocks = json.loads(actual)["blocks"]
+        assert blocks[0]["text"]["text"] == "*Message:*"
+        assert blocks[1]["text"]["text"].startswith("```\nxxx")
+        assert blocks[1]["text"]["text"].endswith(packer.TRUNCATION_MARKER + "\n```")
+
+    def test_fallback_when_not_slack_payload(self):
+        actual = packer.trim_detail(json.dumps({"value": "x" * 5000}), 1000)
+
+        assert len(actual.encode()) <= 1000
+        assert "too large" in json.loads(actual)["blocks"][0]["text"]["text"]
+
+
+class TestEntryPacker:
+    def test_count_limit(self):
+        p = packer.EntryPacker()
+        entries = [(str(i), create_entry(create_payload(str(i)))) for i in range(25)]
+
+        actual = list(p.pack(entries))
+
+        assert sorted(len(x) for x in actual) == [5, 10, 10]
+        assert sorted(k for x in actual for k, _ in x) == sorted(k for k, _ in entries)
+        assert p.stats.requests == 3
+        assert p.stats.entries == 25
+
+    def test_byte_limit(self):
+        p = packer.EntryPacker(max_bytes=10_000)
+        entries = [
+            (str(i), create_entry(create_payload("x" * size)))
+            for i, size in enumerate([6000, 3000, 6000, 3000, 500])
+        ]
+
+        actual = list(p.pack(entries))
+
+        assert all(
+            sum(packer.compute_entry_size(e) for _, e in x) <= 10_000 for x in actual
+        )
+        assert p.stats.requests == 3
+        assert all(x <= 10_000 for x in p.stats.bytes_per_request)
+
+    def test_oversized_entry_is_trimmed(self):
+        p = packer.EntryPacker(max_bytes=2_000)
+        entries = [("0", create_entry(create_payload("x" * 10_000)))]
+
+        actual = list(p.pack(entries))
+
+        assert len(actual) == 1
+        assert packer.compute_entry_size(actual[0][0][1]) <= 2_000
+        assert p.stats.trimmed == 1
+
+    def test_lazy(self):
+        p = packer.EntryPacker()
+        consumed = []
+
+        def generate():
+            for i in range(100):
+                consumed.append(i)
+                yield str(i), create_entry(create_payload(str(i)))
+
+        first = next(p.pack(generate()))
+
+        assert len(first) == 10
+        assert len(consumed) == 10
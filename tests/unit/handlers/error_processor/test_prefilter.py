@@ -0,0 +1,88 @@
+import re
+from pathlib import Path
+
+import pytest
+
+import handlers.error_processor.prefilter as prefilter
+from handlers.error_processor.decoder import LogEventRecord
+
+PATH_SUBSCRIPTION_FILTERS = (
+    Path(__file__).parents[4]
+    / "terraform"
+    / "modules"
+    / "lambda_function"
+    / "lambda.tf"
+)
+
+# サブスクリプションフィルターのパターンごとに、それが転送する行の例
+SUBSCRIPTION_SAMPLES = {
+    '{ $.level = "ERROR" }': [
+        '{"level":"ERROR","message":"failed"}',
+        '{"level": "ERROR", "message": "failed"}',
+        '{ "level" : "ERROR" }',
+    ],
+    '?"Task timed out" ?"Runtime exited with error" ?"Runtime.ImportModuleError"': [
+        "2024-04-11T04:37:18.550Z d136f36b-c0b5-4949-88ab-297020017522 Task timed out after 180.10 seconds",
+        "RequestId: d136f36b-c0b5-4949-88ab-297020017522 Error: Runtime exited with error: signal: killed",
+        "[ERROR] Runtime.ImportModuleError: Unable to import module 'index': No module named 'foo'",
+    ],
+}
+
+
+def read_subscription_filter_patterns() -> set[str]:
+    text = PATH_SUBSCRIPTION_FILTERS.read_text()
+    return {
+        x.replace('\\"', '"')
+        for x in re.findall(r'filter_pattern\s*=\s*"((?:[^"\\]|\\.)*)"', text)
+    }
+
+
+def create_record(message: str) -> LogEventRecord:
+    return LogEventRecord(id="0", timestamp=1712810238551, message=message)
+
+
+class TestPrefilter:
+    @pytest.mark.parametrize(
+        "message, expected",
+        [
+            ('{"level":"ERROR","message":"failed"}', True),
+            ('{"level":"CRITICAL","message":"failed"}', True),
+            ('{"level":"WARNING","stack_trace":{"type":"ValueError"}}', True),
+            ("Traceback (most recent call last):\n", True),
+            (
+                "2024-04-11T04:37:18.550Z d136f36b-c0b5-4949-88ab-297020017522 Task timed out after 180.10 seconds\n\n",
+                True,
+            ),
+            ('{"level":"INFO","message":"start function"}', False),
+            ('{"level":"DEBUG","message":"ERROR is only in the text"}', False),
+            ("START RequestId: d136f36b-c0b5-4949-88ab-297020017522", False),
+        ],
+    )
+    def test_default_markers(self, message, expected):
+        assert prefilter.Prefilter().match(message) is expected
+
+    def test_subscription_filter_samples(self):
+        """サブスクリプションフィルターが転送する行は全て残す"""
+        assert read_subscription_filter_patterns() == SUBSCRIPTION_SAMPLES.keys()
+
+        p = prefilter.Prefilter()
+        for pattern, samples in SUBSCRIPTION_SAMPLES.items():
+            for sample in samples:
+                assert p.match(sample), (pattern, sample)
+
+    def test_filter_and_stats(self):
+        p = prefilter.Prefilter(markers=["boom"])
+        records = [create_record(x) for x in ["boom 1", "ok", "ok", "boom 2"]]
+
+        actual = list(p.filter(records))
+
+        assert [x.message for x in actual] == ["boom 1", "boom 2"]
+        assert p.stats.as_dict() == {"seen": 4, "skipped": 2, "passed": 2}
+
+    @pytest.mark.parametrize("markers", [None, []])
+    def test_disabled(self, markers):
+        p = prefilter.Prefilter(markers=markers)
+        records = [create_record(x) for x in ["a", "b"]]
+
+        assert list(p.filter(records)) == records
+        assert p.stats.skipped == 0
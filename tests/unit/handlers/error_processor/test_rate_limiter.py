@@ -0,0 +1,198 @@
+from dataclasses import replace
+
+import pytest
+from botocore.exceptions import ReadTimeoutError
+from botocore.stub import Stubber
+
+import handlers.error_processor.rate_limiter as rate_limiter
+from handlers.error_processor.aggregator import LogMessageGroup
+from handlers.error_processor.error_processor import LogMessage
+from utils.aws import create_client
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_group(error_message: str, count: int = 1) -> LogMessageGroup:
+    return LogMessageGroup(
+        key=error_message,
+        log_message=LogMessage(
+            lambda_request_id=None,
+            timestamp=1712810238551,
+            message="error occurred in handler",
+            error_message=error_message,
+        ),
+        count=count,
+        first_timestamp=1712810238551,
+        last_timestamp=1712810238551,
+        request_ids=(),
+    )
+
+
+class TestConsumeToken:
+    def test_normal(self):
+        state, decision = rate_limiter.consume_token(
+            None, now=0, capacity=2, refill_per_second=1
+        )
+        assert decision == rate_limiter.RateLimitDecision(allowed=True, suppressed=0)
+        assert state.tokens == 1
+
+        state, decision = rate_limiter.consume_token(
+            state, now=0, capacity=2, refill_per_second=1
+        )
+        assert decision.allowed is True
+
+        state, decision = rate_limiter.consume_token(
+            state, now=0, capacity=2, refill_per_second=1, weight=3
+        )
+        assert decision == rate_limiter.RateLimitDecision(allowed=False, suppressed=3)
+
+        state, decision = rate_limiter.consume_token(
+            state, now=1, capacity=2, refill_per_second=1
+        )
+        assert decision == rate_limiter.RateLimitDecision(allowed=True, suppressed=3)
+        assert state.suppressed == 0
+
+
+class TestInMemoryStateStore:
+    def test_lru_eviction(self):
+        store = rate_limiter.InMemoryStateStore(max_size=2)
+        state = rate_limiter.BucketState(tokens=1, updated_at=0, suppressed=0)
+
+        store.save("a", state, None)
+        store.save("b", state, None)
+        store.load("a")
+        store.save("c", state, None)
+
+        assert store.load("a")[0] == state
+        assert store.load("b")[0] is None
+        assert len(store) == 2
+
+    def test_expiry(self):
+        clock = FakeClock()
+        store = rate_limiter.InMemoryStateStore(ttl=10, clock=clock)
+        store.save(
+            "a", rate_limiter.BucketState(tokens=0, updated_at=0, suppressed=1), None
+        )
+
+        clock.now += 10
+
+        assert store.load("a") == (None, None)
+
+
+class TestRateLimiter:
+    def test_filter(self):
+        clock = FakeClock()
+        limiter = rate_limiter.RateLimiter(
+            store=rate_limiter.InMemoryStateStore(clock=clock),
+            capacity=1,
+            refill_per_second=1 / 60,
+            clock=clock,
+        )
+        groups = [
+            create_group("[builtins.ValueError] a"),
+            create_group("[builtins.ValueError] a", count=4),
+            create_group("[builtins.KeyError] b"),
+        ]
+
+        actual = list(limiter.filter(groups, log_group="/aws/lambda/test"))
+
+        assert [x.log_message.error_message for x in actual] == [
+            "[builtins.ValueError] a",
+            "[builtins.KeyError] b",
+        ]
+        assert limiter.stats.as_dict() == {"allowed": 2, "suppressed": 1}
+
+        clock.now += 60
+        actual = list(
+            limiter.filter(
+                [create_group("[builtins.ValueError] a")], log_group="/aws/lambda/test"
+            )
+        )
+
+        assert actual[0].suppressed == 4
+
+    def test_fingerprint_ignores_template_id(self):
+        """テンプレート ID はコンテナごとに異なりうるので共有のキーには使わない"""
+        a = replace(create_group("[builtins.ValueError] user 1"), template_id="a")
+        b = replace(create_group("[builtins.ValueError] user 2"), template_id="b")
+
+        assert rate_limiter.create_fingerprint(
+            log_group="a", group=a
+        ) == rate_limiter.create_fingerprint(log_group="a", group=b)
+
+    def test_fingerprint_depends_on_log_group(self):
+        group = create_group("[builtins.ValueError] a")
+
+        assert rate_limiter.create_fingerprint(
+            log_group="a", group=group
+        ) != rate_limiter.create_fingerprint(log_group="b", group=group)
+
+
+class TestStateStoreUnavailable:
+    @pytest.mark.parametrize(
+        "operation, code",
+        [
+            ("get_item", "ProvisionedThroughputExceededException"),
+            ("get_item", "ResourceNotFoundException"),
+            ("put_item", "AccessDeniedException"),
+        ],
+    )
+    def test_normal(self, operation, code, monkeypatch):
+        """条件付き書き込みの競合以外の失敗でも通知を止めない"""
+        client = create_client("dynamodb")
+        warnings = []
+        monkeypatch.setattr(
+            rate_limiter.logger, "warning", lambda msg, **kwargs: warnings.append(msg)
+        )
+        limiter = rate_limiter.RateLimiter(
+            store=rate_limiter.DynamoDBStateStore(table_name="t", client=client)
+        )
+
+        with Stubber(client) as stubber:
+            if operation == "put_item":
+                stubber.add_response("get_item", {})
+            stubber.add_client_error(operation, service_error_code=code)
+
+            actual = limiter.acquire("a")
+
+        assert actual == rate_limiter.RateLimitDecision(allowed=True, suppressed=0)
+        assert code in warnings[0]
+
+    def test_botocore_error(self, monkeypatch):
+        client = create_client("dynamodb")
+
+        def get_item(**kwargs):
+            raise ReadTimeoutError(endpoint_url="http://localhost")
+
+        monkeypatch.setattr(client, "get_item", get_item)
+        limiter = rate_limiter.RateLimiter(
+            store=rate_limiter.DynamoDBStateStore(table_name="t", client=client)
+        )
+
+        assert limiter.acquire("a").allowed is True
+
+
+class TestDynamoDBStateStore:
+    @pytest.mark.parametrize(
+        "dynamodb_table", ["TestRateLimitTable"], indirect=["dynamodb_table"]
+    )
+    @pytest.mark.usefixtures("dynamodb_table")
+    def test_normal(self, client_dynamodb):
+        store = rate_limiter.DynamoDBStateStore(
+            table_name="TestRateLimitTable", client=client_dynamodb
+        )
+        state = rate_limiter.BucketState(tokens=1.5, updated_at=100.0, suppressed=2)
+
+        assert store.load("a") == (None, None)
+        assert store.save("a", state, None) is True
+        assert store.save("a", state, None) is False
+        assert store.load("a") == (state, 0)
+        assert store.save("a", state, 0) is True
+        assert store.save("a", state, 0) is False
+        assert store.load("a") == (state, 1)
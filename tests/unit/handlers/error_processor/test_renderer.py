@@ -0,0 +1,158 @@
+import json
+from datetime import datetime
+
+import pytest
+
+import handlers.error_processor.renderer as renderer
+
+
+def section(text: str) -> dict:
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+
+def create_expected(
+    *,
+    now,
+    timestamp,
+    lambda_request_id,
+    url_logs,
+    message,
+    error_message,
+    system_name,
+    log_group,
+    log_stream,
+    url_lambda,
+) -> str:
+    blocks = [
+        section(f"<!channel> `{now}`"),
+        {"type": "divider"},
+        section(f"*System Name:* `{system_name}`"),
+        section(f"*Log Group:* `{log_group}`"),
+        section(f"*Log Stream:* `{log_stream}`"),
+        section(f"*Timestamp:* `{timestamp}`"),
+        section(
+            "*Datetime:* `{0}`".format(
+                datetime.fromtimestamp(timestamp / 1000, tz=renderer.JST)
+            )
+        ),
+    ]
+    if lambda_request_id is not None:
+        blocks.append(section(f"*Lambda Request ID:* `{lambda_request_id}`"))
+    blocks += [
+        section(f"*Lambda Console:* <{url_lambda}|link>"),
+        section(f"*CloudWatch Logs Link:* <{url_logs}|link>"),
+        section("*Message:*"),
+        section("```\n{0}\n```".format(message)),
+    ]
+    if error_message is not None:
+        blocks += [
+            section("*Error Message:*"),
+            section("```\n{0}\n```".format(error_message)),
+        ]
+    return json.dumps({"blocks": blocks})
+
+
+class TestSlackPayloadTemplate:
+    @pytest.mark.parametrize(
+        "invariant",
+        [
+            {
+                "system_name": "test",
+                "log_group": "/aws/lambda/test-function",
+                "log_stream": "2024/04/11/[$LATEST]3363f5957f0c4cfca501707e079092ef",
+                "url_lambda": "https://ap-northeast-1.console.aws.amazon.com/lambda/home?region=ap-northeast-1#/functions/test-function",
+            },
+            {
+                "system_name": 'システム "名"',
+                "log_group": "/aws/lambda/\\escaped\t",
+                "log_stream": "stream",
+                "url_lambda": "https://example.com/?a=1&b=2",
+            },
+        ],
+    )
+    @pytest.mark.parametrize(
+        "per_event",
+        [
+            {
+                "lambda_request_id": None,
+                "message": "Task timed out after 180.10 seconds\n\n",
+                "error_message": None,
+            },
+            {
+                "lambda_request_id": "7e652eb8-0555-4c0c-9449-437d9253937d",
+                "message": "error occurred in handler: name 'Error' is not defined",
+                "error_message": "[builtins.NameError] {'type': \"<class 'NameError'>\"}",
+            },
+            {
+                "lambda_request_id": "id",
+                "message": "日本語 \u0000\u001f \U0001f600 </script>",
+                "error_message": "",
+            },
+        ],
+    )
+    def test_byte_identical(self, invariant, per_event):
+        option = {
+            "now": datetime(2024, 4, 11, 15, 7, 17, 544914, tzinfo=renderer.JST),
+            "timestamp": 1712810238551,
+            "url_logs": "https://example.com/logs?filter=%22id%22",
+            **per_event,
+        }
+        template = renderer.compile_slack_template(**invariant)
+
+        actual = template.render(**option)
+
+        assert actual == create_expected(**invariant, **option)
+
+    def test_occurrences(self):
+        template = renderer.compile_slack_template(
+            system_name="test", log_group="g", log_stream="s", url_lambda="u"
+        )
+
+        actual = template.render(
+            now=datetime(2024, 4, 11, 15, 7, 17, 544914, tzinfo=renderer.JST),
+            timestamp=1712810238551,
+            lambda_request_id="a",
+            url_logs="l",
+            message="m",
+            error_message=None,
+            count=3,
+            last_timestamp=1712810298551,
+            request_ids=("a", "b"),
+        )
+
+        texts = [x["text"]["text"] for x in json.loads(actual)["blocks"] if "text" in x]
+        assert (
+            "*Occurrences:* `3` (`2024-04-11 13:37:18.551000+09:00` - `2024-04-11 13:38:18.551000+09:00`)"
+            in texts
+        )
+        assert "*Sample Request IDs:* `a`, `b`" in texts
+
+
+class TestRenderDigestSection:
+    def test_normal(self):
+        actual = renderer.render_digest_section(
+            timestamp=1712810238551,
+            lambda_request_id="a",
+            url_logs="l",
+            message="m",
+            error_message="e",
+            count=2,
+        )
+
+        assert json.loads(actual) == section(
+            "*<l|Logs>* `2024-04-11 13:37:18.551000+09:00`"
+            " *Request ID:* `a` *Occurrences:* `2`\n```\nm\ne\n```"
+        )
+
+    def test_truncate(self):
+        actual = renderer.render_digest_section(
+            timestamp=1712810238551,
+            lambda_request_id=None,
+            url_logs="l",
+            message="x" * 5000,
+            error_message=None,
+        )
+
+        text = json.loads(actual)["text"]["text"]
+        assert len(text) == renderer.SLACK_MAX_SECTION_TEXT
+        assert text.endswith("...\n```")
@@ -0,0 +1,91 @@
+import handlers.error_processor.template_miner as template_miner
+from handlers.error_processor.aggregator import Aggregator
+from handlers.error_processor.error_processor import LogMessage
+
+
+class TestTokenize:
+    def test_normal(self):
+        actual = template_miner.tokenize("user 123 not found in  table-2 users")
+        assert actual == ["user", "<*>", "not", "found", "in", "<*>", "users"]
+
+
+class TestTemplateMiner:
+    def test_normal(self):
+        miner = template_miner.TemplateMiner()
+
+        first = miner.add("connection to db-primary refused by peer")
+        second = miner.add("connection to db-replica refused by peer")
+
+        assert first.template_id == second.template_id
+        assert second.template == "connection to <*> refused by peer"
+        assert second.size == 2
+        assert len(miner) == 1
+
+    def test_different_length(self):
+        miner = template_miner.TemplateMiner()
+
+        a = miner.add("connection refused")
+        b = miner.add("connection refused by peer")
+
+        assert a.template_id != b.template_id
+        assert len(miner) == 2
+
+    def test_below_threshold(self):
+        miner = template_miner.TemplateMiner(similarity_threshold=0.5)
+
+        a = miner.add("KeyError item missing from cache store")
+        b = miner.add("KeyError value absent in remote bucket")
+
+        assert a.template_id != b.template_id
+
+    def test_stable_template_id(self):
+        # 別コンテナでも同じ最初のメッセージからは同じIDになる
+        messages = ["timeout after 30 seconds", "timeout after 45 seconds"]
+        ids = [
+            [template_miner.TemplateMiner().add(x).template_id for x in messages]
+            for _ in range(2)
+        ]
+        assert ids[0] == ids[1]
+        assert ids[0][0] == ids[0][1]
+
+    def test_evict_lru(self):
+        miner = template_miner.TemplateMiner(max_clusters=2)
+
+        a = miner.add("alpha failed")
+        miner.add("beta failed to start")
+        miner.add("alpha failed")
+        miner.add("gamma failed to start now")
+
+        assert len(miner) == 2
+        # 最近使われた alpha は残り、beta は追い出されて枝も刈り取られる
+        assert miner.add("alpha failed").size == 3
+        assert "4" not in miner._root.children
+
+    def test_max_children(self):
+        miner = template_miner.TemplateMiner(max_children=2)
+
+        for word in ["alpha", "beta", "gamma", "delta"]:
+            miner.add(f"{word} failed")
+
+        assert len(miner._root.children["2"].children) == 3
+        assert template_miner.WILDCARD in miner._root.children["2"].children
+
+
+class TestAggregatorWithMiner:
+    def test_normal(self):
+        a = Aggregator(key="template", miner=template_miner.TemplateMiner())
+        log_messages = [
+            LogMessage(
+                lambda_request_id=None,
+                timestamp=i,
+                message="error occurred",
+                error_message=f"[builtins.KeyError] missing key user-{i}",
+            )
+            for i in range(3)
+        ]
+
+        actual = list(a.aggregate(log_messages))
+
+        assert len(actual) == 1
+        assert actual[0].count == 3
+        assert actual[0].template_id == actual[0].key
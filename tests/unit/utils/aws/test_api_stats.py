@@ -0,0 +1,158 @@
+import json
+
+import pytest
+from botocore.awsrequest import AWSResponse
+
+from utils.aws import create_client
+from utils.aws.api_stats import flush_api_stats, registry
+from utils.aws.pool import get_connection_pool
+from utils.logger import create_logger
+
+RESPONSE_OK = (200, {"FailedEntryCount": 0, "Entries": [{"EventId": "1"}]})
+RESPONSE_THROTTLING = (
+    400,
+    {"__type": "ThrottlingException", "message": "Rate exceeded"},
+)
+RESPONSE_VALIDATION = (
+    400,
+    {"__type": "ValidationException", "message": "invalid"},
+)
+
+
+class DummyRawResponse:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # 再試行の待機をなくしてテストを速くする
+    monkeypatch.setattr(
+        "botocore.retries.standard.ExponentialBackoff.delay_amount",
+        lambda self, context: 0,
+    )
+    create_client.cache_clear()
+    yield create_client("events", region_name="ap-northeast-1")
+    create_client.cache_clear()
+
+
+@pytest.fixture
+def logger(monkeypatch):
+    logger = create_logger("handler")
+    logger.records = []
+    monkeypatch.setattr(
+        logger, "info", lambda msg, data=None: logger.records.append((msg, data))
+    )
+    return logger
+
+
+def stub_responses(client, responses: list[tuple[int, dict]]):
+    """HTTP 送信の代わりに順番にレスポンスを返す"""
+    responses = list(responses)
+
+    def send(request, **kwargs):
+        status_code, body = responses.pop(0)
+        return AWSResponse(
+            request.url,
+            status_code,
+            {"x-amzn-RequestId": "dummy"},
+            DummyRawResponse(json.dumps(body).encode()),
+        )
+
+    client.meta.events.register("before-send", send)
+
+
+def put_events(client):
+    return client.put_events(
+        Entries=[{"Source": "test", "DetailType": "test", "Detail": "{}"}]
+    )
+
+
+class TestApiStats:
+    def test_normal(self, client):
+        stub_responses(client, [RESPONSE_OK])
+
+        put_events(client)
+
+        stats = registry.drain()["eventbridge.PutEvents"]
+        assert stats.calls == 1
+        assert stats.errors == 0
+        assert stats.retries == 0
+        assert stats.throttles == 0
+        assert stats.request_bytes > 0
+        assert stats.response_bytes == len(json.dumps(RESPONSE_OK[1]))
+        assert stats.pool_exhausted == 0
+        assert stats.latency.count == 1
+
+    def test_retry_throttling(self, client):
+        """スロットリングで再試行された回数を数える"""
+        stub_responses(client, [RESPONSE_THROTTLING, RESPONSE_THROTTLING, RESPONSE_OK])
+
+        put_events(client)
+
+        stats = registry.drain()["eventbridge.PutEvents"]
+        assert stats.calls == 1
+        assert stats.errors == 0
+        assert stats.retries == 2
+        assert stats.throttles == 2
+        assert stats.latency.count == 1
+
+    def test_error(self, client):
+        stub_responses(client, [RESPONSE_VALIDATION])
+
+        with pytest.raises(client.exceptions.ClientError):
+            put_events(client)
+
+        stats = registry.drain()["eventbridge.PutEvents"]
+        assert stats.calls == 1
+        assert stats.errors == 1
+        assert stats.retries == 0
+        assert stats.throttles == 0
+
+    def test_pool_exhausted(self, client):
+        """接続プールが空いていない状態で送信した回数を数える"""
+        stub_responses(client, [RESPONSE_OK])
+        pool = get_connection_pool(client, client.meta.endpoint_url)
+        for _ in range(pool.pool.maxsize):
+            pool.pool.get()
+
+        put_events(client)
+
+        stats = registry.drain()["eventbridge.PutEvents"]
+        assert stats.pool_exhausted == 1
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setenv("AWS_API_STATS", "false")
+        create_client.cache_clear()
+        client = create_client("events", region_name="ap-northeast-1")
+        stub_responses(client, [RESPONSE_OK])
+
+        put_events(client)
+        create_client.cache_clear()
+
+        assert registry.drain() == {}
+
+
+class TestFlushApiStats:
+    def test_normal(self, client, logger):
+        stub_responses(client, [RESPONSE_OK, RESPONSE_OK])
+        put_events(client)
+        put_events(client)
+
+        flush_api_stats(logger)
+
+        ((message, data),) = logger.records
+        assert message == "aws api calls"
+        assert data["eventbridge.PutEvents"]["calls"] == 2
+        assert data["eventbridge.PutEvents"]["latency"]["count"] == 2
+        # flush 後は集計がリセットされる
+        assert registry.drain() == {}
+
+    def test_empty(self, logger):
+        """呼び出しが無ければ何も出力しない"""
+        flush_api_stats(logger)
+
+        assert logger.records == []
@@ -0,0 +1,152 @@
+import importlib.util
+import json
+import re
+from pathlib import Path
+
+import pytest
+from botocore.loaders import Loader
+
+import utils.aws.aws as aws
+from utils.aws import create_client, get_session
+
+PATH_SCRIPT = Path(__file__).parents[4] / "scripts" / "build_botocore_models.py"
+DIR_SRC = Path(__file__).parents[4] / "src"
+
+
+@pytest.fixture
+def build_botocore_models():
+    spec = importlib.util.spec_from_file_location("build_botocore_models", PATH_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.build
+
+
+@pytest.fixture
+def clear_session():
+    get_session.cache_clear()
+    aws.get_trimmed_session.cache_clear()
+    aws.get_trimmed_operations.cache_clear()
+    create_client.cache_clear()
+    yield
+    get_session.cache_clear()
+    aws.get_trimmed_session.cache_clear()
+    aws.get_trimmed_operations.cache_clear()
+    create_client.cache_clear()
+
+
+@pytest.fixture
+def trimmed_models(tmp_path, monkeypatch, build_botocore_models, clear_session):
+    build_botocore_models(tmp_path, {"events": ["PutEvents"]})
+    monkeypatch.setattr(aws, "DIR_BOTOCORE_MODELS", tmp_path)
+    return tmp_path
+
+
+def find_declared_operations() -> list[tuple[str, tuple[str, ...]]]:
+    # create_client("<service>", ..., operations=(...)) in the deploy package
+    pattern = re.compile(
+        r'create_client\(\s*"([\w-]+)"[^()]*?operations=\(([^()]*)\)', re.DOTALL
+    )
+    declared = []
+    for path in sorted(DIR_SRC.rglob("*.py")):
+        for service, names in pattern.findall(path.read_text()):
+            declared.append((service, tuple(re.findall(r'"(\w+)"', names))))
+    return declared
+
+
+class TestCreateClient:
+    def test_normal(self, trimmed_models):
+        """operations を指定するとトリミング済みのモデルを読み込む"""
+        client = create_client(
+            "events", region_name="ap-northeast-1", operations=("PutEvents",)
+        )
+
+        assert client.meta.service_model.operation_names == ["PutEvents"]
+        assert hasattr(client, "put_events")
+
+    def test_full_by_default(self, trimmed_models):
+        """operations を指定しなければ全ての操作が使える"""
+        client = create_client("events", region_name="ap-northeast-1")
+
+        assert "PutRule" in client.meta.service_model.operation_names
+
+    def test_missing_operation(self, trimmed_models):
+        """トリミングで落とした操作を求められたら botocore 同梱のモデルを使う"""
+        client = create_client(
+            "events", region_name="ap-northeast-1", operations=("PutRule",)
+        )
+
+        assert hasattr(client, "put_rule")
+
+    def test_fallback(self, trimmed_models):
+        """トリミングしていないサービスは botocore 同梱のモデルを使う"""
+        client = create_client(
+            "sqs", region_name="ap-northeast-1", operations=("SendMessage",)
+        )
+
+        assert "ReceiveMessage" in client.meta.service_model.operation_names
+
+    def test_botocore_version_mismatch(self, trimmed_models):
+        """botocore のバージョンが違っても、API バージョンが同じならモデルを使う"""
+        path = trimmed_models / "manifest.json"
+        manifest = json.loads(path.read_text())
+        path.write_text(json.dumps({**manifest, "botocore": "0.0.0"}))
+
+        client = create_client(
+            "events", region_name="ap-northeast-1", operations=("PutEvents",)
+        )
+
+        assert client.meta.service_model.operation_names == ["PutEvents"]
+
+    def test_api_version_mismatch(self, trimmed_models, monkeypatch):
+        """実行時の botocore の API バージョンと違うモデルは使わず、警告を出す"""
+        path = trimmed_models / "manifest.json"
+        manifest = json.loads(path.read_text())
+        manifest["services"]["events"]["api_version"] = "2000-01-01"
+        path.write_text(json.dumps(manifest))
+        warnings = []
+        monkeypatch.setattr(
+            aws.logger, "warning", lambda msg, **kwargs: warnings.append(kwargs["data"])
+        )
+
+        client = create_client(
+            "events", region_name="ap-northeast-1", operations=("PutEvents",)
+        )
+
+        assert "PutRule" in client.meta.service_model.operation_names
+        assert warnings[0]["service"] == "events"
+        assert warnings[0]["trimmed"] == "2000-01-01"
+
+    def test_without_models(self, tmp_path, monkeypatch, clear_session):
+        """モデルが無ければ botocore 同梱のモデルを使う"""
+        monkeypatch.setattr(aws, "DIR_BOTOCORE_MODELS", tmp_path / "missing")
+
+        client = create_client(
+            "events", region_name="ap-northeast-1", operations=("PutEvents",)
+        )
+
+        assert "PutRule" in client.meta.service_model.operation_names
+
+
+class TestDeclaredOperations:
+    def test_normal(self, build_botocore_models):
+        """create_client に渡す操作は全てビルド対象にあり、botocore に存在する"""
+        declared = find_declared_operations()
+        operations = build_botocore_models.__globals__["OPERATIONS"]
+        loader = Loader()
+
+        assert len(declared) > 0
+        for service, names in declared:
+            assert set(names) <= set(operations[service]), (service, names)
+            model = loader.load_service_model(service, "service-2")
+            assert set(names) <= model["operations"].keys(), (service, names)
+
+    @pytest.mark.skipif(
+        not (aws.DIR_BOTOCORE_MODELS / "manifest.json").is_file(),
+        reason="make build-botocore-models has not been run",
+    )
+    def test_built_models(self, clear_session):
+        """ビルド済みのモデルが開発環境の botocore で使われ、宣言した操作を含む"""
+        trimmed = aws.get_trimmed_operations()
+
+        for service, names in find_declared_operations():
+            assert trimmed[service].issuperset(names), (service, names)
@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.aws import create_client, create_resource, get_pool_stats
+from utils.aws.pool import get_connection_pool, is_pool_exhausted
+
+URL_EVENTS = "https://events.ap-northeast-1.amazonaws.com/"
+
+
+@pytest.fixture
+def clear_clients():
+    create_client.cache_clear()
+    yield
+    create_client.cache_clear()
+
+
+class TestCreateClient:
+    def test_normal(self, clear_clients):
+        client = create_client("events", region_name="ap-northeast-1")
+
+        assert client.meta.config.max_pool_connections == 10
+        assert client.meta.config.tcp_keepalive is True
+
+    @pytest.mark.parametrize(
+        "max_pool_connections, expected",
+        [(32, 32), (4, 10)],
+    )
+    def test_max_pool_connections(self, clear_clients, max_pool_connections, expected):
+        """呼び出し側の並列数に合わせてプールを広げる (既定値より小さくはしない)"""
+        client = create_client(
+            "events",
+            region_name="ap-northeast-1",
+            max_pool_connections=max_pool_connections,
+        )
+
+        assert client.meta.config.max_pool_connections == expected
+        assert client.meta.config.tcp_keepalive is True
+        assert client.meta.config.retries == {"mode": "standard"}
+
+
+class TestCreateResource:
+    def test_normal(self):
+        """リソースはスレッドごとにキャッシュされる"""
+        first = create_resource("dynamodb", region_name="ap-northeast-1")
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other = executor.submit(
+                create_resource, "dynamodb", region_name="ap-northeast-1"
+            ).result()
+
+        assert create_resource("dynamodb", region_name="ap-northeast-1") is first
+        assert other is not first
+        assert first.meta.client.meta.config.tcp_keepalive is True
+
+
+class TestGetPoolStats:
+    def test_normal(self, clear_clients):
+        client = create_client(
+            "events", region_name="ap-northeast-1", max_pool_connections=2
+        )
+        pool = get_connection_pool(client, URL_EVENTS)
+
+        assert not is_pool_exhausted(pool)
+        (stats,) = get_pool_stats(client)
+        assert stats.host == "events.ap-northeast-1.amazonaws.com"
+        assert stats.max_size == 10
+        assert stats.in_use == 0
+
+    def test_exhausted(self, clear_clients):
+        """全ての接続が貸し出されていれば枯渇とみなす"""
+        client = create_client("events", region_name="ap-northeast-1")
+        pool = get_connection_pool(client, URL_EVENTS)
+        for _ in range(pool.pool.maxsize):
+            pool.pool.get()
+
+        assert is_pool_exhausted(pool)
+        (stats,) = get_pool_stats(client)
+        assert stats.in_use == stats.max_size
+        assert stats.idle == 0
+
+    def test_not_botocore(self):
+        assert get_pool_stats(object()) == []
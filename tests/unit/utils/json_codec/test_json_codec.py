@@ -0,0 +1,81 @@
+import json
+import sys
+from datetime import datetime
+
+import pytest
+
+from utils.json_codec import RawJson, dumps, dumps_bytes, loads
+
+json_codec_module = sys.modules["utils.json_codec.json_codec"]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(json_codec_module, "orjson", None)
+    return request.param
+
+
+def custom_default(obj):
+    if isinstance(obj, datetime):
+        return {"type": "datetime", "value": obj.isoformat()}
+    if isinstance(obj, set):
+        return sorted(obj)
+    return str(obj)
+
+
+class TestLoads:
+    @pytest.mark.parametrize(
+        "s, expected",
+        [
+            (
+                '{"level":"ERROR","message":"日本語"}',
+                {"level": "ERROR", "message": "日本語"},
+            ),
+            (b"[1, 2.5, null, true]", [1, 2.5, None, True]),
+        ],
+    )
+    def test_normal(self, backend, s, expected):
+        assert loads(s) == expected
+
+    def test_invalid(self, backend):
+        with pytest.raises(ValueError):
+            loads("not json")
+
+
+class TestDumps:
+    @pytest.mark.parametrize(
+        "obj",
+        [
+            {"message": "日本語", "values": [1, 2.5, None, True]},
+            {"dt": datetime(2024, 4, 11, 15, 7, 17), "set": {"b", "a"}},
+            {1: "non str key"},
+            {"big": 2**70},
+        ],
+    )
+    def test_same_as_stdlib(self, backend, obj):
+        expected = json.dumps(
+            obj, default=custom_default, separators=(",", ":"), ensure_ascii=False
+        )
+
+        assert dumps(obj, default=custom_default) == expected
+        assert dumps_bytes(obj, default=custom_default) == expected.encode()
+
+
+class TestRawJson:
+    @pytest.mark.parametrize(
+        "obj, expected",
+        [
+            ({"a": RawJson(b'{"x":[1,2]}')}, '{"a":{"x":[1,2]}}'),
+            # orjson から標準ライブラリにフォールバックしても埋め込める
+            ({"a": RawJson(b"[1]"), "big": 2**70}, f'{{"a":[1],"big":{2**70}}}'),
+        ],
+    )
+    def test_normal(self, backend, obj, expected):
+        def default(obj):
+            return obj.encode() if isinstance(obj, RawJson) else str(obj)
+
+        assert dumps(obj, default=default) == expected
+        assert dumps_bytes(obj, default=default) == expected.encode()
@@ -1,3 +1,4 @@
+import importlib
 import json
 import logging
 
@@ -28,6 +29,26 @@ def reset_powertools_logger_state():
     _reset()
 
 
+@pytest.fixture(autouse=True)
+def reset_latency_histograms():
+    """前のテストで記録されたレイテンシが flush されないよう集計をリセットする。"""
+    from utils.logger import latency
+
+    latency._histograms.clear()
+    yield
+    latency._histograms.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_environment_snapshot():
+    """どのテストでも最初の呼び出しがコールドスタートとして記録されるようにする。"""
+    logging_handler = importlib.import_module("utils.logger.logging_handler")
+
+    logging_handler.reset_environment_snapshot()
+    yield
+    logging_handler.reset_environment_snapshot()
+
+
 @pytest.fixture
 def read_logs(capfd):
     """capfd から stdout を読み、各行を JSON 解析したリストを返す関数を提供する fixture。"""
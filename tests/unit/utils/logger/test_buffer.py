@@ -0,0 +1,119 @@
+import io
+import logging
+
+import pytest
+
+from utils.logger import create_logger, logging_handler
+from utils.logger.buffer import BufferedStreamHandler
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s: str) -> int:
+        self.writes += 1
+        return super().write(s)
+
+
+def create_record(msg: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, None, None)
+
+
+class TestBufferedStreamHandler:
+    def test_normal(self):
+        stream = CountingStream()
+        handler = BufferedStreamHandler(stream)
+
+        for i in range(100):
+            handler.handle(create_record(f"line {i}"))
+
+        # flush するまで書き込まれない
+        assert stream.getvalue() == ""
+
+        handler.flush()
+
+        assert stream.getvalue().splitlines() == [f"line {i}" for i in range(100)]
+        assert stream.writes == 1
+
+    def test_max_bytes(self):
+        """上限に達したらまとめて書き出してメモリを抑える"""
+        stream = CountingStream()
+        handler = BufferedStreamHandler(stream, max_bytes=50)
+
+        for i in range(10):
+            handler.handle(create_record("x" * 9))
+
+        assert stream.writes == 2
+        assert len(stream.getvalue()) == 100
+
+    def test_write_error(self, monkeypatch):
+        """書き込みの失敗は handleError に渡し、ログの呼び出し元には送出しない"""
+        stream = CountingStream()
+        monkeypatch.setattr(stream, "write", lambda s: 1 / 0)
+        handler = BufferedStreamHandler(stream, max_bytes=10)
+        errors = []
+        monkeypatch.setattr(handler, "handleError", errors.append)
+        record = create_record("x" * 20)
+
+        handler.handle(record)
+
+        assert errors == [record]
+        assert handler._buffer == []
+
+
+@pytest.fixture
+def buffered(monkeypatch):
+    monkeypatch.setenv("LOG_BUFFERED", "true")
+
+
+class TestBufferedLogger:
+    def test_normal(self, buffered, read_logs):
+        logger = create_logger("mod_a")
+
+        logger.info("buffered")
+
+        assert read_logs() == []
+
+        logger.flush()
+
+        assert [x["message"] for x in read_logs()] == ["buffered"]
+
+    def test_logging_handler(self, buffered, read_logs, dummy_context):
+        """ハンドラーの終了時に全て書き出される"""
+        logger = create_logger("handler")
+
+        @logging_handler(logger)
+        def handler(event, context):
+            logger.info("inside handler")
+            return "ok"
+
+        handler({}, dummy_context)
+
+        messages = [x["message"] for x in read_logs()]
+        assert "inside handler" in messages
+        assert messages[-1] == "handler return"
+
+    def test_logging_handler_exception(self, buffered, read_logs, dummy_context):
+        """例外の場合もエラーログまで書き出してから送出する"""
+        logger = create_logger("handler")
+
+        @logging_handler(logger)
+        def handler(event, context):
+            raise ValueError("handler error")
+
+        with pytest.raises(ValueError):
+            handler({}, dummy_context)
+
+        logs = read_logs()
+        assert logs[-1]["level"] == "ERROR"
+        assert "handler error" in logs[-1]["message"]
+
+    def test_disabled(self, read_logs):
+        """既定では従来どおり即時に書き出す"""
+        logger = create_logger("mod_a")
+
+        logger.info("unbuffered")
+
+        assert [x["message"] for x in read_logs()] == ["unbuffered"]
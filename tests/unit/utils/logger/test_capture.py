@@ -0,0 +1,200 @@
+import importlib
+import json
+import logging
+from hashlib import sha256
+
+import pytest
+from botocore.stub import ANY, Stubber
+
+from utils.aws import create_client
+from utils.json_codec import RawJson
+from utils.logger import capture, create_logger, logging_handler
+from utils.logger.capture import CapturePolicy, capture_event, offload_event
+from utils.logger.serializer import SerializerLimits, dumps_record
+
+# the package re-exports the decorator under the same name as its module
+logging_handler_module = importlib.import_module("utils.logger.logging_handler")
+
+LIMITS = SerializerLimits()
+
+LARGE_EVENT = {"records": [{"id": i, "body": "x" * 100} for i in range(100)]}
+LARGE_PAYLOAD = json.dumps(LARGE_EVENT, separators=(",", ":")).encode()
+
+
+@pytest.fixture
+def stub_s3(monkeypatch):
+    client = create_client("s3")
+    monkeypatch.setattr(capture, "get_s3_client", lambda: client)
+    with Stubber(client) as stubber:
+        yield stubber
+
+
+class TestCapturePolicy:
+    def test_normal(self):
+        assert CapturePolicy.from_env() == CapturePolicy()
+
+    @pytest.mark.parametrize(
+        "set_environments",
+        [
+            {
+                "EVENT_CAPTURE_MAX_INLINE_BYTES": "100",
+                "EVENT_CAPTURE_PREVIEW_BYTES": "10",
+                "EVENT_CAPTURE_SAMPLE_RATE": "0.5",
+                "EVENT_CAPTURE_BUCKET": "capture-bucket",
+                "EVENT_CAPTURE_PREFIX": "error-processor/",
+                "EVENT_CAPTURE_LEVEL": "INFO",
+            }
+        ],
+        indirect=True,
+    )
+    def test_from_env(self, set_environments):
+        assert CapturePolicy.from_env() == CapturePolicy(
+            max_inline_bytes=100,
+            preview_bytes=10,
+            sample_rate=0.5,
+            offload_bucket="capture-bucket",
+            offload_prefix="error-processor/",
+            level=logging.INFO,
+        )
+
+    @pytest.mark.parametrize("rate, expected", [(1.0, True), (0.0, False)])
+    def test_is_sampled(self, rate, expected):
+        assert CapturePolicy(sample_rate=rate).is_sampled() is expected
+
+
+class TestCaptureEvent:
+    def test_normal(self):
+        """上限以下のイベントはそのまま記録する"""
+        event = {"test": "data"}
+
+        actual = capture_event(event, policy=CapturePolicy(), request_id="r")
+
+        # シリアライズ済みのバイト列をそのまま埋め込む
+        assert isinstance(actual, RawJson)
+        assert json.loads(dumps_record({"event": actual}, limits=LIMITS)) == {
+            "event": event
+        }
+
+    def test_preview(self):
+        """上限を超えたイベントは先頭と末尾、サイズ、ダイジェストだけを記録する"""
+        policy = CapturePolicy(max_inline_bytes=1000, preview_bytes=20)
+
+        actual = capture_event(LARGE_EVENT, policy=policy, request_id="r")
+
+        assert actual == {
+            "size": len(LARGE_PAYLOAD),
+            "sha256": sha256(LARGE_PAYLOAD).hexdigest(),
+            "preview": {
+                "head": LARGE_PAYLOAD[:20].decode(),
+                "tail": LARGE_PAYLOAD[-20:].decode(),
+            },
+        }
+
+    def test_offload(self, stub_s3):
+        """バケットが指定されていればイベント全体を退避し、参照だけを記録する"""
+        policy = CapturePolicy(max_inline_bytes=1000, offload_bucket="capture-bucket")
+        stub_s3.add_response(
+            "put_object",
+            {},
+            {
+                "Bucket": "capture-bucket",
+                "Key": ANY,
+                "Body": LARGE_PAYLOAD,
+                "ContentType": "application/json",
+            },
+        )
+
+        actual = capture_event(LARGE_EVENT, policy=policy, request_id="r")
+
+        stub_s3.assert_no_pending_responses()
+        assert actual["offloaded"].startswith("s3://capture-bucket/events/")
+        assert actual["offloaded"].endswith("/r.json")
+        assert actual["sha256"] == sha256(LARGE_PAYLOAD).hexdigest()
+        assert "preview" not in actual
+
+    def test_offload_error(self, stub_s3):
+        """退避に失敗してもプレビューは記録する"""
+        policy = CapturePolicy(max_inline_bytes=1000, offload_bucket="capture-bucket")
+        stub_s3.add_client_error("put_object", service_error_code="AccessDenied")
+
+        actual = capture_event(LARGE_EVENT, policy=policy, request_id="r")
+
+        assert "AccessDenied" in actual["offload_error"]["Message"]
+        assert actual["preview"]["head"] == LARGE_PAYLOAD[:512].decode()
+
+
+class TestOffloadEvent:
+    @pytest.mark.parametrize("s3_bucket", ["capture-bucket"], indirect=True)
+    def test_normal(self, s3_bucket, client_s3):
+        offload_event(
+            LARGE_PAYLOAD,
+            bucket="capture-bucket",
+            key="events/r.json",
+            client=client_s3,
+        )
+
+        obj = client_s3.get_object(Bucket="capture-bucket", Key="events/r.json")
+        assert obj["Body"].read() == LARGE_PAYLOAD
+        assert obj["ContentType"] == "application/json"
+
+
+class TestLoggingHandlerCapture:
+    def test_normal(self, read_logs, dummy_context):
+        logger = create_logger("handler")
+
+        @logging_handler(
+            logger, capture=CapturePolicy(max_inline_bytes=1000, preview_bytes=20)
+        )
+        def handler(event, context):
+            return "ok"
+
+        handler(LARGE_EVENT, dummy_context)
+
+        event_log = next(x for x in read_logs() if x["message"] == "handler event")
+        assert event_log["data"]["event"]["size"] == len(LARGE_PAYLOAD)
+        assert len(json.dumps(event_log)) < len(LARGE_PAYLOAD)
+
+    def test_not_sampled(self, read_logs, dummy_context):
+        logger = create_logger("handler")
+
+        @logging_handler(logger, capture=CapturePolicy(sample_rate=0))
+        def handler(event, context):
+            return "ok"
+
+        handler({}, dummy_context)
+
+        messages = [x["message"] for x in read_logs()]
+        assert "handler event" not in messages
+        assert "handler return" in messages
+
+    def test_level(self, read_logs, dummy_context):
+        """LOG_LEVEL が INFO でも、取得のレベルを INFO にすれば記録する"""
+        logger = create_logger("handler", level="INFO")
+
+        @logging_handler(logger, capture=CapturePolicy(level=logging.INFO))
+        def handler(event, context):
+            return "ok"
+
+        handler({"test": "data"}, dummy_context)
+
+        event_log = next(x for x in read_logs() if x["message"] == "handler event")
+        assert event_log["level"] == "INFO"
+        assert event_log["data"] == {"event": {"test": "data"}}
+
+    def test_debug_disabled(self, read_logs, dummy_context, monkeypatch):
+        """DEBUG が無効ならイベントをシリアライズしない"""
+        calls = []
+        monkeypatch.setattr(
+            logging_handler_module,
+            "capture_event",
+            lambda *args, **kwargs: calls.append(args),
+        )
+        logger = create_logger("handler", level="INFO")
+
+        @logging_handler(logger)
+        def handler(event, context):
+            return "ok"
+
+        handler({}, dummy_context)
+
+        assert calls == []
@@ -1,10 +1,12 @@
+import logging
 from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
 
+import pytest
 from pydantic import BaseModel
 
-from utils.logger import create_logger
+from utils.logger import create_logger, lazy
 
 
 class TestCreateLogger:
@@ -110,7 +112,7 @@ class TestCreateLogger:
 
         data = log["data"]
         assert data["dt"]["value"] == now.isoformat()
-        assert data["b"]["type"] == "bytes (base64 encoded, gzip compressed)"
+        assert data["b"]["type"] == "bytes (base64 encoded)"
         assert isinstance(data["b"]["value"], str)
         assert data["decimal_int"] == 123
         assert data["decimal_float"] == 123.45
@@ -141,3 +143,79 @@ class TestCreateLogger:
         logs = read_logs()
         assert len(logs) == 1
         assert "data" in logs[0]
+
+
+class TestLogLevel:
+    def test_normal(self, read_logs, monkeypatch):
+        monkeypatch.setenv("LOG_LEVEL", "INFO")
+        logger = create_logger("mod_a")
+
+        logger.debug("debug msg")
+        logger.info("info msg")
+
+        logs = read_logs()
+        assert [x["message"] for x in logs] == ["info msg"]
+        assert not logger.is_enabled_for(logging.DEBUG)
+        assert logger.is_enabled_for(logging.INFO)
+
+    def test_default(self, read_logs, monkeypatch):
+        """未指定なら従来どおり DEBUG から出力する"""
+        monkeypatch.delenv("LOG_LEVEL", raising=False)
+        logger = create_logger("mod_a")
+
+        logger.debug("debug msg")
+
+        assert [x["message"] for x in read_logs()] == ["debug msg"]
+
+    def test_override(self, read_logs, monkeypatch):
+        """LOG_LEVELS はロガー名の最も長い前方一致で LOG_LEVEL を上書きする"""
+        monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+        monkeypatch.setenv("LOG_LEVELS", "utils=WARNING, utils.aws.aws=INFO")
+        logger_aws = create_logger("utils.aws.aws")
+        logger_utils = create_logger("utils.metrics.metrics")
+        logger_other = create_logger("handlers.error_processor")
+
+        for logger in (logger_aws, logger_utils, logger_other):
+            logger.debug("debug msg")
+            logger.info("info msg")
+
+        logs = [(x["identifier"], x["message"]) for x in read_logs()]
+        assert logs == [
+            ("utils.aws.aws", "info msg"),
+            ("handlers.error_processor", "debug msg"),
+            ("handlers.error_processor", "info msg"),
+        ]
+
+    def test_argument(self, read_logs, monkeypatch):
+        """引数で指定したレベルは環境変数より優先する"""
+        monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+        logger = create_logger("mod_a", level="ERROR")
+
+        logger.warning("warning msg")
+        logger.error("error msg")
+
+        assert [x["message"] for x in read_logs()] == ["error msg"]
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="unknown log level"):
+            create_logger("mod_a", level="VERBOSE")
+
+
+class TestLazy:
+    def test_normal(self, read_logs):
+        logger = create_logger("mod_a")
+
+        logger.info("lazy", data={"value": lazy(lambda x: {"x": x}, 1)})
+
+        (log,) = read_logs()
+        assert log["data"] == {"value": {"x": 1}}
+
+    def test_not_evaluated_when_disabled(self, read_logs):
+        """出力されないレコードの遅延値は評価しない"""
+        logger = create_logger("mod_a", level="INFO")
+        calls = []
+
+        logger.debug("lazy", data=lazy(lambda: calls.append(1)))
+
+        assert calls == []
+        assert read_logs() == []
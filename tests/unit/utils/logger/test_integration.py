@@ -22,25 +22,29 @@ class TestLoggerIntegration:
         assert result == {"result": 30}
         logs = read_logs()
 
-        assert len(logs) >= 4
+        assert len(logs) >= 5
 
-        event_log = logs[0]
-        assert "event and environment variables" in event_log["message"]
+        cold_start_log = logs[0]
+        assert cold_start_log["message"] == "cold start"
+        assert cold_start_log["identifier"] == "handlers.sample"
+
+        event_log = logs[1]
+        assert event_log["message"] == "handler event"
         assert event_log["identifier"] == "handlers.sample"
         assert "function_name" in event_log
 
-        start_function_log = logs[1]
+        start_function_log = logs[2]
         assert "start function" in start_function_log["message"]
         assert start_function_log["identifier"] == "services.sample"
         assert "function_name" in start_function_log
 
-        success_function_log = logs[2]
+        success_function_log = logs[3]
         assert "succeeded function" in success_function_log["message"]
         assert success_function_log["identifier"] == "services.sample"
         assert success_function_log["data"]["Return"] == 30
         assert "function_name" in success_function_log
 
-        handler_return_log = logs[3]
+        handler_return_log = logs[4]
         assert "handler return" in handler_return_log["message"]
         assert handler_return_log["identifier"] == "handlers.sample"
         assert handler_return_log["data"]["Return"] == {"result": 30}
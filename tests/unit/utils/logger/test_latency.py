@@ -0,0 +1,127 @@
+import pytest
+
+from utils.logger import create_logger, latency, logging_function, logging_handler
+
+
+class TestLatencyHistogram:
+    def test_normal(self):
+        histogram = latency.LatencyHistogram()
+        for ns in [1_500, 3_000, 3_500, 100_000, 2_000_000]:
+            histogram.record(ns)
+
+        actual = histogram.as_dict()
+
+        assert actual["count"] == 5
+        assert actual["sum_ms"] == pytest.approx(2.108)
+        assert actual["min_ms"] == 0.0015
+        assert actual["max_ms"] == 2.0
+        # 中央値は 3,500 ns を含むバケットの上限 4 us で近似される
+        assert actual["p50_ms"] == 0.004
+        assert actual["p99_ms"] == 2.0
+
+    def test_empty(self):
+        histogram = latency.LatencyHistogram()
+
+        assert histogram.quantile(0.5) is None
+        assert histogram.as_dict()["min_ms"] is None
+
+    def test_drain(self):
+        histogram = latency.LatencyHistogram()
+        histogram.record(1_000)
+
+        snapshot = histogram.drain()
+
+        assert snapshot.count == 1
+        assert histogram.count == 0
+        assert sum(histogram.buckets) == 0
+
+
+class TestLoggingFunctionLatency:
+    def test_untraced_calls_are_recorded(self, read_logs):
+        logger = create_logger("service")
+
+        @logging_function(logger, trace=False)
+        def fn(x):
+            return x
+
+        for i in range(3):
+            fn(i)
+
+        histogram = latency.get_histogram(f"{fn.__module__}.{fn.__qualname__}")
+        assert histogram.count == 3
+        assert read_logs() == []
+
+    def test_latency_false(self):
+        logger = create_logger("service")
+
+        @logging_function(logger, trace=False, latency=False)
+        def fn():
+            return 1
+
+        fn()
+
+        assert latency._histograms == {}
+
+
+class TestFlushLatency:
+    def test_normal(self, read_logs, dummy_context):
+        logger = create_logger("handler")
+
+        @logging_function(logger, trace=False)
+        def fn():
+            return 1
+
+        @logging_handler(logger)
+        def handler(event, context):
+            for _ in range(10):
+                fn()
+            return "ok"
+
+        handler({}, dummy_context)
+        handler({}, dummy_context)
+
+        logs = [x for x in read_logs() if x["message"] == "function latency"]
+        # 呼び出しごとに1レコードだけ出力され、集計は毎回リセットされる
+        assert len(logs) == 2
+        for log in logs:
+            (stats,) = log["data"].values()
+            assert stats["count"] == 10
+
+    def test_emf(self, read_logs, monkeypatch):
+        monkeypatch.setenv("LOGGING_FUNCTION_LATENCY_FORMAT", "emf")
+        logger = create_logger("handler")
+        latency.get_histogram("sample.fn").record(2_000_000)
+
+        latency.flush_latency(logger)
+
+        (log,) = read_logs()
+        (directive,) = log["_aws"]["CloudWatchMetrics"]
+        assert directive["Namespace"] == latency.EMF_NAMESPACE
+        assert {"Name": "sample.fn.p99_ms", "Unit": "Milliseconds"} in directive[
+            "Metrics"
+        ]
+        assert log["sample.fn.count"] == 1
+        assert log["sample.fn.max_ms"] == 2.0
+
+    def test_emf_split(self, read_logs, monkeypatch):
+        """1つの EMF ドキュメントのメトリクスは上限を超えない"""
+        monkeypatch.setenv("LOGGING_FUNCTION_LATENCY_FORMAT", "emf")
+        logger = create_logger("handler")
+        for i in range(30):
+            latency.get_histogram(f"sample.fn{i:02}").record(2_000_000)
+
+        latency.flush_latency(logger)
+
+        logs = read_logs()
+        metrics = [
+            [x["Name"] for x in log["_aws"]["CloudWatchMetrics"][0]["Metrics"]]
+            for log in logs
+        ]
+        assert [len(x) for x in metrics] == [100, 20]
+        assert all(log[name] is not None for log, x in zip(logs, metrics) for name in x)
+        assert "sample.fn29.count" in metrics[1]
+
+    def test_nothing_recorded(self, read_logs):
+        latency.flush_latency(create_logger("handler"))
+
+        assert read_logs() == []
@@ -4,6 +4,7 @@ import pytest
 from freezegun import freeze_time
 
 from utils.logger import create_logger, logging_function
+from utils.logger.logging_function import reset_sampling
 
 
 class TestLoggingFunction:
@@ -159,3 +160,78 @@ class TestLoggingFunction:
         assert start_log["data"]["CallID"] == str(fixed_uuid)
         assert success_log["data"]["CallID"] == str(fixed_uuid)
         assert success_log["data"]["Duration"]["TotalSeconds"] == 0.0
+
+
+class TestLoggingFunctionTracing:
+    def test_trace_false(self, read_logs):
+        logger = create_logger("service")
+
+        @logging_function(logger, trace=False)
+        def fn(x):
+            return x * 2
+
+        assert fn(5) == 10
+        assert read_logs() == []
+
+    def test_trace_false_still_logs_failure(self, read_logs):
+        logger = create_logger("service")
+
+        @logging_function(logger, trace=False)
+        def fn():
+            raise ValueError("error")
+
+        with pytest.raises(ValueError):
+            fn()
+
+        logs = read_logs()
+        assert len(logs) == 1
+        assert "failed function" in logs[0]["message"]
+        assert "Duration" not in logs[0]["data"]
+
+    def test_env_disables_tracing(self, read_logs, monkeypatch):
+        monkeypatch.setenv("LOGGING_FUNCTION_TRACE", "false")
+        logger = create_logger("service")
+
+        @logging_function(logger)
+        def fn():
+            return 1
+
+        fn()
+
+        assert read_logs() == []
+
+    def test_sample_every(self, read_logs):
+        logger = create_logger("service")
+
+        @logging_function(logger, sample_every=3)
+        def fn(x):
+            return x
+
+        assert [fn(i) for i in range(7)] == list(range(7))
+
+        logs = read_logs()
+        # 1, 4, 7 回目の呼び出しだけが start/succeeded を出力する
+        assert [x["data"]["Args"] for x in logs if "start" in x["message"]] == [
+            [0],
+            [3],
+            [6],
+        ]
+
+    def test_sample_first_resets_per_invocation(self, read_logs):
+        logger = create_logger("service")
+
+        @logging_function(logger, sample_first=2)
+        def fn(x):
+            return x
+
+        for i in range(5):
+            fn(i)
+        reset_sampling()
+        fn(5)
+
+        logs = read_logs()
+        assert [x["data"]["Args"] for x in logs if "start" in x["message"]] == [
+            [0],
+            [1],
+            [5],
+        ]
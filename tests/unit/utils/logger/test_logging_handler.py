@@ -1,6 +1,12 @@
+import importlib
+
 import pytest
 
-from utils.logger import create_logger, logging_handler
+import utils.priming.priming as priming
+from utils.logger import create_logger, logging_handler, register_flush_hook
+
+# the package re-exports the decorator under the same name as its module
+logging_handler_module = importlib.import_module("utils.logger.logging_handler")
 
 
 class TestLoggingHandler:
@@ -16,14 +22,16 @@ class TestLoggingHandler:
 
         assert result == {"status": "ok"}
         logs = read_logs()
-        assert len(logs) >= 2
+        assert len(logs) >= 3
 
-        event_log = logs[0]
-        assert "event and environment variables" in event_log["message"]
-        assert "event" in event_log["data"]
-        assert "env" in event_log["data"]
-        assert event_log["data"]["event"] == event
-        assert isinstance(event_log["data"]["env"], dict)
+        cold_start_log = logs[0]
+        assert cold_start_log["message"] == "cold start"
+        assert isinstance(cold_start_log["data"]["env"], dict)
+        assert cold_start_log["identifier"] == "handler"
+
+        event_log = logs[1]
+        assert event_log["message"] == "handler event"
+        assert event_log["data"] == {"event": event}
         assert event_log["identifier"] == "handler"
 
         return_log = logs[-1]
@@ -112,3 +120,115 @@ class TestLoggingHandler:
             (log for log in logs if log["message"] == "inside handler"), None
         )
         assert inside_log is not None
+
+
+class TestEnvironmentSnapshot:
+    def test_normal(self, read_logs, dummy_context, monkeypatch):
+        """環境変数はコンテナごとに1回だけ記録し、以降はハッシュで参照する"""
+        monkeypatch.setenv("AWS_LAMBDA_INITIALIZATION_TYPE", "on-demand")
+        logger = create_logger("handler")
+
+        @logging_handler(logger)
+        def handler(event, context):
+            logger.info("inside handler")
+            return "ok"
+
+        handler({}, dummy_context)
+        handler({}, dummy_context)
+
+        logs = read_logs()
+        cold_starts = [x for x in logs if x["message"] == "cold start"]
+        assert len(cold_starts) == 1
+        data = cold_starts[0]["data"]
+        assert data["InitializationType"] == "on-demand"
+        assert data["SinceLoggerImportMs"] > 0
+        assert data["env"]["AWS_LAMBDA_INITIALIZATION_TYPE"] == "on-demand"
+
+        inside = [x for x in logs if x["message"] == "inside handler"]
+        assert [x["cold_start"] for x in inside] == [True, False]
+        assert [x["env_hash"] for x in inside] == [data["EnvHash"]] * 2
+
+    def test_info(self, read_logs, dummy_context):
+        """INFO では環境変数そのものは記録せず、ハッシュだけを記録する"""
+        logger = create_logger("handler", level="INFO")
+
+        @logging_handler(logger)
+        def handler(event, context):
+            return "ok"
+
+        handler({}, dummy_context)
+
+        cold_start_log = next(x for x in read_logs() if x["message"] == "cold start")
+        assert "env" not in cold_start_log["data"]
+        assert cold_start_log["data"]["EnvHash"]
+
+    def test_after_restore(self, read_logs, dummy_context, monkeypatch):
+        """SnapStart の復元後は再びコールドスタートとして記録する"""
+        monkeypatch.setattr(priming, "_after_restore", [])
+        monkeypatch.setattr(logging_handler_module, "_restore_hook_installed", False)
+        logger = create_logger("handler")
+
+        @logging_handler(logger)
+        def handler(event, context):
+            return "ok"
+
+        handler({}, dummy_context)
+        monkeypatch.setenv("RESTORED", "true")
+        priming.run_after_restore()
+        handler({}, dummy_context)
+        handler({}, dummy_context)
+
+        logs = read_logs()
+        cold_starts = [x for x in logs if x["message"] == "cold start"]
+        assert len(cold_starts) == 2
+        assert "RESTORED" in cold_starts[1]["data"]["env"]
+        assert cold_starts[0]["data"]["EnvHash"] != cold_starts[1]["data"]["EnvHash"]
+        returns = [x for x in logs if x["message"] == "handler return"]
+        assert [x["cold_start"] for x in returns] == [True, True, False]
+
+
+class TestRegisterFlushHook:
+    def test_normal(self, read_logs, dummy_context, monkeypatch):
+        """登録したフックが呼び出しごとに handler return の後で実行される"""
+        monkeypatch.setattr(logging_handler_module, "_flush_hooks", [])
+        logger = create_logger("handler")
+
+        def flush_sample(logger):
+            logger.info("sample stats")
+
+        register_flush_hook(flush_sample)
+        register_flush_hook(flush_sample)
+
+        @logging_handler(logger)
+        def handler(event, context):
+            return "ok"
+
+        handler({}, dummy_context)
+        handler({}, dummy_context)
+
+        messages = [x["message"] for x in read_logs()]
+        assert messages.count("sample stats") == 2
+        assert messages[-2:] == ["handler return", "sample stats"]
+
+    def test_failed_hook_does_not_stop_others(
+        self, read_logs, dummy_context, monkeypatch
+    ):
+        monkeypatch.setattr(logging_handler_module, "_flush_hooks", [])
+        logger = create_logger("handler")
+
+        def flush_broken(logger):
+            raise RuntimeError("broken")
+
+        register_flush_hook(flush_broken)
+        register_flush_hook(lambda logger: logger.info("sample stats"))
+
+        @logging_handler(logger)
+        def handler(event, context):
+            return "ok"
+
+        assert handler({}, dummy_context) == "ok"
+
+        logs = read_logs()
+        warning = next(x for x in logs if x["level"] == "WARNING")
+        assert "flush_broken" in warning["message"]
+        assert logs[-1]["message"] == "sample stats"
@@ -0,0 +1,208 @@
+import json
+from base64 import b64decode
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from gzip import decompress
+
+import pytest
+from aws_lambda_powertools.utilities.data_classes.cloud_watch_logs_event import (
+    CloudWatchLogsEvent,
+)
+from pydantic import BaseModel
+
+from utils.logger import lazy
+from utils.logger.serializer import (
+    TRUNCATED_BUDGET,
+    TRUNCATED_DEPTH,
+    SerializerLimits,
+    _serializers,
+    custom_default,
+    dumps_record,
+    get_serializer,
+    register_serializer,
+    serialize_str,
+)
+
+LIMITS = SerializerLimits()
+
+
+@dataclass
+class Inner:
+    value: int
+
+
+@dataclass
+class Outer:
+    name: str
+    inner: Inner
+    items: tuple
+
+
+class SampleModel(BaseModel):
+    name: str
+
+
+def decode_bytes(serialized: dict) -> bytes:
+    raw = b64decode(serialized["value"])
+    return decompress(raw) if "gzip" in serialized["type"] else raw
+
+
+@pytest.fixture
+def isolated_serializers(monkeypatch):
+    monkeypatch.setattr("utils.logger.serializer._serializers", dict(_serializers))
+    get_serializer.cache_clear()
+    yield
+    get_serializer.cache_clear()
+
+
+class TestGetSerializer:
+    def test_normal(self, isolated_serializers):
+        class Point:
+            def __init__(self, x):
+                self.x = x
+
+        class Point3D(Point):
+            pass
+
+        register_serializer(Point, lambda obj: {"x": obj.x})
+
+        # サブクラスは MRO をたどって解決される
+        assert custom_default(Point3D(1)) == {"x": 1}
+        assert get_serializer(Point3D) is get_serializer(Point)
+
+    def test_register_by_name(self, isolated_serializers):
+        """import できない型も "module.QualName" で登録できる"""
+
+        class Sample:
+            pass
+
+        register_serializer(
+            f"{Sample.__module__}.{Sample.__qualname__}", lambda obj: "sample"
+        )
+
+        assert custom_default(Sample()) == "sample"
+
+    def test_fallback(self):
+        assert get_serializer(object) is serialize_str
+        assert custom_default(object())["type"] == "<class 'object'>"
+
+
+class TestCustomDefault:
+    @pytest.mark.parametrize(
+        "obj, expected",
+        [
+            (Decimal("123"), 123),
+            (Decimal("123.45"), 123.45),
+            (
+                datetime(2024, 4, 11, 15, 7, 17),
+                {
+                    "type": "<class 'datetime.datetime'>",
+                    "value": "2024-04-11T15:07:17",
+                },
+            ),
+            ((1, 2), {"type": "<class 'tuple'>", "items": [1, 2]}),
+            (Inner, {"type": str(Inner)}),
+            (lazy(lambda: {"a": 1}), {"a": 1}),
+        ],
+    )
+    def test_normal(self, obj, expected):
+        assert custom_default(obj) == expected
+
+    def test_dataclass(self):
+        """dataclass は1階層ずつ展開される"""
+        inner = Inner(value=1)
+
+        assert custom_default(Outer(name="a", inner=inner, items=())) == {
+            "name": "a",
+            "inner": inner,
+            "items": (),
+        }
+
+    def test_pydantic(self):
+        assert custom_default(SampleModel(name="a"))["value"] == {"name": "a"}
+
+    @pytest.mark.parametrize(
+        "size, compressed",
+        [(16, False), (255, False), (256, True), (128 * 1024, True)],
+    )
+    def test_bytes(self, size, compressed):
+        """小さいバイト列は圧縮しない"""
+        obj = bytes(range(256)) * (size // 256) + bytes(range(size % 256))
+
+        actual = custom_default(obj)
+
+        assert ("gzip" in actual["type"]) is compressed
+        assert decode_bytes(actual) == obj
+
+
+class TestDumpsRecord:
+    def test_normal(self):
+        obj = {"outer": Outer(name="a", inner=Inner(value=1), items=(1, 2))}
+
+        actual = json.loads(dumps_record(obj, limits=LIMITS))
+
+        assert actual == {
+            "outer": {
+                "name": "a",
+                "inner": {"value": 1},
+                "items": [1, 2],
+            }
+        }
+
+    def test_max_items(self):
+        limits = SerializerLimits(max_items=3)
+
+        actual = json.loads(dumps_record({"v": set(range(10))}, limits=limits))
+
+        assert actual["v"]["items"] == [0, 1, 2, "<truncated: 7 items>"]
+
+    def test_max_depth(self):
+        limits = SerializerLimits(max_depth=2)
+
+        actual = json.loads(
+            dumps_record({"v": lazy(lambda: {"a": {"b": {"c": 1}}})}, limits=limits)
+        )
+
+        assert actual["v"] == {"a": {"b": TRUNCATED_DEPTH}}
+
+    def test_max_bytes(self):
+        """バイト数の予算はレコード全体で共有される"""
+        limits = SerializerLimits(max_bytes=100)
+        obj = {"a": SampleModel(name="x" * 80), "b": SampleModel(name="y")}
+
+        actual = json.loads(dumps_record(obj, limits=limits))
+
+        assert actual["a"]["value"]["name"].startswith("x" * 10)
+        assert actual["a"]["value"]["name"].endswith("chars>")
+        assert actual["b"] == TRUNCATED_BUDGET
+
+    def test_max_bytes_bytes(self):
+        """予算を超えるバイト列は符号化前に切り詰めるので先頭部分は復元できる"""
+        limits = SerializerLimits(max_bytes=1000)
+        obj = bytes(range(256)) * 16
+
+        actual = json.loads(dumps_record({"b": obj}, limits=limits))["b"]
+
+        kept = decode_bytes(actual)
+        assert obj.startswith(kept)
+        assert actual["truncated"] == f"{len(obj) - len(kept)} bytes"
+
+    def test_dict_wrapper(self):
+        """CloudWatch Logs イベントのペイロードも予算内に収まる"""
+        limits = SerializerLimits(max_bytes=200)
+        event = CloudWatchLogsEvent({"awslogs": {"data": "A" * 10_000}})
+
+        actual = json.loads(dumps_record({"event": event}, limits=limits))
+
+        data = actual["event"]["value"]["awslogs"]["data"]
+        assert len(data) < 300
+        assert data.endswith("chars>")
+
+    def test_plain_values_are_not_budgeted(self):
+        """JSON でそのまま表現できる値は予算の対象外"""
+        limits = SerializerLimits(max_bytes=10)
+
+        actual = json.loads(dumps_record({"s": "z" * 100}, limits=limits))
+
+        assert actual == {"s": "z" * 100}
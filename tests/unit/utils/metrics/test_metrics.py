@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from utils.metrics import create_metrics, metrics_handler
+
+
+@pytest.fixture
+def read_emf(capsys):
+    """capsys から stdout を読み、EMF ドキュメントのリストを返す関数を提供する fixture。"""
+
+    def _read():
+        output = capsys.readouterr().out
+        return [json.loads(x) for x in output.splitlines() if "_aws" in x]
+
+    return _read
+
+
+def fake_clock(monkeypatch, ticks):
+    import utils.metrics.metrics as module
+
+    iterator = iter(ticks)
+    monkeypatch.setattr(module, "perf_counter_ns", lambda: next(iterator))
+
+
+class TestMetrics:
+    def test_normal(self, read_emf):
+        metrics = create_metrics()
+        metrics.count("EventsIn", 3)
+        metrics.count("EventsIn", 2)
+        metrics.add_duration("ParseDuration", 1_500_000)
+
+        metrics.flush()
+
+        (emf,) = read_emf()
+        (directive,) = emf["_aws"]["CloudWatchMetrics"]
+        assert directive["Namespace"] == "test-namespace"
+        assert {x["Name"]: x["Unit"] for x in directive["Metrics"]} == {
+            "EventsIn": "Count",
+            "ParseDuration": "Milliseconds",
+        }
+        assert emf["EventsIn"] == [5.0]
+        assert emf["ParseDuration"] == [1.5]
+
+    def test_flush_resets(self, read_emf):
+        metrics = create_metrics()
+        metrics.count("EventsIn")
+        metrics.flush()
+        metrics.flush()
+
+        assert len(read_emf()) == 1
+
+    def test_observe(self, read_emf):
+        metrics = create_metrics()
+        for i in range(250):
+            metrics.observe("IngestLag", i)
+
+        metrics.flush()
+
+        (emf,) = read_emf()
+        # EMF の上限(100件)に収まるようサンプリングされる
+        assert len(emf["IngestLag"]) == 99
+        assert set(emf["IngestLag"]) <= set(range(250))
+
+    def test_timer_self_time(self, monkeypatch):
+        # 内側のタイマーの時間は外側から差し引かれる
+        fake_clock(monkeypatch, [0, 10, 40, 100])
+        metrics = create_metrics()
+
+        with metrics.timer("Outer"):
+            with metrics.timer("Inner"):
+                pass
+
+        assert metrics._values["Inner"][1] == pytest.approx(30 / 1e6)
+        assert metrics._values["Outer"][1] == pytest.approx(70 / 1e6)
+
+    def test_timed(self, monkeypatch):
+        # 上流の generator の時間は下流のステージから差し引かれる
+        fake_clock(monkeypatch, [0, 1, 3, 10, 20, 21, 25, 30, 40, 41, 42, 50])
+        metrics = create_metrics()
+
+        upstream = metrics.timed(iter([1, 2]), "Upstream")
+        downstream = metrics.timed((x * 2 for x in upstream), "Downstream")
+
+        assert list(downstream) == [2, 4]
+        assert metrics._values["Upstream"][1] == pytest.approx(7 / 1e6)
+        assert metrics._values["Downstream"][1] == pytest.approx(23 / 1e6)
+
+
+class TestMetricsHandler:
+    def test_flush_on_error(self, read_emf):
+        metrics = create_metrics()
+
+        @metrics_handler(metrics)
+        def handler(event, context):
+            metrics.count("EventsIn")
+            raise ValueError("error")
+
+        with pytest.raises(ValueError):
+            handler({}, None)
+
+        (emf,) = read_emf()
+        assert emf["EventsIn"] == [1.0]
@@ -0,0 +1,81 @@
+import sys
+import types
+import uuid
+
+import pytest
+
+import utils.priming.priming as priming
+
+
+@pytest.fixture(autouse=True)
+def isolated_hooks(monkeypatch):
+    """登録済みのフックや runtime への登録状態をテストごとに分離する。"""
+    monkeypatch.setattr(priming, "_before_snapshot", [])
+    monkeypatch.setattr(priming, "_after_restore", [])
+    monkeypatch.setattr(priming, "_installed", False)
+
+
+class TestPriming:
+    def test_normal(self):
+        calls = []
+        priming.register_before_snapshot(lambda: calls.append("before-1"))
+        priming.register_before_snapshot(lambda: calls.append("before-2"))
+        priming.register_after_restore(lambda: calls.append("after"))
+
+        priming.run_before_snapshot()
+        priming.run_after_restore()
+
+        assert calls == ["before-1", "before-2", "after"]
+
+    def test_failed_hook_does_not_stop_others(self, monkeypatch):
+        calls = []
+        warnings = []
+        monkeypatch.setattr(
+            priming.logger, "warning", lambda msg, **kwargs: warnings.append(msg)
+        )
+
+        @priming.register_before_snapshot
+        def broken():
+            raise RuntimeError("broken")
+
+        priming.register_before_snapshot(lambda: calls.append("next"))
+
+        priming.run_before_snapshot()
+
+        assert calls == ["next"]
+        (warning,) = warnings
+        assert "broken" in warning
+
+    def test_install_runtime_hooks(self, monkeypatch):
+        # Lambda ランタイムの snapshot_restore_py に1度だけ登録される
+        registered = []
+        module = types.ModuleType("snapshot_restore_py")
+        module.register_before_snapshot = lambda f: registered.append(("before", f))
+        module.register_after_restore = lambda f: registered.append(("after", f))
+        monkeypatch.setitem(sys.modules, "snapshot_restore_py", module)
+
+        priming.register_before_snapshot(lambda: None)
+        priming.register_after_restore(lambda: None)
+
+        assert registered == [
+            ("before", priming.run_before_snapshot),
+            ("after", priming.run_after_restore),
+        ]
+
+    def test_reseed(self, monkeypatch):
+        seeded = []
+        monkeypatch.setattr(priming.random, "seed", lambda: seeded.append(True))
+        monkeypatch.setattr(uuid, "_last_timestamp_v7", 123, raising=False)
+        monkeypatch.setattr(uuid, "_last_counter_v7", 456, raising=False)
+
+        priming.run_after_restore()
+
+        assert seeded == [True]
+        assert uuid._last_timestamp_v7 is None
+        assert uuid._last_counter_v7 == 0
+
+    def test_is_snap_start(self, monkeypatch):
+        monkeypatch.setenv("AWS_LAMBDA_INITIALIZATION_TYPE", "snap-start")
+        assert priming.is_snap_start()
+        monkeypatch.setenv("AWS_LAMBDA_INITIALIZATION_TYPE", "on-demand")
+        assert not priming.is_snap_start()
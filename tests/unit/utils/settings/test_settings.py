@@ -0,0 +1,45 @@
+from pydantic_settings import BaseSettings
+
+from utils.priming import run_after_restore
+from utils.settings import get_settings, refresh_settings
+
+
+class SampleSettings(BaseSettings):
+    sample_value: str = "default"
+
+
+class OtherSettings(BaseSettings):
+    other_value: int = 0
+
+
+class TestGetSettings:
+    def test_normal(self, monkeypatch):
+        monkeypatch.setenv("SAMPLE_VALUE", "first")
+        first = get_settings(SampleSettings)
+        monkeypatch.setenv("SAMPLE_VALUE", "second")
+
+        # コンテナ内では一度だけ読み込まれる
+        assert get_settings(SampleSettings) is first
+        assert first.sample_value == "first"
+
+    def test_refresh(self, monkeypatch):
+        monkeypatch.setenv("SAMPLE_VALUE", "first")
+        get_settings(SampleSettings)
+        other = get_settings(OtherSettings)
+        monkeypatch.setenv("SAMPLE_VALUE", "second")
+
+        refresh_settings(SampleSettings)
+
+        assert get_settings(SampleSettings).sample_value == "second"
+        assert get_settings(OtherSettings) is other
+
+    def test_reload_after_restore(self, monkeypatch):
+        monkeypatch.setenv("SAMPLE_VALUE", "first")
+        before = get_settings(SampleSettings)
+        monkeypatch.setenv("SAMPLE_VALUE", "restored")
+
+        run_after_restore()
+
+        actual = get_settings(SampleSettings)
+        assert actual is not before
+        assert actual.sample_value == "restored"